@@ -0,0 +1,77 @@
+"""Compare executemany vs COPY throughput for storage.raw_postgres.insert_envelopes.
+
+Requires a Postgres with the bronze schema applied:
+
+    FINANCES_HUB_PG_DSN=postgresql://... PYTHONPATH=src python benchmarks/bench_insert_envelopes.py --rows 20000
+
+Benchmark rows are written with source='benchmark' and deleted afterwards.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import time
+import uuid
+
+import psycopg
+
+from ingestion.models import RawEnvelope
+from storage.raw_postgres import insert_envelopes
+
+BENCH_SOURCE = "benchmark"
+
+
+def _envelopes(count: int) -> list[RawEnvelope]:
+    fetched_at = RawEnvelope.utc_now_iso()
+    return [
+        RawEnvelope(
+            source=BENCH_SOURCE,
+            endpoint="https://api.binance.com/api/v3/klines",
+            request_params={"symbol": "BTCUSDT", "interval": "1d", "startTime": index},
+            asset="BTC",
+            currency="usdt",
+            uid=str(uuid.uuid4()),
+            fetched_at=fetched_at,
+            payload={
+                "symbol": "BTCUSDT",
+                "interval": "1d",
+                "rows": [
+                    {"open_time": index, "close_time": index + 86_399_999, "close": "42000.1"}
+                ],
+            },
+        )
+        for index in range(count)
+    ]
+
+
+def _cleanup() -> None:
+    with psycopg.connect(os.environ["FINANCES_HUB_PG_DSN"]) as conn:
+        conn.execute("DELETE FROM bronze.ingestion_events WHERE source = %s", (BENCH_SOURCE,))
+        conn.execute("DELETE FROM bronze.envelope_hashes WHERE source = %s", (BENCH_SOURCE,))
+        conn.commit()
+
+
+def _measure(label: str, count: int, **kwargs: int) -> float:
+    envelopes = _envelopes(count)
+    started = time.perf_counter()
+    insert_envelopes(envelopes, **kwargs)
+    elapsed = time.perf_counter() - started
+    _cleanup()
+    rate = count / elapsed
+    print(f"{label:<12} {count:>8} rows  {elapsed:8.3f}s  {rate:12.0f} rows/s")
+    return rate
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000)
+    args = parser.parse_args()
+
+    _cleanup()
+    before = _measure("executemany", args.rows, copy_min_rows=args.rows + 1)
+    after = _measure("copy", args.rows, copy_min_rows=0)
+    print(f"speedup      {after / before:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""Pages/sec of the Nubank trading-note page extractor over a synthetic corpus.
+
+Writes ``--notes`` synthetic notes of ``--pages`` trade pages each (a ruled
+trades table plus header text, standard Helvetica) followed by
+``--summary-pages`` ruled fee summary pages, and times the previous extract_tables +
+extract_text pipeline, the single-pass extractor, and the single-pass
+extractor behind the trade-marker page pre-scan:
+
+    PYTHONPATH=src python benchmarks/bench_trading_notes_parse.py --notes 20 --pages 3 --summary-pages 2
+
+No database is needed. All extractors must return the same rows.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+import pdfplumber
+
+from ingestion.nubank_trading_notes import (
+    TABLE_COLUMNS,
+    _is_trade_page,
+    _merge_rows,
+    _normalize_line,
+    _page_rows,
+    _rows_from_lines,
+    _single_pass_rows,
+)
+
+PAGE_WIDTH = 595
+PAGE_HEIGHT = 842
+ROWS_PER_PAGE = 25
+COLUMN_EDGES = [30, 100, 120, 175, 290, 320, 380, 440, 530, 565]
+TICKERS = ["PETR4 PN", "VALE3 ON", "ITUB4 PN", "BBAS3 ON", "WEGE3 ON", "BOVA11 CI"]
+
+
+def _legacy_page_rows(page: Any) -> list[list[object | None]]:
+    """The previous extractor: ``extract_tables`` plus a second ``extract_text`` layout pass."""
+    table_rows: list[list[object | None]] = []
+    for table in page.extract_tables() or []:
+        for row in table:
+            if row and any(cell is not None and str(cell).strip() for cell in row):
+                table_rows.append(list(row[: len(TABLE_COLUMNS)]))
+    lines = [line for line in map(_normalize_line, (page.extract_text() or "").splitlines()) if line]
+    return _merge_rows(_rows_from_lines(lines), table_rows)
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _text(x: float, y: float, text: str, size: int = 7) -> str:
+    return f"BT /F1 {size} Tf {x:.1f} {y:.1f} Td ({_escape(text)}) Tj ET"
+
+
+def _page_stream(page_index: int, rng: random.Random) -> bytes:
+    ops = [
+        _text(30, 800, "NOTA DE NEGOCIACAO", 10),
+        _text(30, 785, "Nr. nota Folha Data pregao"),
+        _text(30, 775, f"{100000 + page_index} {page_index + 1} 05/11/2025"),
+        _text(30, 755, "Negocios realizados", 9),
+    ]
+    top = 740
+    row_height = 14
+    bottom = top - row_height * (ROWS_PER_PAGE + 1)
+    for index in range(ROWS_PER_PAGE + 2):
+        y = top - row_height * index
+        ops.append(f"{COLUMN_EDGES[0]} {y} m {COLUMN_EDGES[-1]} {y} l S")
+    for x in COLUMN_EDGES:
+        ops.append(f"{x} {top} m {x} {bottom} l S")
+
+    header = ["Negociacao", "C/V", "Tipo mercado", "Especificacao do titulo", "Obs.", "Quantidade", "Preco", "Valor", "D/C"]
+    rows = [header]
+    for _ in range(ROWS_PER_PAGE):
+        quantity = rng.randint(1, 500)
+        price = rng.randint(500, 9000) / 100
+        side = rng.choice("CV")
+        rows.append(
+            [
+                "BOVESPA",
+                side,
+                "VISTA",
+                rng.choice(TICKERS),
+                "",
+                str(quantity),
+                f"{price:.2f}".replace(".", ","),
+                f"{quantity * price:.2f}".replace(".", ","),
+                "D" if side == "C" else "C",
+            ]
+        )
+    for index, row in enumerate(rows):
+        y = top - row_height * index - 10
+        for column, value in enumerate(row):
+            if value:
+                ops.append(_text(COLUMN_EDGES[column] + 2, y, value))
+    return "\n".join(ops).encode("latin-1")
+
+
+def _summary_stream(page_index: int, rng: random.Random) -> bytes:
+    labels = ["Valor liquido das operacoes", "Taxa de liquidacao", "Emolumentos", "Corretagem", "ISS", "IRRF"]
+    ops = [
+        _text(30, 800, "NOTA DE NEGOCIACAO", 10),
+        _text(30, 785, f"Folha {page_index + 1}"),
+        _text(30, 755, "Resumo financeiro", 9),
+    ]
+    y = 735
+    for _ in range(4):
+        for label in labels:
+            ops.append(f"30 {y + 11} m 565 {y + 11} l S")
+            ops.append(f"30 {y + 11} m 30 {y - 3} l S 390 {y + 11} m 390 {y - 3} l S 565 {y + 11} m 565 {y - 3} l S")
+            ops.append(_text(32, y, label))
+            ops.append(_text(400, y, f"{rng.randint(1, 99999) / 100:.2f}".replace(".", ",")))
+            y -= 14
+    ops.append(f"30 {y + 11} m 565 {y + 11} l S")
+    return "\n".join(ops).encode("latin-1")
+
+
+def write_synthetic_note(path: Path, pages: int, seed: int, summary_pages: int = 0) -> None:
+    rng = random.Random(seed)
+    streams = [_page_stream(index, rng) for index in range(pages)]
+    streams += [_summary_stream(pages + index, rng) for index in range(summary_pages)]
+    pages += summary_pages
+    page_ids = [4 + 2 * index for index in range(pages)]
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [" + b" ".join(f"{pid} 0 R".encode() for pid in page_ids) + f"] /Count {pages} >>".encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    ]
+    for pid, stream in zip(page_ids, streams):
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {pid + 1} 0 R >>".encode()
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n".encode() + stream + b"\nendstream")
+
+    body = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(body))
+        body += f"{number} 0 obj\n".encode() + obj + b"\nendobj\n"
+    xref = len(body)
+    body += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    body += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    body += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    path.write_bytes(bytes(body))
+
+
+def _measure(label: str, paths: list[Path], extract: Callable) -> tuple[float, list]:
+    rows: list = []
+    pages = 0
+    started = time.perf_counter()
+    for path in paths:
+        with pdfplumber.open(path) as pdf:
+            for page in pdf.pages:
+                rows.append(extract(page))
+                pages += 1
+    elapsed = time.perf_counter() - started
+    rate = pages / elapsed
+    print(f"{label:<12} {pages:>6} pages  {elapsed:8.3f}s  {rate:10.1f} pages/s")
+    return rate, rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--notes", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument("--summary-pages", type=int, default=2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [Path(tmp) / f"note-{index:04d}.pdf" for index in range(args.notes)]
+        for index, path in enumerate(paths):
+            write_synthetic_note(path, args.pages, seed=index, summary_pages=args.summary_pages)
+
+        before, legacy_rows = _measure("two-pass", paths, _legacy_page_rows)
+        single, single_rows = _measure("single-pass", paths, _single_pass_rows)
+        after, filtered_rows = _measure("pre-scan", paths, lambda page: _page_rows(page) or [])
+        _, trade_pages = _measure("scan-only", paths, _is_trade_page)
+
+    mismatches = sum(
+        sorted(map(tuple, old)) != sorted(map(tuple, new))
+        for old, new in zip(legacy_rows, filtered_rows)
+    )
+    mismatches += sum(
+        sorted(map(tuple, old)) != sorted(map(tuple, new))
+        for old, new in zip(single_rows, filtered_rows)
+    )
+    print(f"skipped pages: {trade_pages.count(False)} of {len(trade_pages)}")
+    print(f"speedup      {single / before:.1f}x single-pass, {after / before:.1f}x with pre-scan")
+    print(f"mismatched pages: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
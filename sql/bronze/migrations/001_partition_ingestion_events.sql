@@ -0,0 +1,49 @@
+-- Converts an existing unpartitioned bronze.ingestion_events into the partitioned
+-- layout from sql/bronze/schema.sql. Run in three steps:
+--   1. the "before schema" block below,
+--   2. sql/bronze/schema.sql,
+--   3. the "after schema" block below.
+
+-- before schema
+ALTER TABLE bronze.ingestion_events RENAME TO ingestion_events_unpartitioned;
+ALTER TABLE bronze.ingestion_events_unpartitioned RENAME CONSTRAINT ingestion_events_pkey TO ingestion_events_unpartitioned_pkey;
+DROP INDEX IF EXISTS bronze.idx_ingestion_events_source;
+DROP INDEX IF EXISTS bronze.idx_ingestion_events_asset;
+DROP INDEX IF EXISTS bronze.idx_ingestion_events_currency;
+DROP INDEX IF EXISTS bronze.idx_ingestion_events_uid;
+DROP INDEX IF EXISTS bronze.idx_ingestion_events_fetched_at;
+DROP INDEX IF EXISTS bronze.idx_ingestion_events_payload_gin;
+
+-- after schema
+SELECT bronze.ensure_ingestion_events_partition(source, month)
+FROM (
+    SELECT DISTINCT
+        source,
+        date_trunc('month', fetched_at AT TIME ZONE 'UTC')::date AS month
+    FROM bronze.ingestion_events_unpartitioned
+) AS months;
+
+INSERT INTO bronze.ingestion_events (
+    uid,
+    source,
+    endpoint,
+    request_params,
+    asset,
+    currency,
+    fetched_at,
+    payload,
+    created_at
+)
+SELECT
+    uid,
+    source,
+    endpoint,
+    request_params,
+    asset,
+    currency,
+    fetched_at,
+    payload,
+    created_at
+FROM bronze.ingestion_events_unpartitioned;
+
+DROP TABLE bronze.ingestion_events_unpartitioned;
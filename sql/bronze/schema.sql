@@ -1,7 +1,7 @@
 CREATE SCHEMA IF NOT EXISTS bronze;
 
 CREATE TABLE IF NOT EXISTS bronze.ingestion_events (
-    uid UUID PRIMARY KEY,
+    uid UUID NOT NULL,
     source TEXT NOT NULL,
     endpoint TEXT NOT NULL,
     request_params JSONB NOT NULL,
@@ -9,15 +9,103 @@ CREATE TABLE IF NOT EXISTS bronze.ingestion_events (
     currency TEXT NOT NULL,
     fetched_at TIMESTAMPTZ NOT NULL,
     payload JSONB NOT NULL,
-    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
-);
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (uid, source, fetched_at)
+) PARTITION BY LIST (source);
 
 CREATE INDEX IF NOT EXISTS idx_ingestion_events_source ON bronze.ingestion_events (source);
 CREATE INDEX IF NOT EXISTS idx_ingestion_events_asset ON bronze.ingestion_events (asset);
 CREATE INDEX IF NOT EXISTS idx_ingestion_events_currency ON bronze.ingestion_events (currency);
-CREATE INDEX IF NOT EXISTS idx_ingestion_events_uid ON bronze.ingestion_events (uid);
 CREATE INDEX IF NOT EXISTS idx_ingestion_events_fetched_at ON bronze.ingestion_events (fetched_at);
-CREATE INDEX IF NOT EXISTS idx_ingestion_events_payload_gin ON bronze.ingestion_events USING GIN (payload);
+
+-- One LIST partition per source, each RANGE-partitioned by UTC month of fetched_at.
+-- storage.bronze_partitions calls this before every write. The payload GIN index
+-- is created per month partition only when p_with_gin is set.
+CREATE OR REPLACE FUNCTION bronze.ensure_ingestion_events_partition(
+    p_source TEXT,
+    p_month DATE,
+    p_with_gin BOOLEAN DEFAULT FALSE
+) RETURNS TEXT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    source_table TEXT := 'ingestion_events_' || regexp_replace(lower(p_source), '[^a-z0-9]+', '_', 'g');
+    month_start DATE := date_trunc('month', p_month)::date;
+    month_table TEXT := source_table || '_' || to_char(month_start, 'YYYYMM');
+BEGIN
+    IF to_regclass(format('bronze.%I', month_table)) IS NOT NULL THEN
+        RETURN month_table;
+    END IF;
+    PERFORM pg_advisory_xact_lock(hashtext('bronze.ingestion_events'));
+    IF to_regclass(format('bronze.%I', source_table)) IS NULL THEN
+        EXECUTE format(
+            'CREATE TABLE bronze.%I PARTITION OF bronze.ingestion_events FOR VALUES IN (%L) PARTITION BY RANGE (fetched_at)',
+            source_table,
+            p_source
+        );
+    END IF;
+    IF to_regclass(format('bronze.%I', month_table)) IS NULL THEN
+        EXECUTE format(
+            'CREATE TABLE bronze.%I PARTITION OF bronze.%I FOR VALUES FROM (%L) TO (%L)',
+            month_table,
+            source_table,
+            month_start::timestamp AT TIME ZONE 'UTC',
+            (month_start + INTERVAL '1 month')::timestamp AT TIME ZONE 'UTC'
+        );
+        IF p_with_gin THEN
+            EXECUTE format(
+                'CREATE INDEX %I ON bronze.%I USING GIN (payload)',
+                month_table || '_payload_gin',
+                month_table
+            );
+        END IF;
+    END IF;
+    RETURN month_table;
+END
+$$;
+
+CREATE TABLE IF NOT EXISTS bronze.price_rows (
+    uid UUID NOT NULL,
+    source TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    asset TEXT NOT NULL,
+    currency TEXT NOT NULL,
+    series_type TEXT NULL,
+    price_ts TIMESTAMPTZ NOT NULL,
+    price_date DATE NOT NULL,
+    price NUMERIC NOT NULL,
+    fetched_at TIMESTAMPTZ NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_price_rows_uid ON bronze.price_rows (uid);
+CREATE INDEX IF NOT EXISTS idx_price_rows_symbol_date ON bronze.price_rows (symbol, currency, price_date);
+
+-- One row per distinct envelope content (RawEnvelope.content_hash). Writers claim
+-- the hash in the same transaction as the envelope insert and skip envelopes whose
+-- hash is already taken. Kept outside the partitioned table because a unique key
+-- there would have to include source and fetched_at.
+CREATE TABLE IF NOT EXISTS bronze.envelope_hashes (
+    content_hash TEXT PRIMARY KEY,
+    uid UUID NOT NULL,
+    source TEXT NOT NULL,
+    first_seen_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_envelope_hashes_uid ON bronze.envelope_hashes (uid);
+
+-- Written by storage.bronze_compaction: each envelope folded into a compacted
+-- envelope keeps a row here pointing at the envelope that now holds its data.
+CREATE TABLE IF NOT EXISTS bronze.envelope_lineage (
+    superseded_uid UUID PRIMARY KEY,
+    compacted_uid UUID NOT NULL,
+    source TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    currency TEXT NOT NULL,
+    superseded_fetched_at TIMESTAMPTZ NOT NULL,
+    compacted_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_envelope_lineage_compacted_uid ON bronze.envelope_lineage (compacted_uid);
 
 CREATE TABLE IF NOT EXISTS bronze.pdf_nubank_trade_events (
     uid UUID NOT NULL,
@@ -45,6 +133,7 @@ CREATE INDEX IF NOT EXISTS idx_pdf_nubank_trade_events_uid ON bronze.pdf_nubank_
 CREATE INDEX IF NOT EXISTS idx_pdf_nubank_trade_events_file_name ON bronze.pdf_nubank_trade_events (file_name);
 CREATE INDEX IF NOT EXISTS idx_pdf_nubank_trade_events_date ON bronze.pdf_nubank_trade_events (date);
 CREATE INDEX IF NOT EXISTS idx_pdf_nubank_trade_events_fetched_at ON bronze.pdf_nubank_trade_events (fetched_at);
+CREATE INDEX IF NOT EXISTS idx_pdf_nubank_trade_events_request_params ON bronze.pdf_nubank_trade_events USING GIN (request_params jsonb_path_ops);
 
 CREATE TABLE IF NOT EXISTS bronze.nubank_trade_taxes (
     date DATE PRIMARY KEY,
@@ -55,3 +144,18 @@ CREATE TABLE IF NOT EXISTS bronze.nubank_trade_taxes (
 );
 
 CREATE INDEX IF NOT EXISTS idx_nubank_trade_taxes_date ON bronze.nubank_trade_taxes (date);
+
+CREATE TABLE IF NOT EXISTS bronze.load_fingerprints (
+    table_name TEXT PRIMARY KEY,
+    sha256 TEXT NOT NULL,
+    row_count BIGINT NOT NULL,
+    loaded_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS bronze.ingestion_watermarks (
+    job_name TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    asset TEXT NOT NULL,
+    last_price_date DATE NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
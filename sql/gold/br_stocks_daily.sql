@@ -1,4 +1,28 @@
-INSERT INTO gold.br_stocks_daily (
+WITH watermark AS (
+    SELECT COALESCE(
+        (SELECT t.silver_xmin FROM gold.transform_watermarks AS t WHERE t.transform = 'br_stocks_daily'),
+        '0'::xid8
+    ) AS since
+),
+changed AS (
+    SELECT s.*
+    FROM silver.yfinance_prices AS s
+    CROSS JOIN watermark AS w
+    WHERE s.ingest_xid >= w.since
+      AND s.currency = 'brl'
+      AND s.symbol NOT LIKE '^%'
+      AND s.symbol NOT LIKE '%=X'
+      AND s.symbol NOT IN ('IVVB11', 'IVVB11.SA')
+),
+advanced AS (
+    INSERT INTO gold.transform_watermarks (transform, silver_xmin)
+    VALUES ('br_stocks_daily', pg_snapshot_xmin(pg_current_snapshot()))
+    ON CONFLICT (transform)
+    DO UPDATE SET
+        silver_xmin = GREATEST(gold.transform_watermarks.silver_xmin, EXCLUDED.silver_xmin),
+        updated_at = NOW()
+)
+INSERT INTO gold.br_stocks_daily AS g (
     asset,
     currency,
     price,
@@ -18,11 +42,7 @@ SELECT
     s.price_ts,
     'yfinance' AS source,
     s.request_id AS silver_request_id
-FROM silver.yfinance_prices AS s
-WHERE s.currency = 'brl'
-  AND s.symbol NOT LIKE '^%'
-  AND s.symbol NOT LIKE '%=X'
-  AND s.symbol NOT IN ('IVVB11', 'IVVB11.SA')
+FROM changed AS s
 ON CONFLICT (asset, currency, price_date)
 DO UPDATE SET
     price = EXCLUDED.price,
@@ -30,4 +50,6 @@ DO UPDATE SET
     price_ts = EXCLUDED.price_ts,
     source = EXCLUDED.source,
     silver_request_id = EXCLUDED.silver_request_id,
-    ingested_at = NOW();
+    ingested_at = NOW()
+WHERE (g.price, g.price_ts, g.source)
+    IS DISTINCT FROM (EXCLUDED.price, EXCLUDED.price_ts, EXCLUDED.source);
@@ -1,4 +1,24 @@
-INSERT INTO gold.crypto_prices_daily (
+WITH watermark AS (
+    SELECT COALESCE(
+        (SELECT t.silver_xmin FROM gold.transform_watermarks AS t WHERE t.transform = 'crypto_prices_daily'),
+        '0'::xid8
+    ) AS since
+),
+changed AS (
+    SELECT s.*
+    FROM silver.binance_prices AS s
+    CROSS JOIN watermark AS w
+    WHERE s.ingest_xid >= w.since
+),
+advanced AS (
+    INSERT INTO gold.transform_watermarks (transform, silver_xmin)
+    VALUES ('crypto_prices_daily', pg_snapshot_xmin(pg_current_snapshot()))
+    ON CONFLICT (transform)
+    DO UPDATE SET
+        silver_xmin = GREATEST(gold.transform_watermarks.silver_xmin, EXCLUDED.silver_xmin),
+        updated_at = NOW()
+)
+INSERT INTO gold.crypto_prices_daily AS g (
     asset,
     currency,
     price,
@@ -18,7 +38,7 @@ SELECT
     s.price_ts,
     'binance' AS source,
     s.request_id AS silver_request_id
-FROM silver.binance_prices AS s
+FROM changed AS s
 ON CONFLICT (asset, currency, price_date)
 DO UPDATE SET
     price = EXCLUDED.price,
@@ -26,4 +46,6 @@ DO UPDATE SET
     price_ts = EXCLUDED.price_ts,
     source = EXCLUDED.source,
     silver_request_id = EXCLUDED.silver_request_id,
-    ingested_at = NOW();
+    ingested_at = NOW()
+WHERE (g.price, g.price_ts, g.source)
+    IS DISTINCT FROM (EXCLUDED.price, EXCLUDED.price_ts, EXCLUDED.source);
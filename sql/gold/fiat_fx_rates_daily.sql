@@ -1,4 +1,26 @@
-INSERT INTO gold.fiat_fx_rates_daily (
+WITH watermark AS (
+    SELECT COALESCE(
+        (SELECT t.silver_xmin FROM gold.transform_watermarks AS t WHERE t.transform = 'fiat_fx_rates_daily'),
+        '0'::xid8
+    ) AS since
+),
+changed AS (
+    SELECT s.*
+    FROM silver.yfinance_prices AS s
+    CROSS JOIN watermark AS w
+    WHERE s.ingest_xid >= w.since
+      AND s.symbol LIKE '%=X'
+      AND length(replace(s.symbol, '=X', '')) = 6
+),
+advanced AS (
+    INSERT INTO gold.transform_watermarks (transform, silver_xmin)
+    VALUES ('fiat_fx_rates_daily', pg_snapshot_xmin(pg_current_snapshot()))
+    ON CONFLICT (transform)
+    DO UPDATE SET
+        silver_xmin = GREATEST(gold.transform_watermarks.silver_xmin, EXCLUDED.silver_xmin),
+        updated_at = NOW()
+)
+INSERT INTO gold.fiat_fx_rates_daily AS g (
     asset,
     base_currency,
     quote_currency,
@@ -19,13 +41,13 @@ SELECT
     s.price_ts AS rate_ts,
     'yfinance' AS source,
     s.request_id AS silver_request_id
-FROM silver.yfinance_prices AS s
-WHERE s.symbol LIKE '%=X'
-  AND length(replace(s.symbol, '=X', '')) = 6
+FROM changed AS s
 ON CONFLICT (asset, currency, rate_date)
 DO UPDATE SET
     rate = EXCLUDED.rate,
     rate_ts = EXCLUDED.rate_ts,
     source = EXCLUDED.source,
     silver_request_id = EXCLUDED.silver_request_id,
-    ingested_at = NOW();
+    ingested_at = NOW()
+WHERE (g.rate, g.rate_ts, g.source)
+    IS DISTINCT FROM (EXCLUDED.rate, EXCLUDED.rate_ts, EXCLUDED.source);
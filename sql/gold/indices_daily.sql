@@ -1,4 +1,25 @@
-INSERT INTO gold.indices_daily (
+WITH watermark AS (
+    SELECT COALESCE(
+        (SELECT t.silver_xmin FROM gold.transform_watermarks AS t WHERE t.transform = 'indices_daily'),
+        '0'::xid8
+    ) AS since
+),
+changed AS (
+    SELECT s.*
+    FROM silver.yfinance_prices AS s
+    CROSS JOIN watermark AS w
+    WHERE s.ingest_xid >= w.since
+      AND s.symbol LIKE '^%'
+),
+advanced AS (
+    INSERT INTO gold.transform_watermarks (transform, silver_xmin)
+    VALUES ('indices_daily', pg_snapshot_xmin(pg_current_snapshot()))
+    ON CONFLICT (transform)
+    DO UPDATE SET
+        silver_xmin = GREATEST(gold.transform_watermarks.silver_xmin, EXCLUDED.silver_xmin),
+        updated_at = NOW()
+)
+INSERT INTO gold.indices_daily AS g (
     asset,
     currency,
     price,
@@ -15,8 +36,7 @@ SELECT
     s.price_ts,
     'yfinance' AS source,
     s.request_id AS silver_request_id
-FROM silver.yfinance_prices AS s
-WHERE s.symbol LIKE '^%'
+FROM changed AS s
 ON CONFLICT (asset, currency, price_date)
 DO UPDATE SET
     price = EXCLUDED.price,
@@ -25,4 +45,6 @@ DO UPDATE SET
     price_ts = EXCLUDED.price_ts,
     source = EXCLUDED.source,
     silver_request_id = EXCLUDED.silver_request_id,
-    ingested_at = NOW();
+    ingested_at = NOW()
+WHERE (g.price, g.price_ts, g.source)
+    IS DISTINCT FROM (EXCLUDED.price, EXCLUDED.price_ts, EXCLUDED.source);
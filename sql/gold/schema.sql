@@ -95,3 +95,11 @@ CREATE INDEX IF NOT EXISTS idx_gold_nubank_trade_events_batch_id ON gold.nubank_
 CREATE INDEX IF NOT EXISTS idx_gold_nubank_trade_events_ticker ON gold.nubank_trade_events (ticker);
 CREATE INDEX IF NOT EXISTS idx_gold_nubank_trade_events_date ON gold.nubank_trade_events (date);
 CREATE INDEX IF NOT EXISTS idx_gold_nubank_trade_events_fetched_at ON gold.nubank_trade_events (fetched_at);
+
+-- silver_xmin is the xmin of the snapshot the last run read silver with: every
+-- silver row written by a transaction below it was visible to that run.
+CREATE TABLE IF NOT EXISTS gold.transform_watermarks (
+    transform TEXT PRIMARY KEY,
+    silver_xmin XID8 NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
@@ -1,21 +1,66 @@
-WITH price_rows AS (
+WITH new_envelopes AS (
     SELECT
-        e.uid AS request_id,
-        e.request_params->>'symbol' AS symbol,
+        e.uid,
+        e.source,
+        e.request_params,
         e.asset,
         e.currency,
-        (row->>'close')::numeric AS price,
-        to_timestamp((row->>'close_time')::double precision / 1000.0) AS price_ts,
-        to_timestamp((row->>'close_time')::double precision / 1000.0)::date AS price_date,
         e.fetched_at
     FROM bronze.ingestion_events AS e
-    CROSS JOIN LATERAL jsonb_array_elements(e.payload->'rows') AS row
     WHERE e.source = 'binance'
-      AND e.payload ? 'rows'
       AND e.request_params ? 'symbol'
       AND e.currency IS NOT NULL
+      AND NOT EXISTS (
+          SELECT 1
+          FROM silver.processed_envelopes AS p
+          WHERE p.uid = e.uid
+      )
+),
+marked AS (
+    INSERT INTO silver.processed_envelopes (uid, source)
+    SELECT uid, source
+    FROM new_envelopes
+    ON CONFLICT (uid) DO NOTHING
+),
+typed_rows AS (
+    SELECT
+        r.uid AS request_id,
+        r.symbol,
+        r.asset,
+        r.currency,
+        r.price,
+        r.price_ts,
+        r.price_date,
+        r.fetched_at
+    FROM new_envelopes AS e
+    JOIN bronze.price_rows AS r ON r.uid = e.uid
+),
+legacy_rows AS (
+    SELECT
+        e.uid AS request_id,
+        e.request_params->>'symbol' AS symbol,
+        e.asset,
+        e.currency,
+        (row->>'close')::numeric AS price,
+        to_timestamp((row->>'close_time')::double precision / 1000.0) AS price_ts,
+        (to_timestamp((row->>'close_time')::double precision / 1000.0) AT TIME ZONE 'UTC')::date AS price_date,
+        e.fetched_at
+    FROM new_envelopes AS e
+    JOIN bronze.ingestion_events AS b ON b.uid = e.uid
+    CROSS JOIN LATERAL jsonb_array_elements(b.payload->'rows') AS row
+    WHERE b.payload ? 'rows'
+      AND NOT EXISTS (
+          SELECT 1
+          FROM bronze.price_rows AS r
+          WHERE r.uid = e.uid
+      )
+),
+price_rows AS (
+    SELECT * FROM typed_rows
+    UNION ALL
+    SELECT * FROM legacy_rows
 )
-INSERT INTO silver.binance_prices (
+INSERT INTO silver.binance_prices AS s (
     request_id,
     symbol,
     asset,
@@ -43,4 +88,9 @@ DO UPDATE SET
     currency = EXCLUDED.currency,
     request_id = EXCLUDED.request_id,
     price_ts = EXCLUDED.price_ts,
-    fetched_at = EXCLUDED.fetched_at;
+    fetched_at = EXCLUDED.fetched_at,
+    ingested_at = NOW(),
+    ingest_xid = pg_current_xact_id()
+WHERE (EXCLUDED.price_ts, EXCLUDED.fetched_at) >= (s.price_ts, s.fetched_at)
+  AND (s.price, s.asset, s.price_ts, s.fetched_at)
+      IS DISTINCT FROM (EXCLUDED.price, EXCLUDED.asset, EXCLUDED.price_ts, EXCLUDED.fetched_at);
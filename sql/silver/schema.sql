@@ -11,6 +11,7 @@ CREATE TABLE IF NOT EXISTS silver.yfinance_prices (
     series_type TEXT NULL,
     fetched_at TIMESTAMPTZ NOT NULL,
     ingested_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    ingest_xid XID8 NOT NULL DEFAULT pg_current_xact_id(),
     CONSTRAINT yfinance_prices_uniq UNIQUE (symbol, currency, price_date)
 );
 
@@ -19,6 +20,9 @@ CREATE INDEX IF NOT EXISTS idx_yfinance_prices_asset ON silver.yfinance_prices (
 CREATE INDEX IF NOT EXISTS idx_yfinance_prices_price_ts ON silver.yfinance_prices (price_ts);
 CREATE INDEX IF NOT EXISTS idx_yfinance_prices_fetched_at ON silver.yfinance_prices (fetched_at);
 
+ALTER TABLE silver.yfinance_prices ADD COLUMN IF NOT EXISTS ingest_xid XID8 NOT NULL DEFAULT pg_current_xact_id();
+CREATE INDEX IF NOT EXISTS idx_yfinance_prices_ingest_xid ON silver.yfinance_prices (ingest_xid);
+
 CREATE TABLE IF NOT EXISTS silver.binance_prices (
     request_id UUID NOT NULL,
     symbol TEXT NOT NULL,
@@ -29,6 +33,7 @@ CREATE TABLE IF NOT EXISTS silver.binance_prices (
     price_date DATE NOT NULL,
     fetched_at TIMESTAMPTZ NOT NULL,
     ingested_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    ingest_xid XID8 NOT NULL DEFAULT pg_current_xact_id(),
     CONSTRAINT binance_prices_uniq UNIQUE (symbol, currency, price_date)
 );
 
@@ -37,6 +42,9 @@ CREATE INDEX IF NOT EXISTS idx_binance_prices_asset ON silver.binance_prices (as
 CREATE INDEX IF NOT EXISTS idx_binance_prices_price_ts ON silver.binance_prices (price_ts);
 CREATE INDEX IF NOT EXISTS idx_binance_prices_fetched_at ON silver.binance_prices (fetched_at);
 
+ALTER TABLE silver.binance_prices ADD COLUMN IF NOT EXISTS ingest_xid XID8 NOT NULL DEFAULT pg_current_xact_id();
+CREATE INDEX IF NOT EXISTS idx_binance_prices_ingest_xid ON silver.binance_prices (ingest_xid);
+
 
 CREATE TABLE IF NOT EXISTS silver.nubank_trade_events (
     event_id TEXT PRIMARY KEY,
@@ -54,3 +62,11 @@ CREATE INDEX IF NOT EXISTS idx_nubank_trade_events_batch_id ON silver.nubank_tra
 CREATE INDEX IF NOT EXISTS idx_nubank_trade_events_ticker ON silver.nubank_trade_events (ticker);
 CREATE INDEX IF NOT EXISTS idx_nubank_trade_events_date ON silver.nubank_trade_events (date);
 CREATE INDEX IF NOT EXISTS idx_nubank_trade_events_fetched_at ON silver.nubank_trade_events (fetched_at);
+
+CREATE TABLE IF NOT EXISTS silver.processed_envelopes (
+    uid UUID PRIMARY KEY,
+    source TEXT NOT NULL,
+    processed_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_processed_envelopes_source ON silver.processed_envelopes (source);
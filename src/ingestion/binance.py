@@ -1,15 +1,19 @@
 from __future__ import annotations
 
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime, time, timezone
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List
 
-from ingestion.http_client import fetch_json_any
+from ingestion.http_client import HttpClient, fetch_json_any
 from ingestion.models import RawEnvelope
+from ingestion.rate_limit import get_limiter
 
 BINANCE_BASE = "https://api.binance.com/api/v3"
 BINANCE_INTERVAL = "1d"
 BINANCE_LIMIT = 1000
+BINANCE_DAY_MS = 86_400_000
+BINANCE_KLINES_WEIGHT = 2
 
 
 def fetch_klines_daily(
@@ -18,15 +22,74 @@ def fetch_klines_daily(
     end_date: str | None = None,
     quote_currency: str = "usdt",
     asset: str | None = None,
+    client: HttpClient | None = None,
 ) -> List[RawEnvelope]:
+    return list(
+        iter_klines_daily(
+            symbol,
+            start_date,
+            end_date,
+            quote_currency=quote_currency,
+            asset=asset,
+            client=client,
+        )
+    )
+
+
+def iter_klines_daily(
+    symbol: str,
+    start_date: str,
+    end_date: str | None = None,
+    quote_currency: str = "usdt",
+    asset: str | None = None,
+    client: HttpClient | None = None,
+) -> Iterator[RawEnvelope]:
     start = _parse_date(start_date)
     end = _parse_date(end_date) if end_date else date.today()
     if start > end:
         raise ValueError("start_date must be <= end_date")
+    return _iter_pages(
+        symbol,
+        start,
+        end,
+        start_date=start_date,
+        end_date=end_date or end.isoformat(),
+        quote_currency=quote_currency,
+        asset=asset,
+        client=client,
+    )
+
+
+def _iter_pages(
+    symbol: str,
+    start: date,
+    end: date,
+    *,
+    start_date: str,
+    end_date: str,
+    quote_currency: str,
+    asset: str | None,
+    client: HttpClient | None,
+) -> Iterator[RawEnvelope]:
+    if client is None:
+        with HttpClient(
+            pool_size=1,
+            response_hook=get_limiter("binance").observe_headers,
+        ) as owned_client:
+            yield from _iter_pages(
+                symbol,
+                start,
+                end,
+                start_date=start_date,
+                end_date=end_date,
+                quote_currency=quote_currency,
+                asset=asset,
+                client=owned_client,
+            )
+        return
 
     start_ms = _to_epoch_ms(start)
     end_ms = _to_epoch_ms(end) + 86_399_000
-    envelopes: List[RawEnvelope] = []
 
     while start_ms <= end_ms:
         endpoint = f"{BINANCE_BASE}/klines"
@@ -37,40 +100,158 @@ def fetch_klines_daily(
             "endTime": end_ms,
             "limit": BINANCE_LIMIT,
         }
-        payload = fetch_json_any(endpoint, params=params)
-        if not isinstance(payload, list):
-            raise ValueError("Unexpected Binance response shape")
+        payload = _fetch_page(endpoint, params, client)
         if not payload:
             break
 
-        rows = _to_rows(payload)
-        envelope = RawEnvelope(
-            source="binance",
+        yield _build_envelope(
             endpoint=endpoint,
-            request_params={
-                **params,
-                "start_date": start_date,
-                "end_date": end_date or end.isoformat(),
-                "quote_currency": quote_currency,
-            },
-            asset=asset or symbol,
-            currency=quote_currency,
-            uid=str(uuid.uuid4()),
-            fetched_at=RawEnvelope.utc_now_iso(),
-            payload={
-                "symbol": symbol,
-                "interval": BINANCE_INTERVAL,
-                "rows": rows,
-            },
+            params=params,
+            payload=payload,
+            symbol=symbol,
+            start_date=start_date,
+            end_date=end_date,
+            quote_currency=quote_currency,
+            asset=asset,
         )
-        envelopes.append(envelope)
 
+        if len(payload) < BINANCE_LIMIT:
+            break
         last_open = payload[-1][0]
         start_ms = int(last_open) + 1
 
+
+def fetch_klines_daily_concurrent(
+    symbol: str,
+    start_date: str,
+    end_date: str | None = None,
+    quote_currency: str = "usdt",
+    asset: str | None = None,
+    max_concurrency: int = 4,
+    client: HttpClient | None = None,
+) -> List[RawEnvelope]:
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be >= 1")
+    if client is None:
+        with HttpClient(
+            pool_size=max_concurrency,
+            response_hook=get_limiter("binance").observe_headers,
+        ) as owned_client:
+            return fetch_klines_daily_concurrent(
+                symbol,
+                start_date,
+                end_date,
+                quote_currency=quote_currency,
+                asset=asset,
+                max_concurrency=max_concurrency,
+                client=owned_client,
+            )
+
+    start = _parse_date(start_date)
+    end = _parse_date(end_date) if end_date else date.today()
+    if start > end:
+        raise ValueError("start_date must be <= end_date")
+
+    endpoint = f"{BINANCE_BASE}/klines"
+    windows = _split_windows(_to_epoch_ms(start), _to_epoch_ms(end) + 86_399_000)
+    params_list: List[Dict[str, Any]] = [
+        {
+            "symbol": symbol,
+            "interval": BINANCE_INTERVAL,
+            "startTime": window_start,
+            "endTime": window_end,
+            "limit": BINANCE_LIMIT,
+        }
+        for window_start, window_end in windows
+    ]
+
+    with ThreadPoolExecutor(max_workers=min(max_concurrency, len(params_list))) as executor:
+        payloads = list(
+            executor.map(lambda params: _fetch_page(endpoint, params, client), params_list)
+        )
+
+    envelopes: List[RawEnvelope] = []
+    seen_open_times: set[int] = set()
+    for params, payload in zip(params_list, payloads):
+        fresh = [item for item in payload if int(item[0]) not in seen_open_times]
+        seen_open_times.update(int(item[0]) for item in fresh)
+        if not fresh:
+            continue
+        envelopes.append(
+            _build_envelope(
+                endpoint=endpoint,
+                params=params,
+                payload=fresh,
+                symbol=symbol,
+                start_date=start_date,
+                end_date=end_date or end.isoformat(),
+                quote_currency=quote_currency,
+                asset=asset,
+            )
+        )
     return envelopes
 
 
+def _fetch_page(
+    endpoint: str,
+    params: Dict[str, Any],
+    client: HttpClient,
+) -> List[List[Any]]:
+    payload = get_limiter("binance").call(
+        fetch_json_any,
+        endpoint,
+        params=params,
+        client=client,
+        weight=BINANCE_KLINES_WEIGHT,
+    )
+    if not isinstance(payload, list):
+        raise ValueError("Unexpected Binance response shape")
+    return payload
+
+
+def _split_windows(start_ms: int, end_ms: int) -> List[tuple[int, int]]:
+    span = BINANCE_LIMIT * BINANCE_DAY_MS
+    windows: List[tuple[int, int]] = []
+    window_start = start_ms
+    while window_start <= end_ms:
+        window_end = min(window_start + span - 1, end_ms)
+        windows.append((window_start, window_end))
+        window_start = window_end + 1
+    return windows
+
+
+def _build_envelope(
+    *,
+    endpoint: str,
+    params: Dict[str, Any],
+    payload: List[List[Any]],
+    symbol: str,
+    start_date: str,
+    end_date: str,
+    quote_currency: str,
+    asset: str | None,
+) -> RawEnvelope:
+    return RawEnvelope(
+        source="binance",
+        endpoint=endpoint,
+        request_params={
+            **params,
+            "start_date": start_date,
+            "end_date": end_date,
+            "quote_currency": quote_currency,
+        },
+        asset=asset or symbol,
+        currency=quote_currency,
+        uid=str(uuid.uuid4()),
+        fetched_at=RawEnvelope.utc_now_iso(),
+        payload={
+            "symbol": symbol,
+            "interval": BINANCE_INTERVAL,
+            "rows": _to_rows(payload),
+        },
+    )
+
+
 def _to_rows(payload: List[List[Any]]) -> List[Dict[str, Any]]:
     rows: List[Dict[str, Any]] = []
     for item in payload:
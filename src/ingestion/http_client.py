@@ -1,10 +1,23 @@
 from __future__ import annotations
 
+import gzip
+import http.client
+import io
 import json
-from typing import Any, Dict
-from urllib.parse import urlencode
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, Mapping
+from urllib.error import HTTPError
+from urllib.parse import urlencode, urlsplit
 from urllib.request import Request, urlopen
 
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.CannotSendRequest,
+    BrokenPipeError,
+    ConnectionResetError,
+)
+
 
 def _build_url(url: str, params: Dict[str, Any] | None = None) -> str:
     if not params:
@@ -12,12 +25,137 @@ def _build_url(url: str, params: Dict[str, Any] | None = None) -> str:
     return f"{url}?{urlencode(params)}"
 
 
+class HttpClient:
+    """Keep-alive JSON client that pools connections per host.
+
+    Idle connections are kept (up to ``pool_size`` per host) and reused by later
+    requests, so paginated fetches only pay TCP/TLS setup once.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = 4,
+        timeout: int = 30,
+        headers: Dict[str, str] | None = None,
+        response_hook: Callable[[Mapping[str, str]], None] | None = None,
+    ) -> None:
+        if pool_size < 1:
+            raise ValueError("pool_size must be >= 1")
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.headers = {"Accept-Encoding": "gzip", **(headers or {})}
+        self._pools: dict[tuple[str, str, int | None], deque[http.client.HTTPConnection]] = {}
+        self.response_hook = response_hook
+        self._lock = threading.Lock()
+
+    def get_json(
+        self,
+        url: str,
+        params: Dict[str, Any] | None = None,
+        headers: Dict[str, str] | None = None,
+    ) -> Any:
+        parts = urlsplit(_build_url(url, params))
+        if parts.scheme not in {"http", "https"}:
+            raise ValueError(f"Unsupported URL scheme: {parts.scheme}")
+        key = (parts.scheme, parts.hostname or "", parts.port)
+        target = parts.path or "/"
+        if parts.query:
+            target = f"{target}?{parts.query}"
+        request_headers = {**self.headers, **(headers or {})}
+
+        conn, reused = self._acquire(key)
+        try:
+            try:
+                response = self._send(conn, target, request_headers)
+            except _STALE_CONNECTION_ERRORS:
+                if not reused:
+                    raise
+                conn.close()
+                conn = self._connect(key)
+                response = self._send(conn, target, request_headers)
+            if self.response_hook is not None:
+                self.response_hook(response.headers)
+            payload = self._decode(response, url)
+        except BaseException:
+            conn.close()
+            raise
+
+        if response.will_close:
+            conn.close()
+        else:
+            self._release(key, conn)
+        return payload
+
+    def close(self) -> None:
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+        for pool in pools:
+            for conn in pool:
+                conn.close()
+
+    def __enter__(self) -> "HttpClient":
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        self.close()
+
+    def _acquire(
+        self, key: tuple[str, str, int | None]
+    ) -> tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool:
+                return pool.pop(), True
+        return self._connect(key), False
+
+    def _release(self, key: tuple[str, str, int | None], conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            pool = self._pools.setdefault(key, deque())
+            if len(pool) < self.pool_size:
+                pool.append(conn)
+                return
+        conn.close()
+
+    def _connect(self, key: tuple[str, str, int | None]) -> http.client.HTTPConnection:
+        scheme, host, port = key
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, timeout=self.timeout)
+        return http.client.HTTPConnection(host, port, timeout=self.timeout)
+
+    @staticmethod
+    def _send(
+        conn: http.client.HTTPConnection,
+        target: str,
+        headers: Dict[str, str],
+    ) -> http.client.HTTPResponse:
+        conn.request("GET", target, headers=headers)
+        return conn.getresponse()
+
+    @staticmethod
+    def _decode(response: http.client.HTTPResponse, url: str) -> Any:
+        if response.status >= 400:
+            body = response.read()
+            raise HTTPError(url, response.status, response.reason, response.headers, io.BytesIO(body))
+
+        if response.getheader("Content-Encoding", "").lower() == "gzip":
+            with gzip.GzipFile(fileobj=response) as stream:
+                payload = json.load(stream)
+        else:
+            payload = json.load(response)
+        response.read()
+        return payload
+
+
 def fetch_json(
     url: str,
     params: Dict[str, Any] | None = None,
     headers: Dict[str, str] | None = None,
     timeout: int = 30,
+    client: HttpClient | None = None,
 ) -> Dict[str, Any]:
+    if client is not None:
+        return client.get_json(url, params=params, headers=headers)
     full_url = _build_url(url, params)
     req = Request(full_url, headers=headers or {})
     with urlopen(req, timeout=timeout) as response:
@@ -30,7 +168,10 @@ def fetch_json_any(
     params: Dict[str, Any] | None = None,
     headers: Dict[str, str] | None = None,
     timeout: int = 30,
+    client: HttpClient | None = None,
 ) -> Any:
+    if client is not None:
+        return client.get_json(url, params=params, headers=headers)
     full_url = _build_url(url, params)
     req = Request(full_url, headers=headers or {})
     with urlopen(req, timeout=timeout) as response:
@@ -1,10 +1,16 @@
 from __future__ import annotations
 
+import hashlib
+import json
 from dataclasses import dataclass
 from datetime import date, datetime, timezone
 from decimal import Decimal
 from typing import Any
 
+# Fetch-window bounds: two requests for the same series that return the same
+# rows are the same content, whatever window was asked for.
+WINDOW_PARAMS = frozenset({"start_date", "end_date", "startTime", "endTime", "limit"})
+
 
 @dataclass(frozen=True)
 class RawEnvelope:
@@ -21,6 +27,23 @@ class RawEnvelope:
     def utc_now_iso() -> str:
         return datetime.now(timezone.utc).isoformat()
 
+    def content_hash(self) -> str:
+        """SHA-256 over the series identity and payload rows.
+
+        The identity is the source, currency and request params minus
+        ``WINDOW_PARAMS``; uid and fetch time are ignored.
+        """
+        rows = self.payload.get("rows", self.payload) if isinstance(self.payload, dict) else self.payload
+        identity = {key: value for key, value in self.request_params.items() if key not in WINDOW_PARAMS}
+        canonical = json.dumps(
+            {"source": self.source, "currency": self.currency, "series": identity, "rows": rows},
+            sort_keys=True,
+            separators=(",", ":"),
+            ensure_ascii=False,
+            default=str,
+        )
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
     def to_dict(self) -> dict[str, Any]:
         return {
             "source": self.source,
@@ -1,11 +1,22 @@
+import glob
 import os
 import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date
 from pathlib import Path
+from typing import Any
 
 import pandas as pd
 import pdfplumber
 
-from storage.raw_postgres import append_dataframe_to_bronze, overwrite_dataframe_in_bronze
+from storage.parse_cache import file_sha256, read_cached_rows, write_cached_rows
+from storage.raw_postgres import (
+    append_missing_dataframes_to_bronze,
+    find_bronze_batch,
+    sync_dataframe_to_bronze,
+)
 
 TABLE_COLUMNS = [
     "mercado",
@@ -43,6 +54,46 @@ TAXES_COLUMNS = [
 
 TAXES_CSV_PATH = Path(__file__).resolve().parents[2] / "sql" / "gold" / "manual_backfills" / "taxes.csv"
 
+DEFAULT_PARSE_WORKERS = 4
+
+# Bump whenever a parser change can alter the rows extracted from the same PDF;
+# cached parses are keyed by file SHA-256 plus this version.
+PARSER_VERSION = "3"
+PARSE_CACHE_NAMESPACE = "nubank_trading_notes"
+# request_params that identify a loaded note; the same PDF under another path is the same batch.
+NOTE_BATCH_KEY = ("sha256", "date", "parser_version")
+
+FILE_NAME_DATE_PATTERNS = [
+    (re.compile(r"(?<!\d)(\d{4})[-_.]?(\d{2})[-_.]?(\d{2})(?!\d)"), ("year", "month", "day")),
+    (re.compile(r"(?<!\d)(\d{2})[-_.](\d{2})[-_.](\d{4})(?!\d)"), ("day", "month", "year")),
+]
+
+HEADER_DATE_PATTERN = re.compile(r"Data\s+preg[aã]o[\s\S]{0,80}?(\d{2})/(\d{2})/(\d{4})", re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class TaxesSync:
+    sha256: str
+    skipped: bool
+    changed_dates: tuple[date, ...] = ()
+
+
+@dataclass(frozen=True)
+class PageTiming:
+    page_number: int
+    trade_page: bool
+    rows: int
+    seconds: float
+
+
+@dataclass(frozen=True)
+class TradingNoteFile:
+    path: str
+    date: str
+    rows: int
+    uid: str | None
+    page_timings: tuple[PageTiming, ...] = ()
+
 
 def _is_header_row(row: list[object | None]) -> bool:
     if len(row) < 2:
@@ -71,10 +122,24 @@ TRADE_LINE_NO_TITLE_PATTERN = re.compile(
 
 TICKER_HINT_PATTERN = re.compile(r"\b[A-Za-z]{4,6}[0-9]{1,2}F?\b")
 
+TITLE_CONTINUATION_PATTERN = re.compile(r"[A-Za-z0-9 ]{1,20}")
+
+# A page yields rows only if its glyphs (whitespace removed, upper-cased) hold one
+# of these: text-line trades start with BOVESPA, and the trades table, whose rows
+# are kept for any non-empty "mercado", sits under the "Negócios realizados" header.
+TRADE_PAGE_MARKERS = ("BOVESPA", "NEGÓCIOSREALIZADOS", "NEGOCIOSREALIZADOS")
+
+# Words whose tops differ by at most this many points share a text line,
+# matching pdfplumber's default ``y_tolerance``.
+LINE_TOLERANCE = 3
+
+
+def _normalize_line(line: str) -> str:
+    return " ".join(line.split())
+
 
 def _parse_trade_line(line: str) -> list[str] | None:
-    compact = re.sub(r"\s+", " ", line).strip()
-    match = TRADE_LINE_PATTERN.match(compact)
+    match = TRADE_LINE_PATTERN.match(line)
     if not match:
         return None
 
@@ -93,13 +158,13 @@ def _parse_trade_line(line: str) -> list[str] | None:
 
 
 def _looks_like_market_line(line: str) -> bool:
-    return re.sub(r"\s+", " ", line).strip().upper().startswith("BOVESPA ")
+    return line.upper().startswith("BOVESPA ")
 
 
 def _infer_title_from_context(lines: list[str], line_index: int) -> str:
     anchor: str | None = None
     for back in range(line_index - 1, max(-1, line_index - 4), -1):
-        candidate = re.sub(r"\s+", " ", lines[back]).strip()
+        candidate = lines[back]
         if not candidate:
             continue
         if _looks_like_market_line(candidate):
@@ -114,12 +179,12 @@ def _infer_title_from_context(lines: list[str], line_index: int) -> str:
     title_parts: list[str] = [anchor]
 
     if line_index + 1 < len(lines):
-        candidate = re.sub(r"\s+", " ", lines[line_index + 1]).strip()
+        candidate = lines[line_index + 1]
         if (
             candidate
             and not _looks_like_market_line(candidate)
             and not TICKER_HINT_PATTERN.search(candidate)
-            and re.fullmatch(r"[A-Za-z0-9 ]{1,20}", candidate)
+            and TITLE_CONTINUATION_PATTERN.fullmatch(candidate)
         ):
             title_parts.append(candidate)
 
@@ -127,7 +192,7 @@ def _infer_title_from_context(lines: list[str], line_index: int) -> str:
 
 
 def _parse_trade_line_with_context(lines: list[str], line_index: int) -> list[str] | None:
-    line = re.sub(r"\s+", " ", lines[line_index]).strip()
+    line = lines[line_index]
     parsed = _parse_trade_line(line)
     if parsed is not None:
         return parsed
@@ -168,13 +233,8 @@ def _pick_better_row(current: list[str], candidate: list[str]) -> list[str]:
     return candidate if candidate_score > current_score else current
 
 
-def _extract_rows_from_text(page: object) -> list[list[str]]:
-    extractor = getattr(page, "extract_text", None)
-    if not callable(extractor):
-        return []
-
-    text = extractor() or ""
-    lines = [line for line in text.splitlines() if line.strip()]
+def _rows_from_lines(lines: list[str]) -> list[list[str]]:
+    """Trade rows from whitespace-normalized, non-empty text lines."""
     rows: list[list[str]] = []
     for index in range(len(lines)):
         parsed = _parse_trade_line_with_context(lines, index)
@@ -183,6 +243,66 @@ def _extract_rows_from_text(page: object) -> list[list[str]]:
     return rows
 
 
+def _word_lines(words: list[dict[str, Any]]) -> list[str]:
+    lines: list[list[dict[str, Any]]] = []
+    line_top: float | None = None
+    for word in sorted(words, key=lambda item: (item["top"], item["x0"])):
+        if line_top is None or word["top"] - line_top > LINE_TOLERANCE:
+            lines.append([])
+            line_top = word["top"]
+        lines[-1].append(word)
+    return [" ".join(word["text"] for word in sorted(line, key=lambda item: item["x0"])) for line in lines]
+
+
+def _cell_text(words: list[dict[str, Any]], bbox: tuple[float, float, float, float]) -> str:
+    x0, top, x1, bottom = bbox
+    return " ".join(
+        word["text"]
+        for word in words
+        if x0 <= (word["x0"] + word["x1"]) / 2 < x1 and top <= (word["top"] + word["bottom"]) / 2 < bottom
+    )
+
+
+def _table_rows_from_words(tables: list[Any], words: list[dict[str, Any]]) -> list[list[object | None]]:
+    rows: list[list[object | None]] = []
+    for table in tables:
+        x0, top, x1, bottom = table.bbox
+        table_words = [word for word in words if x0 <= word["x0"] and word["x1"] <= x1 and top <= word["top"] < bottom]
+        for row in table.rows:
+            cells = [None if bbox is None else _cell_text(table_words, bbox) for bbox in row.cells]
+            if any(cells):
+                rows.append(list(cells[: len(TABLE_COLUMNS)]))
+    return rows
+
+
+def _is_trade_page(page: Any) -> bool:
+    """Cheap pre-scan over the page's glyphs; pages without ``chars`` are always searched."""
+    chars = getattr(page, "chars", None)
+    if chars is None:
+        return True
+    compact = "".join(char["text"] for char in chars if not char["text"].isspace()).upper()
+    return any(marker in compact for marker in TRADE_PAGE_MARKERS)
+
+
+def _page_rows(page: Any) -> list[list[object | None]] | None:
+    """Trade rows of one page, or ``None`` when the pre-scan skipped it."""
+    if not _is_trade_page(page):
+        return None
+    return _single_pass_rows(page)
+
+
+def _single_pass_rows(page: Any) -> list[list[object | None]]:
+    """Trade rows of one page from a single word-layout pass.
+
+    Words are extracted once and reused for both the text lines and the table
+    cells (``find_tables`` only locates cell boxes from the ruling lines), so
+    pdfplumber never re-runs text layout per table cell.
+    """
+    words = page.extract_words()
+    table_rows = _table_rows_from_words(page.find_tables(), words)
+    return _merge_rows(_rows_from_lines(_word_lines(words)), table_rows)
+
+
 def _merge_rows(text_rows: list[list[str]], table_rows: list[list[object | None]]) -> list[list[object | None]]:
     merged: dict[tuple[str, str, str, str, str, str], list[str]] = {}
 
@@ -203,32 +323,48 @@ def _merge_rows(text_rows: list[list[str]], table_rows: list[list[object | None]
     return list(merged.values())
 
 
-def _extract_rows(path: str) -> list[list[object | None]]:
+def _extract_rows(path: str, page_timings: list[PageTiming] | None = None) -> list[list[object | None]]:
     rows: list[list[object | None]] = []
     with pdfplumber.open(path) as pdf:
-        for page in pdf.pages:
-            page_table_rows: list[list[object | None]] = []
-            tables = page.extract_tables() or []
-            for table in tables:
-                for row in table:
-                    if row and any(cell is not None and str(cell).strip() for cell in row):
-                        page_table_rows.append(list(row[: len(TABLE_COLUMNS)]))
-            page_text_rows = _extract_rows_from_text(page)
-            rows.extend(_merge_rows(page_text_rows, page_table_rows))
+        for page_number, page in enumerate(pdf.pages, start=1):
+            started = time.perf_counter()
+            page_rows = _page_rows(page)
+            rows.extend(page_rows or [])
+            if page_timings is not None:
+                page_timings.append(
+                    PageTiming(
+                        page_number=page_number,
+                        trade_page=page_rows is not None,
+                        rows=len(page_rows or []),
+                        seconds=time.perf_counter() - started,
+                    )
+                )
     return rows
 
 
+def _parse_table_rows(path: str, page_timings: list[PageTiming] | None = None) -> pd.DataFrame:
+    raw_rows = _extract_rows(path, page_timings)
+    rows = [_normalize_row(row) for row in raw_rows if not _is_header_row(row)]
+    frame = pd.DataFrame(rows, columns=TABLE_COLUMNS)
+    return frame[frame["mercado"].str.strip() != ""].reset_index(drop=True)
+
+
 def parse_nubank_trade_notes(
     path: str,
     date: str,
+    sha256: str | None = None,
+    page_timings: list[PageTiming] | None = None,
 ) -> pd.DataFrame:
-    raw_rows = _extract_rows(path)
-    if not raw_rows:
-        return pd.DataFrame()
+    """Parse a note, reusing the cached rows of a byte-identical file parsed by this ``PARSER_VERSION``.
 
-    rows = [_normalize_row(row) for row in raw_rows if not _is_header_row(row)]
-    frame = pd.DataFrame(rows, columns=TABLE_COLUMNS)
-    frame = frame[frame["mercado"].str.strip() != ""]
+    When ``page_timings`` is given, one ``PageTiming`` per page is appended to
+    it; a cache hit appends nothing.
+    """
+    digest = sha256 or file_sha256(path)
+    frame = read_cached_rows(PARSE_CACHE_NAMESPACE, digest, PARSER_VERSION)
+    if frame is None:
+        frame = _parse_table_rows(path, page_timings)
+        write_cached_rows(PARSE_CACHE_NAMESPACE, digest, PARSER_VERSION, frame)
 
     if frame.empty:
         return pd.DataFrame()
@@ -239,29 +375,54 @@ def parse_nubank_trade_notes(
     return frame[BRONZE_COLUMNS]
 
 
+def note_request_params(path: str, date: str, sha256: str) -> dict[str, object]:
+    return {"pdf_path": path, "date": str(date), "sha256": sha256, "parser_version": PARSER_VERSION}
+
+
 def ingest_nubank_trading_notes(
     path: str,
     date: str,
+    page_timings: list[PageTiming] | None = None,
 ) -> int:
-    ingest_nubank_taxes_overwrite()
+    """Load one note into bronze; a note already loaded with the same content, date and parser is skipped.
+
+    Taxes are not synced here; callers run ``ingest_nubank_taxes`` once per run.
+    """
+    digest = file_sha256(path)
+    request_params = note_request_params(path, date, digest)
+    if find_bronze_batch("pdf_nubank_trade_events", _batch_key(request_params)) is not None:
+        return 0
 
     df = parse_nubank_trade_notes(
         path,
         date,
+        sha256=digest,
+        page_timings=page_timings,
     )
     if df.empty:
         return 0
 
-    return append_dataframe_to_bronze(
-        df,
+    (uid,) = append_missing_dataframes_to_bronze(
+        [(df, request_params)],
         "pdf_nubank_trade_events",
+        key_params=NOTE_BATCH_KEY,
         source="nubank_trading_notes_pdf",
         endpoint="pdfplumber.extract_tables",
-        request_params={"pdf_path": path},
     )
+    return len(df) if uid is not None else 0
+
+
+def _batch_key(request_params: dict[str, object]) -> dict[str, object]:
+    return {key: request_params[key] for key in NOTE_BATCH_KEY}
+
 
+def ingest_nubank_taxes(csv_path: str | Path | None = None) -> TaxesSync:
+    """Sync ``bronze.nubank_trade_taxes`` with the taxes CSV, rewriting only the dates that differ.
 
-def ingest_nubank_taxes_overwrite(csv_path: str | Path | None = None) -> int:
+    An unchanged CSV (same SHA-256 as the last sync) is not read into the
+    table at all. Dates removed from the CSV are deleted and reported as
+    changed.
+    """
     path = Path(csv_path) if csv_path is not None else TAXES_CSV_PATH
     if not path.exists():
         raise FileNotFoundError(f"Missing taxes CSV file: {path}")
@@ -278,7 +439,104 @@ def ingest_nubank_taxes_overwrite(csv_path: str | Path | None = None) -> int:
     frame["emolumento"] = pd.to_numeric(frame["emolumento"], errors="raise")
     frame["transf_ativos"] = pd.to_numeric(frame["transf_ativos"], errors="raise")
 
-    return overwrite_dataframe_in_bronze(
+    digest = file_sha256(path)
+    changed = sync_dataframe_to_bronze(
         frame,
         "nubank_trade_taxes",
+        ["date"],
+        fingerprint=digest,
     )
+    if changed is None:
+        return TaxesSync(sha256=digest, skipped=True)
+    return TaxesSync(sha256=digest, skipped=False, changed_dates=tuple(key[0] for key in changed))
+
+
+def find_trading_note_files(source: str) -> list[str]:
+    """PDFs in ``source`` when it is a directory, otherwise the files matching the glob."""
+    if os.path.isdir(source):
+        return sorted(str(path) for path in Path(source).iterdir() if path.suffix.lower() == ".pdf")
+    return sorted(path for path in glob.glob(source, recursive=True) if os.path.isfile(path))
+
+
+def infer_note_date(path: str) -> date | None:
+    """Trading date from the file name, falling back to the note's "Data pregão" header."""
+    name = os.path.basename(path)
+    for pattern, order in FILE_NAME_DATE_PATTERNS:
+        for match in pattern.finditer(name):
+            parts = dict(zip(order, (int(group) for group in match.groups())))
+            try:
+                return date(parts["year"], parts["month"], parts["day"])
+            except ValueError:
+                continue
+
+    with pdfplumber.open(path) as pdf:
+        text = (pdf.pages[0].extract_text() or "") if pdf.pages else ""
+    match = HEADER_DATE_PATTERN.search(text)
+    if match is None:
+        return None
+    day, month, year = (int(group) for group in match.groups())
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def ingest_nubank_trading_notes_batch(
+    source: str,
+    max_workers: int = DEFAULT_PARSE_WORKERS,
+) -> list[TradingNoteFile]:
+    """Parse every note matched by ``source`` in a process pool and load them in one transaction.
+
+    Each file keeps its own bronze batch uid. Notes already in bronze with the
+    same content, date and parser version, including copies of a note earlier
+    in the same batch, keep the existing uid and load no rows. Nothing is
+    loaded if any file's date cannot be inferred. Taxes are not synced here;
+    callers run ``ingest_nubank_taxes`` once the notes load.
+    """
+    if max_workers < 1:
+        raise ValueError("max_workers must be >= 1")
+    paths = find_trading_note_files(source)
+    if not paths:
+        raise FileNotFoundError(f"No trading note PDFs match: {source}")
+
+    if max_workers == 1:
+        parsed = [_parse_note_file(path) for path in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(paths))) as executor:
+            parsed = list(executor.map(_parse_note_file, paths))
+
+    undated = [path for path, note_date, _, _, _ in parsed if note_date is None]
+    if undated:
+        raise ValueError(f"Could not infer the trading date of: {', '.join(undated)}")
+
+    notes = [
+        (path, note_date, note_request_params(path, note_date, digest), frame, page_timings)
+        for path, note_date, digest, frame, page_timings in parsed
+    ]
+    uids = append_missing_dataframes_to_bronze(
+        [(frame, request_params) for _, _, request_params, frame, _ in notes],
+        "pdf_nubank_trade_events",
+        key_params=NOTE_BATCH_KEY,
+        source="nubank_trading_notes_pdf",
+        endpoint="pdfplumber.extract_tables",
+    )
+    results: list[TradingNoteFile] = []
+    for (path, note_date, request_params, frame, page_timings), uid in zip(notes, uids):
+        if uid is not None:
+            rows = len(frame)
+        else:
+            rows, uid = 0, find_bronze_batch("pdf_nubank_trade_events", _batch_key(request_params))
+        results.append(
+            TradingNoteFile(path=path, date=note_date, rows=rows, uid=uid, page_timings=tuple(page_timings))
+        )
+    return results
+
+
+def _parse_note_file(path: str) -> tuple[str, str | None, str, pd.DataFrame, list[PageTiming]]:
+    digest = file_sha256(path)
+    note_date = infer_note_date(path)
+    page_timings: list[PageTiming] = []
+    if note_date is None:
+        return path, None, digest, pd.DataFrame(), page_timings
+    frame = parse_nubank_trade_notes(path, note_date.isoformat(), sha256=digest, page_timings=page_timings)
+    return path, note_date.isoformat(), digest, frame, page_timings
@@ -1,33 +1,65 @@
 from __future__ import annotations
 
 import os
-from typing import Iterable, Literal
+from typing import Iterable, Iterator, Literal
 
 from ingestion.models import RawEnvelope
-from storage.raw_file_store import write_envelopes
+from storage.raw_file_store import flush_segments, write_envelopes
 from storage.raw_postgres import insert_envelopes
 
 Sink = Literal["file", "postgres", "both", "none"]
 
+# Batches are cut by payload row count, so one full Binance page (1000 rows)
+# reaches the sinks as soon as it has been fetched.
+STREAM_BATCH_ROWS = 1000
+
 
 def inject_envelopes(
     envelopes: Iterable[RawEnvelope],
     category: str,
     sink: Sink | None = None,
+    batch_rows: int = STREAM_BATCH_ROWS,
 ) -> Sink:
     target = sink or os.environ.get("FINANCES_HUB_SINK", "none")
     if target not in {"file", "postgres", "both", "none"}:
         raise ValueError(
             "FINANCES_HUB_SINK must be one of: file, postgres, both, none."
         )
+    if batch_rows < 1:
+        raise ValueError("batch_rows must be >= 1")
 
-    if target in {"file", "both"}:
-        write_envelopes(category=category, envelopes=envelopes)
+    for batch in _micro_batches(envelopes, batch_rows):
+        if target in {"file", "both"}:
+            write_envelopes(category=category, envelopes=batch)
 
-    if target in {"postgres", "both"}:
-        insert_envelopes(envelopes)
+        if target in {"postgres", "both"}:
+            insert_envelopes(batch)
+
+    if target in {"file", "both"}:
+        flush_segments(category)
 
     return target
 
 
+def _micro_batches(
+    envelopes: Iterable[RawEnvelope],
+    batch_rows: int,
+) -> Iterator[list[RawEnvelope]]:
+    batch: list[RawEnvelope] = []
+    rows = 0
+    for envelope in envelopes:
+        batch.append(envelope)
+        rows += _payload_rows(envelope)
+        if rows >= batch_rows:
+            yield batch
+            batch, rows = [], 0
+    if batch:
+        yield batch
+
+
+def _payload_rows(envelope: RawEnvelope) -> int:
+    rows = envelope.payload.get("rows") if isinstance(envelope.payload, dict) else envelope.payload
+    return len(rows) if isinstance(rows, list) else 1
+
+
 persist_envelopes = inject_envelopes
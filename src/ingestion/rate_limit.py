@@ -0,0 +1,320 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Mapping, TypeVar
+from urllib.error import HTTPError, URLError
+
+T = TypeVar("T")
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+BAN_STATUS = 418
+BINANCE_WEIGHT_HEADER = "X-MBX-USED-WEIGHT-1M"
+WEIGHT_WINDOW_SECONDS = 60.0
+
+DEFAULT_LIMITS: dict[str, dict[str, Any]] = {
+    "binance": {
+        "rate": 10.0,
+        "burst": 20.0,
+        "weight_header": BINANCE_WEIGHT_HEADER,
+        "weight_limit": 6000,
+    },
+    "yfinance": {
+        "rate": 2.0,
+        "burst": 4.0,
+    },
+}
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+class TokenBucket:
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("rate and capacity must be > 0")
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> float:
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        tokens = min(tokens, self.capacity)
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            self._sleep(wait)
+
+    def _refill(self) -> None:
+        now = self._clock()
+        elapsed = max(0.0, now - self._updated)
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_seconds: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._clock = clock
+        self._failures = 0
+        self._open_until: float | None = None
+        self._probe_owner: int | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def remaining_open_seconds(self) -> float:
+        with self._lock:
+            if self._open_until is None:
+                return 0.0
+            return max(0.0, self._open_until - self._clock())
+
+    def before_call(self) -> None:
+        """Reject calls while open; while half-open, admit a single probing thread."""
+        with self._lock:
+            state = self._state()
+            if state == "open":
+                remaining = self._open_until - self._clock()
+                raise CircuitOpenError(f"circuit open for another {remaining:.1f}s")
+            if state == "half_open":
+                caller = threading.get_ident()
+                if self._probe_owner is None:
+                    self._probe_owner = caller
+                elif self._probe_owner != caller:
+                    raise CircuitOpenError("circuit half-open, probe already in flight")
+
+    def release_probe(self) -> None:
+        with self._lock:
+            if self._probe_owner == threading.get_ident():
+                self._probe_owner = None
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._open_until = None
+            self._probe_owner = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self.failure_threshold:
+                self._open_until = self._clock() + self.reset_seconds
+                self._probe_owner = None
+
+    def trip(self, seconds: float) -> None:
+        with self._lock:
+            self._failures = max(self._failures, self.failure_threshold)
+            self._open_until = self._clock() + seconds
+            self._probe_owner = None
+
+    def _state(self) -> str:
+        if self._open_until is None:
+            return "closed"
+        if self._clock() < self._open_until:
+            return "open"
+        return "half_open"
+
+
+@dataclass(frozen=True)
+class LimiterState:
+    provider: str
+    available_tokens: float
+    used_weight: int | None
+    weight_limit: int | None
+    circuit: str
+    cooldown_seconds: float
+
+
+class ProviderLimiter:
+    """Token bucket, backoff/retry and circuit breaker for one provider.
+
+    Retries throttling (429) and 5xx responses with jittered exponential backoff,
+    honouring ``Retry-After``. A 418 (IP ban) opens the circuit straight away.
+    When ``weight_header`` is set, the provider's used-weight header pauses
+    callers for one weight window before the reported limit is hit. Once the
+    circuit's reset period elapses, one caller probes the provider while the
+    others keep failing fast.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        *,
+        rate: float,
+        burst: float,
+        max_retries: int = 5,
+        base_delay: float = 0.5,
+        max_delay: float = 60.0,
+        failure_threshold: int = 5,
+        reset_seconds: float = 60.0,
+        weight_header: str | None = None,
+        weight_limit: int | None = None,
+        weight_headroom: float = 0.9,
+        retry_on: tuple[type[BaseException], ...] = (),
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+        rng: Callable[[], float] = random.random,
+    ) -> None:
+        self.provider = provider
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.reset_seconds = reset_seconds
+        self.weight_header = weight_header
+        self.weight_limit = weight_limit
+        self.weight_headroom = weight_headroom
+        self.retry_on = (URLError, ConnectionError, TimeoutError, *retry_on)
+        self.bucket = TokenBucket(rate, burst, clock=clock, sleep=sleep)
+        self.breaker = CircuitBreaker(failure_threshold, reset_seconds, clock=clock)
+        self._clock = clock
+        self._sleep = sleep
+        self._rng = rng
+        self._used_weight: int | None = None
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def call(self, fn: Callable[..., T], *args: Any, weight: float = 1.0, **kwargs: Any) -> T:
+        try:
+            return self._call(fn, args, kwargs, weight)
+        finally:
+            self.breaker.release_probe()
+
+    def _call(self, fn: Callable[..., T], args: tuple[Any, ...], kwargs: dict[str, Any], weight: float) -> T:
+        for attempt in range(self.max_retries + 1):
+            self.breaker.before_call()
+            self._wait_for_cooldown()
+            self.bucket.acquire(weight)
+            try:
+                result = fn(*args, **kwargs)
+            except HTTPError as exc:
+                self.observe_headers(exc.headers)
+                retry_after = _retry_after(exc.headers)
+                if exc.code == BAN_STATUS:
+                    self.breaker.trip(retry_after if retry_after is not None else self.reset_seconds)
+                    raise
+                if exc.code not in RETRYABLE_STATUSES:
+                    raise
+                if attempt == self.max_retries:
+                    self.breaker.record_failure()
+                    raise
+                delay = retry_after if retry_after is not None else self._backoff(attempt)
+                if exc.code == 429:
+                    self._pause(delay)
+            except self.retry_on:
+                if attempt == self.max_retries:
+                    self.breaker.record_failure()
+                    raise
+                delay = self._backoff(attempt)
+            else:
+                self.breaker.record_success()
+                return result
+            self._sleep(delay)
+        raise AssertionError("unreachable")
+
+    def observe_headers(self, headers: Mapping[str, str] | None) -> None:
+        if headers is None or self.weight_header is None:
+            return
+        value = headers.get(self.weight_header)
+        if value is None:
+            return
+        try:
+            used = int(value)
+        except ValueError:
+            return
+        with self._lock:
+            self._used_weight = used
+        if self.weight_limit and used >= self.weight_limit * self.weight_headroom:
+            self._pause(WEIGHT_WINDOW_SECONDS)
+
+    def state(self) -> LimiterState:
+        with self._lock:
+            paused = max(0.0, self._paused_until - self._clock())
+            used_weight = self._used_weight
+        return LimiterState(
+            provider=self.provider,
+            available_tokens=self.bucket.available,
+            used_weight=used_weight,
+            weight_limit=self.weight_limit,
+            circuit=self.breaker.state,
+            cooldown_seconds=max(paused, self.breaker.remaining_open_seconds()),
+        )
+
+    def _backoff(self, attempt: int) -> float:
+        return min(self.max_delay, self.base_delay * (2**attempt)) * self._rng()
+
+    def _pause(self, seconds: float) -> None:
+        with self._lock:
+            self._paused_until = max(self._paused_until, self._clock() + seconds)
+
+    def _wait_for_cooldown(self) -> None:
+        with self._lock:
+            remaining = self._paused_until - self._clock()
+        if remaining > 0:
+            self._sleep(remaining)
+
+
+def _retry_after(headers: Mapping[str, str] | None) -> float | None:
+    if headers is None:
+        return None
+    value = headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+_LIMITERS: dict[str, ProviderLimiter] = {}
+_LIMITERS_LOCK = threading.Lock()
+
+
+def get_limiter(provider: str) -> ProviderLimiter:
+    with _LIMITERS_LOCK:
+        limiter = _LIMITERS.get(provider)
+        if limiter is None:
+            limiter = ProviderLimiter(provider, **DEFAULT_LIMITS.get(provider, {"rate": 5.0, "burst": 10.0}))
+            _LIMITERS[provider] = limiter
+        return limiter
+
+
+def register_limiter(limiter: ProviderLimiter) -> None:
+    with _LIMITERS_LOCK:
+        _LIMITERS[limiter.provider] = limiter
+
+
+def limiter_states() -> dict[str, LimiterState]:
+    with _LIMITERS_LOCK:
+        limiters = list(_LIMITERS.values())
+    return {limiter.provider: limiter.state() for limiter in limiters}
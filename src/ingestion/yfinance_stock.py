@@ -1,12 +1,23 @@
 from __future__ import annotations
 
 import uuid
+from dataclasses import dataclass
 from typing import Any
 
 import pandas as pd
 import yfinance as yf
 
 from ingestion.models import RawEnvelope
+from ingestion.rate_limit import get_limiter
+
+YFINANCE_BATCH_SIZE = 20
+
+
+@dataclass(frozen=True)
+class YFinanceSymbol:
+    symbol: str
+    currency: str = "usd"
+    asset: str | None = None
 
 
 def _to_rows(df: pd.DataFrame) -> list[dict[str, Any]]:
@@ -24,7 +35,7 @@ def fetch_close_prices(
     asset: str | None = None,
 ) -> list[RawEnvelope]:
     ticker = yf.Ticker(symbol)
-    hist = ticker.history(start=start_date, end=end_date)
+    hist = get_limiter("yfinance").call(ticker.history, start=start_date, end=end_date)
 
     if hist.empty:
         return []
@@ -53,6 +64,78 @@ def fetch_close_prices(
     return [envelope]
 
 
+def fetch_close_prices_batch(
+    symbols: list[YFinanceSymbol],
+    start_date: str,
+    end_date: str,
+    chunk_size: int = YFINANCE_BATCH_SIZE,
+) -> list[RawEnvelope]:
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be >= 1")
+
+    envelopes: list[RawEnvelope] = []
+    for offset in range(0, len(symbols), chunk_size):
+        chunk = symbols[offset : offset + chunk_size]
+        tickers = [item.symbol for item in chunk]
+        frame = get_limiter("yfinance").call(
+            yf.download,
+            tickers=tickers,
+            start=start_date,
+            end=end_date,
+            auto_adjust=True,
+            actions=False,
+            group_by="column",
+            progress=False,
+        )
+        closes = _split_closes(frame, tickers)
+        for item in chunk:
+            series = closes.get(item.symbol)
+            if series is None or series.empty:
+                continue
+            envelopes.append(
+                RawEnvelope(
+                    source="yfinance",
+                    endpoint="yfinance.download",
+                    request_params={
+                        "symbol": item.symbol,
+                        "start_date": start_date,
+                        "end_date": end_date,
+                    },
+                    asset=item.asset or item.symbol,
+                    currency=item.currency,
+                    uid=str(uuid.uuid4()),
+                    fetched_at=RawEnvelope.utc_now_iso(),
+                    payload={
+                        "symbol": item.symbol,
+                        "start_date": start_date,
+                        "end_date": end_date,
+                        "rows": _series_to_rows(series),
+                    },
+                )
+            )
+    return envelopes
+
+
+def _split_closes(frame: pd.DataFrame | None, tickers: list[str]) -> dict[str, pd.Series]:
+    if frame is None or frame.empty or "Close" not in frame.columns.get_level_values(0):
+        return {}
+    if isinstance(frame.columns, pd.MultiIndex):
+        closes = frame["Close"]
+        return {
+            symbol: closes[symbol].dropna()
+            for symbol in tickers
+            if symbol in closes.columns
+        }
+    return {tickers[0]: frame["Close"].dropna()}
+
+
+def _series_to_rows(series: pd.Series) -> list[dict[str, Any]]:
+    return [
+        {"date": pd.Timestamp(index).date().isoformat(), "value": float(value)}
+        for index, value in series.items()
+    ]
+
+
 def fetch_sp500_close_prices(
     start_date: str,
     end_date: str,
@@ -1,15 +1,19 @@
 from orchestration.runner import (
+    JobResult,
     OrchestrationConfig,
     make_binance_job,
     make_yfinance_job,
     run_all,
+    run_all_concurrent,
     run_asset_ingestion,
 )
 
 __all__ = [
+    "JobResult",
     "OrchestrationConfig",
     "make_binance_job",
     "make_yfinance_job",
     "run_all",
+    "run_all_concurrent",
     "run_asset_ingestion",
 ]
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from datetime import date, datetime
+from pathlib import Path
+
+from storage.bronze_archive import ARCHIVE_SCHEMAS, DEFAULT_ARCHIVE_DIR, archive_bronze, replay_archive
+from storage.bronze_compaction import compact_bronze
+from storage.bronze_partitions import DEFAULT_RETENTION_MONTHS, apply_retention
+from storage.connection_pool import DEFAULT_POOL_SIZE
+from storage.raw_file_store import DEFAULT_RAW_DIR
+from storage.raw_replay import DEFAULT_REPLAY_WORKERS, replay_raw_files
+
+
+def run_retention(retention_months: int, drop: bool = False) -> None:
+    expired = apply_retention(retention_months, drop=drop)
+    action = "Dropped" if drop else "Detached"
+    print(f"{action} {len(expired)} bronze.ingestion_events partition(s)")
+    for partition in expired:
+        print(f"  {partition.name} ({partition.month:%Y-%m})")
+
+
+def run_archive(before: date, archive_dir: Path) -> None:
+    archived = archive_bronze(before, base_dir=archive_dir)
+    print(f"Archived {sum(item.rows for item in archived)} bronze row(s) to {archive_dir}")
+    for item in archived:
+        print(f"  {item.table} {item.source} {item.month:%Y-%m}: {item.rows} -> {item.path.name}")
+
+
+def run_replay(
+    archive_dir: Path,
+    start: date | None,
+    end: date | None,
+    tables: list[str],
+    sources: list[str] | None,
+    workers: int,
+) -> None:
+    inserted = replay_archive(
+        start=start,
+        end=end,
+        tables=tables,
+        sources=sources,
+        base_dir=archive_dir,
+        max_workers=workers,
+    )
+    for table, rows in inserted.items():
+        print(f"Replayed {rows} row(s) into bronze.{table}")
+
+
+def run_replay_raw(
+    raw_dir: Path,
+    categories: list[str] | None,
+    start: date | None,
+    end: date | None,
+    asset: str | None,
+    workers: int,
+) -> None:
+    result = replay_raw_files(
+        categories=categories,
+        start=start,
+        end=end,
+        asset=asset,
+        base_dir=raw_dir,
+        max_workers=workers,
+    )
+    print(f"Read {result.read} envelope(s) from {result.files} raw file(s)")
+    print(f"Inserted {result.inserted} new envelope(s) into bronze.ingestion_events")
+
+
+def run_compaction(sources: list[str] | None, symbols: list[str] | None) -> None:
+    results = compact_bronze(sources=sources, symbols=symbols)
+    print(f"Compacted {len(results)} bronze price series")
+    for result in results:
+        group = result.group
+        print(
+            f"  {group.source} {group.symbol} {group.currency}: "
+            f"{result.superseded} envelope(s) -> {result.uid} ({result.rows} row(s))"
+        )
+
+
+def _parse_date(value: str) -> date:
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Bronze layer maintenance")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    retention = commands.add_parser(
+        "retention",
+        help="Detach (or drop) ingestion_events month partitions past the retention window",
+    )
+    retention.add_argument("--months", type=int, default=DEFAULT_RETENTION_MONTHS, help="Months to keep")
+    retention.add_argument("--drop", action="store_true", help="Drop expired partitions instead of only detaching")
+
+    archive = commands.add_parser("archive", help="Move cold bronze rows into Parquet files")
+    archive.add_argument("--before", type=_parse_date, required=True, help="Archive months before this date (YYYY-MM-DD)")
+    archive.add_argument("--dir", type=Path, default=DEFAULT_ARCHIVE_DIR, help="Archive root directory")
+
+    replay = commands.add_parser("replay", help="Bulk-load archived Parquet files back into bronze")
+    replay.add_argument("--start", type=_parse_date, default=None, help="First month to replay (YYYY-MM-DD)")
+    replay.add_argument("--end", type=_parse_date, default=None, help="Last month to replay (YYYY-MM-DD)")
+    replay.add_argument("--table", action="append", choices=sorted(ARCHIVE_SCHEMAS), help="Table to replay (repeatable)")
+    replay.add_argument("--source", action="append", help="Source to replay (repeatable)")
+    replay.add_argument("--workers", type=int, default=DEFAULT_POOL_SIZE, help="Parallel replay workers")
+    replay.add_argument("--dir", type=Path, default=DEFAULT_ARCHIVE_DIR, help="Archive root directory")
+
+    replay_raw = commands.add_parser("replay-raw", help="Load file-sink envelopes into bronze.ingestion_events")
+    replay_raw.add_argument("--category", action="append", help="Raw category to replay (repeatable)")
+    replay_raw.add_argument("--start", type=_parse_date, default=None, help="First fetched_at day (YYYY-MM-DD)")
+    replay_raw.add_argument("--end", type=_parse_date, default=None, help="Last fetched_at day (YYYY-MM-DD)")
+    replay_raw.add_argument("--asset", type=str, default=None, help="Only replay this asset")
+    replay_raw.add_argument("--workers", type=int, default=DEFAULT_REPLAY_WORKERS, help="Parse worker processes")
+    replay_raw.add_argument("--dir", type=Path, default=DEFAULT_RAW_DIR, help="Raw file store root")
+
+    compact = commands.add_parser("compact", help="Fold overlapping price envelopes into one per symbol")
+    compact.add_argument("--source", action="append", help="Source to compact (repeatable)")
+    compact.add_argument("--symbol", action="append", help="Symbol to compact (repeatable)")
+
+    args = parser.parse_args(argv)
+    try:
+        if args.command == "retention":
+            run_retention(args.months, drop=args.drop)
+        elif args.command == "archive":
+            run_archive(args.before, args.dir)
+        elif args.command == "replay":
+            run_replay(
+                args.dir,
+                args.start,
+                args.end,
+                args.table or sorted(ARCHIVE_SCHEMAS),
+                args.source,
+                args.workers,
+            )
+        elif args.command == "replay-raw":
+            run_replay_raw(args.dir, args.category, args.start, args.end, args.asset, args.workers)
+        elif args.command == "compact":
+            run_compaction(args.source, args.symbol)
+    except Exception as e:
+        print(f"Error executing script: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
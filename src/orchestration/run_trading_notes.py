@@ -2,25 +2,24 @@ from pathlib import Path
 import sys
 import argparse
 from datetime import datetime
-import os
 from typing import Any
 
-import psycopg
 import pandas as pd
 
 # Add the parent directory to the path if needed
 sys.path.insert(0, str(Path(__file__).parent))
 
-from ingestion.nubank_trading_notes import ingest_nubank_trading_notes
+from ingestion.nubank_trading_notes import (
+    DEFAULT_PARSE_WORKERS,
+    PageTiming,
+    TaxesSync,
+    ingest_nubank_taxes,
+    ingest_nubank_trading_notes,
+    ingest_nubank_trading_notes_batch,
+)
 from processing.silver.silver_transform import run_silver_transforms
 from processing.gold.gold_transform import run_gold_transforms
-
-
-def _conninfo() -> str:
-    dsn = os.environ.get("FINANCES_HUB_PG_DSN")
-    if not dsn:
-        raise ValueError("Missing FINANCES_HUB_PG_DSN environment variable.")
-    return dsn
+from storage.connection_pool import pooled_connection
 
 
 def _fetch_touched_gold_rows(started_at: datetime) -> list[dict[str, Any]]:
@@ -30,7 +29,7 @@ def _fetch_touched_gold_rows(started_at: datetime) -> list[dict[str, Any]]:
         WHERE ingested_at >= %s
         ORDER BY ingested_at, date, ticker, quantidade, preco
     """
-    with psycopg.connect(_conninfo()) as conn:
+    with pooled_connection() as conn:
         with conn.cursor() as cur:
             cur.execute(query, (started_at,))
             columns = [desc.name for desc in cur.description]
@@ -51,7 +50,7 @@ def _fetch_current_run_bronze_batch_ids(
           AND fetched_at >= %s
         ORDER BY uid::text
     """
-    with psycopg.connect(_conninfo()) as conn:
+    with pooled_connection() as conn:
         with conn.cursor() as cur:
             cur.execute(query, (path, date, started_at))
             return [row[0] for row in cur.fetchall()]
@@ -67,7 +66,7 @@ def _fetch_touched_gold_rows_for_batches(batch_ids: list[str]) -> list[dict[str,
         WHERE batch_id::text = ANY(%s)
         ORDER BY ingested_at, date, ticker, quantidade, preco
     """
-    with psycopg.connect(_conninfo()) as conn:
+    with pooled_connection() as conn:
         with conn.cursor() as cur:
             cur.execute(query, (batch_ids,))
             columns = [desc.name for desc in cur.description]
@@ -96,18 +95,50 @@ def _print_gold_rows(rows: list[dict[str, Any]]) -> None:
     frame = frame[existing_columns]
     print(frame.to_string(index=False))
 
+
+def _print_timings(timings: dict[str, float]) -> None:
+    print("Transform timings:")
+    for name, seconds in timings.items():
+        print(f"  {name}: {seconds:.2f}s")
+
+
+def _print_taxes_sync(taxes: TaxesSync) -> None:
+    if taxes.skipped:
+        print(f"Taxes CSV unchanged ({taxes.sha256[:12]}), bronze.nubank_trade_taxes left as is")
+        return
+    print(f"Taxes dates changed: {len(taxes.changed_dates)}")
+    for changed_date in taxes.changed_dates:
+        print(f"  {changed_date}")
+
+
+def _print_page_timings(label: str, page_timings: tuple[PageTiming, ...] | list[PageTiming]) -> None:
+    if not page_timings:
+        print(f"Page timings for {label}: (cached)")
+        return
+    skipped = sum(not timing.trade_page for timing in page_timings)
+    total = sum(timing.seconds for timing in page_timings)
+    print(f"Page timings for {label}: {len(page_timings)} page(s), {skipped} skipped, {total:.3f}s")
+    for timing in page_timings:
+        status = f"{timing.rows} row(s)" if timing.trade_page else "skipped"
+        print(f"  page {timing.page_number}: {timing.seconds:.3f}s {status}")
+
+
 def run_trading_notes(
     path: str,
     date: datetime.date,
     run_tests: bool = True,
+    show_page_timings: bool = False,
 ) -> None:
     """Execute Nubank trading notes bronze ingestion followed by silver and gold transforms."""
     try:
         bronze_started_at = datetime.now()
+        page_timings: list[PageTiming] = []
         bronze_rows = ingest_nubank_trading_notes(
             path=path,
             date=date,
+            page_timings=page_timings,
         )
+        taxes = ingest_nubank_taxes()
         bronze_batch_ids = _fetch_current_run_bronze_batch_ids(
             path=path,
             date=date,
@@ -119,9 +150,46 @@ def run_trading_notes(
         touched_gold_rows = _fetch_touched_gold_rows_for_batches(bronze_batch_ids)
 
         print("Trading notes pipeline completed successfully")
+        _print_taxes_sync(taxes)
         print(f"Bronze rows ingested: {bronze_rows}")
+        if show_page_timings:
+            _print_page_timings(Path(path).name, page_timings)
         print(f"Silver statements executed: {silver_result['statements']}")
         print(f"Gold statements executed: {gold_result['statements']}")
+        _print_timings({**silver_result["timings"], **gold_result["timings"]})
+        _print_gold_rows(touched_gold_rows)
+    except Exception as e:
+        print(f"Error executing script: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+def run_trading_notes_batch(
+    source: str,
+    run_tests: bool = True,
+    max_workers: int = DEFAULT_PARSE_WORKERS,
+    show_page_timings: bool = False,
+) -> None:
+    """Ingest every note in a directory or glob, then run silver and gold once."""
+    try:
+        notes = ingest_nubank_trading_notes_batch(source, max_workers=max_workers)
+        taxes = ingest_nubank_taxes()
+        silver_result = run_silver_transforms(run_tests=run_tests)
+        gold_result = run_gold_transforms(run_tests=run_tests)
+        touched_gold_rows = _fetch_touched_gold_rows_for_batches(
+            [note.uid for note in notes if note.uid is not None]
+        )
+
+        print("Trading notes batch completed successfully")
+        _print_taxes_sync(taxes)
+        for note in notes:
+            print(f"  {note.date} {Path(note.path).name}: {note.rows} row(s)")
+        if show_page_timings:
+            for note in notes:
+                _print_page_timings(Path(note.path).name, note.page_timings)
+        print(f"Bronze rows ingested: {sum(note.rows for note in notes)} from {len(notes)} file(s)")
+        print(f"Silver statements executed: {silver_result['statements']}")
+        print(f"Gold statements executed: {gold_result['statements']}")
+        _print_timings({**silver_result["timings"], **gold_result["timings"]})
         _print_gold_rows(touched_gold_rows)
     except Exception as e:
         print(f"Error executing script: {e}", file=sys.stderr)
@@ -130,13 +198,32 @@ def run_trading_notes(
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Run Nubank trading notes bronze/silver/gold pipeline")
-    parser.add_argument("--path", type=str, required=True, help="Path to PDF")
-    parser.add_argument("--date", type=str, required=True, help="Trading date in YYYY-MM-DD format")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--path", type=str, help="Path to PDF")
+    target.add_argument(
+        "--batch",
+        type=str,
+        help="Directory or glob of PDFs; dates are read from file names or note headers",
+    )
+    parser.add_argument("--date", type=str, help="Trading date in YYYY-MM-DD format (required with --path)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_PARSE_WORKERS, help="PDF parse worker processes")
     parser.add_argument("--skip-tests", action="store_true", help="Skip silver and gold SQL tests")
-    
+    parser.add_argument("--page-timings", action="store_true", help="Print per-page parse timings")
+
     args = parser.parse_args()
-    run_trading_notes(
-        path=args.path,
-        date=datetime.strptime(args.date, "%Y-%m-%d").date(),
-        run_tests=not args.skip_tests,
-    )
+    if args.batch is not None:
+        run_trading_notes_batch(
+            args.batch,
+            run_tests=not args.skip_tests,
+            max_workers=args.workers,
+            show_page_timings=args.page_timings,
+        )
+    else:
+        if args.date is None:
+            parser.error("--date is required with --path")
+        run_trading_notes(
+            path=args.path,
+            date=datetime.strptime(args.date, "%Y-%m-%d").date(),
+            run_tests=not args.skip_tests,
+            show_page_timings=args.page_timings,
+        )
@@ -1,21 +1,55 @@
 from __future__ import annotations
 
 import os
-from dataclasses import dataclass
-from datetime import date, timedelta
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
 import re
+from typing import Iterable, Iterator
 
-from ingestion.binance import fetch_klines_daily
+from ingestion.binance import iter_klines_daily
+from ingestion.models import RawEnvelope
+from ingestion.rate_limit import limiter_states
 from ingestion.persist import Sink, inject_envelopes
-from ingestion.yfinance_stock import fetch_close_prices
+from ingestion.yfinance_stock import (
+    YFINANCE_BATCH_SIZE,
+    YFinanceSymbol,
+    fetch_close_prices,
+    fetch_close_prices_batch,
+)
 from processing.sql_tests import run_sql_tests
+from storage.raw_postgres import fetch_watermark, upsert_watermark
+
+
+DEFAULT_SOURCE_CONCURRENCY = {"binance": 4, "yfinance": 2}
 
 
 @dataclass
 class OrchestrationConfig:
     sink: Sink | None = None
     dsn: str | None = None
+    source_concurrency: dict[str, int] = field(
+        default_factory=lambda: dict(DEFAULT_SOURCE_CONCURRENCY)
+    )
+    incremental: bool = False
+    overlap_days: int = 3
+    batch_yfinance: bool = False
+    yfinance_batch_size: int = YFINANCE_BATCH_SIZE
+
+
+@dataclass(frozen=True)
+class JobResult:
+    source: str
+    rows: int
+    elapsed_seconds: float
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
 
 
 def run_all(
@@ -27,6 +61,8 @@ def run_all(
     end_date = date.today().isoformat()
     start_date = "2020-01-01"
     job_map = jobs or _load_jobs_from_yaml(_jobs_path(), start_date, end_date)
+    if config.batch_yfinance:
+        job_map = _batch_yfinance_jobs(job_map, config)
 
     results = {name: job(config) for name, job in job_map.items()}
     if run_tests:
@@ -34,6 +70,88 @@ def run_all(
     return results
 
 
+def run_all_concurrent(
+    jobs: dict[str, callable] | None = None,
+    config: OrchestrationConfig | None = None,
+    run_tests: bool = True,
+) -> dict[str, JobResult]:
+    config = config or OrchestrationConfig()
+    end_date = date.today().isoformat()
+    start_date = "2020-01-01"
+    job_map = jobs or _load_jobs_from_yaml(_jobs_path(), start_date, end_date)
+    if config.batch_yfinance:
+        job_map = _batch_yfinance_jobs(job_map, config)
+
+    results = run_jobs_concurrently(job_map, config)
+    if run_tests:
+        run_sql_tests(config.dsn, _tests_dir())
+    return results
+
+
+def run_jobs_concurrently(
+    job_map: dict[str, callable],
+    config: OrchestrationConfig,
+) -> dict[str, JobResult]:
+    by_source: dict[str, dict[str, callable]] = {}
+    for name, job in job_map.items():
+        by_source.setdefault(_job_source(job), {})[name] = job
+
+    executors: list[ThreadPoolExecutor] = []
+    futures = {}
+    try:
+        for source, source_jobs in by_source.items():
+            executor = ThreadPoolExecutor(
+                max_workers=_source_limit(config, source),
+                thread_name_prefix=f"ingest-{source}",
+            )
+            executors.append(executor)
+            for name, job in source_jobs.items():
+                futures[name] = executor.submit(_run_isolated, job, config, source)
+    finally:
+        for executor in executors:
+            executor.shutdown(wait=True)
+
+    return {name: futures[name].result() for name in job_map}
+
+
+def _run_isolated(job: callable, config: OrchestrationConfig, source: str) -> JobResult:
+    limiter = limiter_states().get(source)
+    if limiter is not None and limiter.circuit == "open":
+        return JobResult(
+            source=source,
+            rows=0,
+            elapsed_seconds=0.0,
+            error=f"CircuitOpenError: {source} circuit open for another {limiter.cooldown_seconds:.1f}s",
+        )
+
+    started = time.perf_counter()
+    try:
+        rows = job(config)
+    except Exception as exc:
+        return JobResult(
+            source=source,
+            rows=0,
+            elapsed_seconds=time.perf_counter() - started,
+            error=f"{type(exc).__name__}: {exc}",
+        )
+    return JobResult(
+        source=source,
+        rows=rows,
+        elapsed_seconds=time.perf_counter() - started,
+    )
+
+
+def _job_source(job: callable) -> str:
+    return getattr(job, "source", "default")
+
+
+def _source_limit(config: OrchestrationConfig, source: str) -> int:
+    limit = config.source_concurrency.get(source, 1)
+    if limit < 1:
+        raise ValueError(f"Concurrency limit for {source} must be >= 1")
+    return limit
+
+
 def make_binance_job(
     symbol: str,
     start_date: str,
@@ -56,10 +174,11 @@ def make_binance_job(
             config=config,
             job_name=job_name or f"binance_{symbol}",
             category="binance",
-            fetcher=fetch_klines_daily,
+            fetcher=iter_klines_daily,
             fetch_kwargs=merged_kwargs,
         )
 
+    _runner.source = "binance"
     return _runner
 
 
@@ -71,24 +190,127 @@ def make_yfinance_job(
     currency: str | None = None,
     asset: str | None = None,
 ) -> callable:
+    merged_kwargs = {"symbol": symbol}
+    if start_date is not None:
+        merged_kwargs["start_date"] = start_date
+    if end_date is not None:
+        merged_kwargs["end_date"] = end_date
+    if currency is not None:
+        merged_kwargs["currency"] = currency
+    if asset is not None:
+        merged_kwargs["asset"] = asset
+
     def _runner(config: OrchestrationConfig | None = None) -> int:
-        merged_kwargs = {"symbol": symbol}
-        if start_date is not None:
-            merged_kwargs["start_date"] = start_date
-        if end_date is not None:
-            merged_kwargs["end_date"] = end_date
-        if currency is not None:
-            merged_kwargs["currency"] = currency
-        if asset is not None:
-            merged_kwargs["asset"] = asset
         return run_asset_ingestion(
             config=config,
             job_name=job_name or f"yfinance_{symbol}",
             category="yfinance",
             fetcher=fetch_close_prices,
-            fetch_kwargs=merged_kwargs,
+            fetch_kwargs=dict(merged_kwargs),
         )
 
+    _runner.source = "yfinance"
+    _runner.fetch_kwargs = merged_kwargs
+    return _runner
+
+
+def _batch_yfinance_jobs(
+    job_map: dict[str, callable],
+    config: OrchestrationConfig,
+) -> dict[str, callable]:
+    specs: dict[str, dict[str, str]] = {}
+    groups: dict[tuple[str, str], list[str]] = {}
+    for name, job in job_map.items():
+        fetch_kwargs = getattr(job, "fetch_kwargs", None)
+        if _job_source(job) != "yfinance" or fetch_kwargs is None:
+            continue
+        if "start_date" not in fetch_kwargs or "end_date" not in fetch_kwargs:
+            continue
+        if config.incremental:
+            _apply_dsn(config.dsn)
+            fetch_kwargs = _resume_from_watermark(name, fetch_kwargs, config.overlap_days)
+        specs[name] = fetch_kwargs
+        groups.setdefault((fetch_kwargs["start_date"], fetch_kwargs["end_date"]), []).append(name)
+
+    batched = dict(job_map)
+    for (start_date, end_date), names in groups.items():
+        if len(names) < 2:
+            continue
+        batch = _YFinanceBatch(
+            [
+                YFinanceSymbol(
+                    symbol=specs[name]["symbol"],
+                    currency=specs[name].get("currency", "usd"),
+                    asset=specs[name].get("asset"),
+                )
+                for name in names
+            ],
+            start_date=start_date,
+            end_date=end_date,
+            chunk_size=config.yfinance_batch_size,
+        )
+        for name in names:
+            batched[name] = _make_batched_yfinance_job(name, specs[name], batch)
+    return batched
+
+
+class _YFinanceBatch:
+    def __init__(
+        self,
+        symbols: list[YFinanceSymbol],
+        *,
+        start_date: str,
+        end_date: str,
+        chunk_size: int,
+    ) -> None:
+        self.symbols = symbols
+        self.start_date = start_date
+        self.end_date = end_date
+        self.chunk_size = chunk_size
+        self._lock = threading.Lock()
+        self._envelopes: dict[str, list[RawEnvelope]] | None = None
+        self._error: Exception | None = None
+
+    def envelopes_for(self, symbol: str) -> list[RawEnvelope]:
+        with self._lock:
+            if self._envelopes is None and self._error is None:
+                try:
+                    envelopes = fetch_close_prices_batch(
+                        self.symbols,
+                        self.start_date,
+                        self.end_date,
+                        chunk_size=self.chunk_size,
+                    )
+                except Exception as exc:
+                    self._error = exc
+                else:
+                    self._envelopes = {}
+                    for envelope in envelopes:
+                        self._envelopes.setdefault(envelope.payload["symbol"], []).append(envelope)
+            if self._error is not None:
+                raise self._error
+            return self._envelopes.get(symbol, [])
+
+
+def _make_batched_yfinance_job(
+    job_name: str,
+    fetch_kwargs: dict[str, str],
+    batch: _YFinanceBatch,
+) -> callable:
+    def _fetch_from_batch(**_kwargs: str) -> list[RawEnvelope]:
+        return batch.envelopes_for(fetch_kwargs["symbol"])
+
+    def _runner(config: OrchestrationConfig | None = None) -> int:
+        return run_asset_ingestion(
+            config=config,
+            job_name=job_name,
+            category="yfinance",
+            fetcher=_fetch_from_batch,
+            fetch_kwargs=dict(fetch_kwargs),
+        )
+
+    _runner.source = "yfinance"
+    _runner.fetch_kwargs = fetch_kwargs
     return _runner
 
 
@@ -102,9 +324,89 @@ def run_asset_ingestion(
 ) -> int:
     config = config or OrchestrationConfig()
     _apply_dsn(config.dsn)
-    envelopes = fetcher(**fetch_kwargs)
-    inject_envelopes(envelopes, category=category, sink=config.sink)
-    return len(envelopes)
+    if config.incremental:
+        fetch_kwargs = _resume_from_watermark(job_name, fetch_kwargs, config.overlap_days)
+    stats = _EnvelopeStats()
+    envelopes = stats.track(fetcher(**fetch_kwargs))
+    target = inject_envelopes(envelopes, category=category, sink=config.sink)
+    if config.incremental and target in {"postgres", "both"}:
+        _advance_watermark(job_name, category, stats)
+    return stats.count
+
+
+class _EnvelopeStats:
+    def __init__(self) -> None:
+        self.count = 0
+        self.asset: str | None = None
+        self.latest: date | None = None
+
+    def track(self, envelopes: Iterable[RawEnvelope]) -> Iterable[RawEnvelope]:
+        if isinstance(envelopes, list):
+            for envelope in envelopes:
+                self._observe(envelope)
+            return envelopes
+        return self._tracking(envelopes)
+
+    def _tracking(self, envelopes: Iterable[RawEnvelope]) -> Iterator[RawEnvelope]:
+        for envelope in envelopes:
+            self._observe(envelope)
+            yield envelope
+
+    def _observe(self, envelope: RawEnvelope) -> None:
+        self.count += 1
+        self.asset = self.asset or envelope.asset
+        latest = _latest_row_date([envelope])
+        if latest is not None and (self.latest is None or latest > self.latest):
+            self.latest = latest
+
+
+def _resume_from_watermark(
+    job_name: str,
+    fetch_kwargs: dict[str, str],
+    overlap_days: int,
+) -> dict[str, str]:
+    start_date = fetch_kwargs.get("start_date")
+    if start_date is None:
+        return fetch_kwargs
+    watermark = fetch_watermark(job_name)
+    if watermark is None:
+        return fetch_kwargs
+
+    resume_from = watermark - timedelta(days=overlap_days)
+    end_date = fetch_kwargs.get("end_date")
+    if end_date is not None:
+        resume_from = min(resume_from, date.fromisoformat(end_date))
+    if resume_from <= date.fromisoformat(start_date):
+        return fetch_kwargs
+    return {**fetch_kwargs, "start_date": resume_from.isoformat()}
+
+
+def _advance_watermark(job_name: str, source: str, stats: _EnvelopeStats) -> None:
+    if stats.latest is None or stats.asset is None:
+        return
+    upsert_watermark(
+        job_name,
+        source=source,
+        asset=stats.asset,
+        last_price_date=stats.latest,
+    )
+
+
+def _latest_row_date(envelopes: list[RawEnvelope]) -> date | None:
+    latest: date | None = None
+    for envelope in envelopes:
+        for row in envelope.payload.get("rows", []):
+            if "date" in row:
+                row_date = date.fromisoformat(str(row["date"]))
+            elif "close_time" in row:
+                row_date = datetime.fromtimestamp(
+                    int(row["close_time"]) / 1000, tz=timezone.utc
+                ).date()
+            else:
+                continue
+            if latest is None or row_date > latest:
+                latest = row_date
+    return latest
 
 
 def _apply_dsn(dsn: str | None) -> None:
@@ -1,31 +1,33 @@
 from __future__ import annotations
 
-import os
 from pathlib import Path
+from typing import Any
 
-import psycopg
-
+from processing.sql_dag import DEFAULT_SQL_WORKERS, load_sql_nodes, run_sql_dag
 from processing.sql_tests import run_sql_tests
-
-
-def _conninfo(dsn: str | None) -> str:
-    conninfo = dsn or os.environ.get("FINANCES_HUB_PG_DSN")
-    if not conninfo:
-        raise ValueError("Missing FINANCES_HUB_PG_DSN environment variable.")
-    return conninfo
-
-
-def run_gold_transforms(dsn: str | None = None, run_tests: bool = True) -> dict[str, int]:
-    statements = _load_statements(_sql_dir())
-    with psycopg.connect(_conninfo(dsn)) as conn:
-        with conn.cursor() as cur:
-            for statement in statements:
-                cur.execute(statement)
-        conn.commit()
+from storage.connection_pool import pooled_connection
+
+
+def run_gold_transforms(
+    dsn: str | None = None,
+    run_tests: bool = True,
+    full_refresh: bool = False,
+    max_workers: int = DEFAULT_SQL_WORKERS,
+) -> dict[str, Any]:
+    nodes = load_sql_nodes(_sql_dir())
+    if full_refresh:
+        with pooled_connection(dsn) as conn:
+            with conn.cursor() as cur:
+                cur.execute("TRUNCATE TABLE gold.transform_watermarks")
+            conn.commit()
+    results = run_sql_dag(nodes, dsn, max_workers=max_workers, connect=pooled_connection)
     if run_tests:
         run_sql_tests(dsn, _tests_dir())
 
-    return {"statements": len(statements)}
+    return {
+        "statements": sum(result.statements for result in results.values()),
+        "timings": {name: result.elapsed_seconds for name, result in results.items()},
+    }
 
 
 def _sql_dir() -> Path:
@@ -34,17 +36,3 @@ def _sql_dir() -> Path:
 
 def _tests_dir() -> Path:
     return Path(__file__).resolve().parents[3] / "sql" / "gold" / "tests"
-
-
-def _load_statements(sql_dir: Path) -> list[str]:
-    statements: list[str] = []
-    for path in sorted(sql_dir.glob("*.sql")):
-        if path.name == "schema.sql":
-            continue
-        sql = path.read_text(encoding="utf-8")
-        statements.extend(_split_sql(sql))
-    return statements
-
-
-def _split_sql(sql: str) -> list[str]:
-    return [statement.strip() for statement in sql.split(";") if statement.strip()]
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import AbstractContextManager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable
+
+import psycopg
+
+from storage.connection_pool import pooled_connection
+
+DEFAULT_SQL_WORKERS = 4
+
+_DEPENDS_ON = re.compile(r"^--\s*depends_on:\s*(.+)$", re.MULTILINE)
+
+Connect = Callable[[str | None], AbstractContextManager[psycopg.Connection]]
+
+
+@dataclass(frozen=True)
+class SqlNode:
+    name: str
+    statements: tuple[str, ...]
+    depends_on: frozenset[str] = frozenset()
+
+
+@dataclass(frozen=True)
+class NodeResult:
+    name: str
+    statements: int
+    elapsed_seconds: float
+
+
+def load_sql_nodes(*sql_dirs: Path) -> dict[str, SqlNode]:
+    nodes: dict[str, SqlNode] = {}
+    for sql_dir in sql_dirs:
+        for path in sorted(sql_dir.glob("*.sql")):
+            if path.name == "schema.sql":
+                continue
+            sql = path.read_text(encoding="utf-8")
+            name = f"{sql_dir.name}/{path.stem}"
+            nodes[name] = SqlNode(
+                name=name,
+                statements=tuple(_split_sql(sql)),
+                depends_on=frozenset(_parse_depends_on(sql)),
+            )
+    return nodes
+
+
+def run_sql_dag(
+    nodes: dict[str, SqlNode],
+    dsn: str | None = None,
+    max_workers: int = DEFAULT_SQL_WORKERS,
+    connect: Connect = pooled_connection,
+) -> dict[str, NodeResult]:
+    """Run SQL nodes in dependency order, independent nodes concurrently.
+
+    Every ``depends_on`` must name another node in ``nodes``; layers are
+    ordered by their callers (silver before gold), not by headers. Each node
+    runs its statements in order on its own pooled connection and commits on
+    its own, so a failure leaves the nodes that already finished committed.
+    The price nodes advance their ledger or watermark in the same statement
+    as their writes, so re-running the layer resumes from there. After a
+    failure no new nodes start; running ones finish and the error is re-raised.
+    """
+    if max_workers < 1:
+        raise ValueError("max_workers must be >= 1")
+    _check_dependencies(nodes)
+    pending = {name: set(node.depends_on) for name, node in nodes.items()}
+    _check_acyclic(pending)
+
+    results: dict[str, NodeResult] = {}
+    running: dict[Future[NodeResult], str] = {}
+    error: BaseException | None = None
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sql-dag") as executor:
+        while True:
+            if error is None:
+                for name in sorted(pending):
+                    if not pending[name]:
+                        del pending[name]
+                        running[executor.submit(_run_node, nodes[name], dsn, connect)] = name
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    results[name] = future.result()
+                except BaseException as exc:
+                    error = error or exc
+                    continue
+                for deps in pending.values():
+                    deps.discard(name)
+    if error is not None:
+        raise error
+    return {name: results[name] for name in nodes}
+
+
+def _run_node(node: SqlNode, dsn: str | None, connect: Connect) -> NodeResult:
+    started = time.perf_counter()
+    with connect(dsn) as conn:
+        with conn.cursor() as cur:
+            for statement in node.statements:
+                cur.execute(statement)
+        conn.commit()
+    return NodeResult(
+        name=node.name,
+        statements=len(node.statements),
+        elapsed_seconds=time.perf_counter() - started,
+    )
+
+
+def _check_dependencies(nodes: dict[str, SqlNode]) -> None:
+    for name, node in sorted(nodes.items()):
+        unknown = sorted(node.depends_on - nodes.keys())
+        if unknown:
+            raise ValueError(f"{name} depends on unknown SQL file(s): {', '.join(unknown)}")
+
+
+def _check_acyclic(pending: dict[str, set[str]]) -> None:
+    remaining = {name: set(deps) for name, deps in pending.items()}
+    while remaining:
+        ready = [name for name, deps in remaining.items() if not deps]
+        if not ready:
+            raise ValueError(f"SQL dependency cycle between: {', '.join(sorted(remaining))}")
+        for name in ready:
+            del remaining[name]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+
+
+def _parse_depends_on(sql: str) -> Iterable[str]:
+    for match in _DEPENDS_ON.finditer(sql):
+        for dep in match.group(1).split(","):
+            if dep.strip():
+                yield dep.strip()
+
+
+def _split_sql(sql: str) -> list[str]:
+    return [statement.strip() for statement in sql.split(";") if statement.strip()]
@@ -1,23 +1,15 @@
 from __future__ import annotations
 
-import os
 from pathlib import Path
 
-import psycopg
-
-
-def _conninfo(dsn: str | None) -> str:
-    conninfo = dsn or os.environ.get("FINANCES_HUB_PG_DSN")
-    if not conninfo:
-        raise ValueError("Missing FINANCES_HUB_PG_DSN environment variable.")
-    return conninfo
+from storage.connection_pool import pooled_connection
 
 
 def run_sql_tests(dsn: str | None, tests_dir: Path) -> int:
     statements = _load_statements(tests_dir)
     if not statements:
         return 0
-    with psycopg.connect(_conninfo(dsn)) as conn:
+    with pooled_connection(dsn) as conn:
         with conn.cursor() as cur:
             for statement in statements:
                 cur.execute(statement)
@@ -0,0 +1,338 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Any, Iterable
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from psycopg import sql
+
+from ingestion.models import RawEnvelope
+from storage.bronze_partitions import PARTITION_SIDE_TABLES, existing_side_tables
+from storage.connection_pool import DEFAULT_POOL_SIZE, pooled_connection
+from storage.raw_postgres import insert_missing_envelopes
+
+DEFAULT_ARCHIVE_DIR = Path("data/archive/bronze")
+ARCHIVE_CHUNK_ROWS = 10_000
+ARCHIVE_COMPRESSION = "zstd"
+
+_TIMESTAMP = pa.timestamp("us", tz="UTC")
+ARCHIVE_SCHEMAS: dict[str, pa.Schema] = {
+    "ingestion_events": pa.schema(
+        [
+            ("uid", pa.string()),
+            ("source", pa.string()),
+            ("endpoint", pa.string()),
+            ("request_params", pa.string()),
+            ("asset", pa.string()),
+            ("currency", pa.string()),
+            ("fetched_at", _TIMESTAMP),
+            ("payload", pa.string()),
+            ("created_at", _TIMESTAMP),
+        ]
+    ),
+    "pdf_nubank_trade_events": pa.schema(
+        [
+            ("uid", pa.string()),
+            ("source", pa.string()),
+            ("endpoint", pa.string()),
+            ("request_params", pa.string()),
+            ("fetched_at", _TIMESTAMP),
+            ("mercado", pa.string()),
+            ("cv", pa.string()),
+            ("tipo_mercado", pa.string()),
+            ("espec_titulo", pa.string()),
+            ("observacao", pa.string()),
+            ("quantidade", pa.string()),
+            ("preco", pa.string()),
+            ("valor", pa.string()),
+            ("dc", pa.string()),
+            ("file_path", pa.string()),
+            ("file_name", pa.string()),
+            ("date", pa.date32()),
+            ("created_at", _TIMESTAMP),
+        ]
+    ),
+}
+# Archive keeps silver's ledger rows, unlike retention: archived envelopes are
+# meant to be replayed, and silver already holds their rows, so the ledger keeps
+# it from expanding them again.
+ARCHIVE_SIDE_TABLES = tuple(table for table in PARTITION_SIDE_TABLES if table != ("silver", "processed_envelopes"))
+_TEXT_CASTS = {"uid", "request_params", "payload"}
+_MONTH_PARTITION = re.compile(r"^ingestion_events_(.+)_(\d{4})(\d{2})$")
+
+
+@dataclass(frozen=True)
+class ArchivedSlice:
+    table: str
+    source: str
+    month: date
+    path: Path
+    rows: int
+
+
+def archive_bronze(
+    before: date,
+    *,
+    base_dir: Path | None = None,
+    tables: Iterable[str] = tuple(ARCHIVE_SCHEMAS),
+) -> list[ArchivedSlice]:
+    """Move bronze rows fetched before ``before``'s month into Parquet files.
+
+    Files land in ``<base_dir>/<table>/source=<source>/month=<YYYY-MM>/`` and
+    are renamed into place before the archived rows are removed from Postgres.
+    Each slice is read and removed in one transaction under a ``SHARE`` lock on
+    its table, which holds off writers to it until the slice is done.
+    ``ingestion_events`` month partitions (attached or detached) are dropped
+    whole, together with their rows in ``ARCHIVE_SIDE_TABLES``;
+    ``pdf_nubank_trade_events`` rows are deleted by range.
+    """
+    root = base_dir or DEFAULT_ARCHIVE_DIR
+    cutoff = before.replace(day=1)
+    archived: list[ArchivedSlice] = []
+    for table in tables:
+        _schema_for(table)
+        for source, month, relation in _cold_slices(table, cutoff):
+            result = _archive_slice(root, table, source, month, relation)
+            if result is not None:
+                archived.append(result)
+    return archived
+
+
+def replay_archive(
+    *,
+    start: date | None = None,
+    end: date | None = None,
+    tables: Iterable[str] = tuple(ARCHIVE_SCHEMAS),
+    sources: Iterable[str] | None = None,
+    base_dir: Path | None = None,
+    max_workers: int = DEFAULT_POOL_SIZE,
+) -> dict[str, int]:
+    if max_workers < 1:
+        raise ValueError("max_workers must be >= 1")
+    root = base_dir or DEFAULT_ARCHIVE_DIR
+    tables = list(tables)
+    files = archive_files(root, tables=tables, sources=sources, start=start, end=end)
+    inserted = {table: 0 for table in tables}
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bronze-replay") as executor:
+        futures = [(table, executor.submit(_replay_file, table, path)) for table, path in files]
+        for table, future in futures:
+            inserted[table] += future.result()
+    return inserted
+
+
+def archive_files(
+    base_dir: Path,
+    *,
+    tables: Iterable[str] = tuple(ARCHIVE_SCHEMAS),
+    sources: Iterable[str] | None = None,
+    start: date | None = None,
+    end: date | None = None,
+) -> list[tuple[str, Path]]:
+    wanted_sources = set(sources) if sources is not None else None
+    first = start.replace(day=1) if start else None
+    files: list[tuple[str, Path]] = []
+    for table in tables:
+        _schema_for(table)
+        for path in sorted((base_dir / table).glob("source=*/month=*/*.parquet")):
+            source = path.parent.parent.name.removeprefix("source=")
+            month = date.fromisoformat(path.parent.name.removeprefix("month=") + "-01")
+            if wanted_sources is not None and source not in wanted_sources:
+                continue
+            if (first and month < first) or (end and month > end):
+                continue
+            files.append((table, path))
+    return files
+
+
+def _cold_slices(table: str, cutoff: date) -> list[tuple[str, date, str | None]]:
+    with pooled_connection() as conn:
+        with conn.cursor() as cur:
+            if table == "ingestion_events":
+                cur.execute(
+                    """
+                    SELECT c.relname
+                    FROM pg_class AS c
+                    JOIN pg_namespace AS n ON n.oid = c.relnamespace
+                    WHERE n.nspname = 'bronze'
+                      AND c.relkind = 'r'
+                      AND c.relname ~ '^ingestion_events_.+_[0-9]{6}$'
+                    ORDER BY c.relname
+                    """
+                )
+                slices = []
+                for (relname,) in cur.fetchall():
+                    match = _MONTH_PARTITION.match(relname)
+                    month = date(int(match.group(2)), int(match.group(3)), 1)
+                    if month < cutoff:
+                        slices.append((match.group(1), month, relname))
+                return slices
+
+            cur.execute(
+                sql.SQL(
+                    """
+                    SELECT source, date_trunc('month', fetched_at AT TIME ZONE 'UTC')::date AS month
+                    FROM bronze.{}
+                    WHERE fetched_at < %s::timestamp AT TIME ZONE 'UTC'
+                    GROUP BY 1, 2
+                    ORDER BY 1, 2
+                    """
+                ).format(sql.Identifier(table)),
+                (cutoff,),
+            )
+            return [(source, month, None) for source, month in cur.fetchall()]
+
+
+def _archive_slice(
+    root: Path,
+    table: str,
+    source: str,
+    month: date,
+    relation: str | None,
+) -> ArchivedSlice | None:
+    schema = _schema_for(table)
+    target_dir = root / table / f"source={source}" / f"month={month:%Y-%m}"
+    target_dir.mkdir(parents=True, exist_ok=True)
+    name = f"part-{uuid.uuid4().hex}.parquet"
+    tmp_path = target_dir / f".{name}.tmp"
+    path = target_dir / name
+
+    select = sql.SQL("SELECT {} FROM bronze.{}").format(
+        sql.SQL(", ").join(_select_column(column) for column in schema.names),
+        sql.Identifier(relation or table),
+    )
+    params: tuple[Any, ...] = ()
+    if relation is None:
+        select += sql.SQL(
+            " WHERE source = %s"
+            " AND fetched_at >= %s::timestamp AT TIME ZONE 'UTC'"
+            " AND fetched_at < (%s::timestamp + INTERVAL '1 month') AT TIME ZONE 'UTC'"
+        )
+        params = (source, month, month)
+
+    rows = 0
+    with pooled_connection() as conn:
+        # Held until the rows are removed in this same transaction, so nothing
+        # written into the slice after the snapshot is removed unarchived.
+        with conn.cursor() as cur:
+            cur.execute(
+                sql.SQL("LOCK TABLE bronze.{} IN SHARE MODE").format(sql.Identifier(relation or table))
+            )
+        try:
+            with conn.cursor(name=f"bronze_archive_{uuid.uuid4().hex}") as cur:
+                cur.execute(select, params)
+                with pq.ParquetWriter(tmp_path, schema, compression=ARCHIVE_COMPRESSION) as writer:
+                    while batch := cur.fetchmany(ARCHIVE_CHUNK_ROWS):
+                        writer.write_batch(_record_batch(schema, batch))
+                        rows += len(batch)
+            if rows == 0:
+                tmp_path.unlink()
+                return None
+            _fsync(tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+        with conn.cursor() as cur:
+            if relation is not None:
+                for side_table in existing_side_tables(cur, ARCHIVE_SIDE_TABLES):
+                    cur.execute(
+                        sql.SQL("DELETE FROM {} WHERE uid IN (SELECT uid FROM bronze.{})").format(
+                            sql.Identifier(*side_table),
+                            sql.Identifier(relation),
+                        )
+                    )
+                cur.execute(sql.SQL("DROP TABLE bronze.{}").format(sql.Identifier(relation)))
+            else:
+                cur.execute(
+                    sql.SQL("DELETE FROM bronze.{}").format(sql.Identifier(table))
+                    + sql.SQL(
+                        " WHERE source = %s"
+                        " AND fetched_at >= %s::timestamp AT TIME ZONE 'UTC'"
+                        " AND fetched_at < (%s::timestamp + INTERVAL '1 month') AT TIME ZONE 'UTC'"
+                    ),
+                    params,
+                )
+    return ArchivedSlice(table=table, source=source, month=month, path=path, rows=rows)
+
+
+def _replay_file(table: str, path: Path) -> int:
+    if table == "ingestion_events":
+        return _replay_envelopes(path)
+    schema = _schema_for(table)
+    columns = sql.SQL(", ").join(sql.Identifier(column) for column in schema.names)
+    with pooled_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                sql.SQL("CREATE TEMP TABLE archive_replay (LIKE bronze.{}) ON COMMIT DROP").format(
+                    sql.Identifier(table)
+                )
+            )
+            with cur.copy(sql.SQL("COPY archive_replay ({}) FROM STDIN").format(columns)) as copy:
+                for batch in pq.ParquetFile(path).iter_batches(batch_size=ARCHIVE_CHUNK_ROWS):
+                    for row in zip(*(column.to_pylist() for column in batch.columns)):
+                        copy.write_row(row)
+            cur.execute(
+                sql.SQL(
+                    "INSERT INTO bronze.{0} ({1}) SELECT DISTINCT {1} FROM archive_replay AS s"
+                    " WHERE NOT EXISTS (SELECT 1 FROM bronze.{0} AS t WHERE t.uid = s.uid)"
+                ).format(sql.Identifier(table), columns)
+            )
+            return cur.rowcount
+
+
+def _replay_envelopes(path: Path) -> int:
+    """Load archived envelopes through the regular bronze writer.
+
+    Typed ``price_rows`` and content hashes are rebuilt, and uids or contents
+    already in bronze are skipped. ``created_at`` is reset to the replay time.
+    """
+    inserted = 0
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=ARCHIVE_CHUNK_ROWS):
+        envelopes = [
+            RawEnvelope(
+                source=row["source"],
+                endpoint=row["endpoint"],
+                request_params=json.loads(row["request_params"]),
+                asset=row["asset"],
+                currency=row["currency"],
+                uid=row["uid"],
+                fetched_at=row["fetched_at"].isoformat(),
+                payload=json.loads(row["payload"]),
+            )
+            for row in batch.to_pylist()
+        ]
+        inserted += insert_missing_envelopes(envelopes)
+    return inserted
+
+
+def _record_batch(schema: pa.Schema, rows: list[tuple[Any, ...]]) -> pa.RecordBatch:
+    return pa.RecordBatch.from_arrays(
+        [pa.array(values, type=field.type) for values, field in zip(zip(*rows), schema)],
+        schema=schema,
+    )
+
+
+def _select_column(column: str) -> sql.Composable:
+    if column in _TEXT_CASTS:
+        return sql.SQL("{}::text").format(sql.Identifier(column))
+    return sql.Identifier(column)
+
+
+def _schema_for(table: str) -> pa.Schema:
+    schema = ARCHIVE_SCHEMAS.get(table)
+    if schema is None:
+        raise ValueError(f"Unsupported bronze archive table: {table}")
+    return schema
+
+
+def _fsync(path: Path) -> None:
+    with path.open("rb") as handle:
+        os.fsync(handle.fileno())
@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Iterable, Mapping
+
+from psycopg.types.json import Json
+
+from ingestion.models import RawEnvelope
+from storage.bronze_partitions import ensure_event_partitions
+from storage.connection_pool import pooled_connection
+from storage.raw_postgres import COPY_MIN_ROWS, PRICE_ROW_PARSERS, insert_price_rows, price_rows_from_envelope
+
+COMPACTION_LOCK_TIMEOUT = "5s"
+
+
+@dataclass(frozen=True)
+class CompactionGroup:
+    source: str
+    symbol: str
+    currency: str
+    series_type: str | None
+    month: date
+
+
+@dataclass(frozen=True)
+class CompactedEnvelope:
+    envelope: RawEnvelope
+    row_fetched_at: tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class CompactionResult:
+    group: CompactionGroup
+    uid: str
+    superseded: int
+    rows: int
+
+
+def compact_bronze(
+    *,
+    sources: Iterable[str] | None = None,
+    symbols: Iterable[str] | None = None,
+) -> list[CompactionResult]:
+    """Fold each series' overlapping price envelopes, one month at a time.
+
+    A group is one series and one ``bronze.ingestion_events`` month partition,
+    so the compacted envelope stays in the partition of the envelopes it
+    replaces and expires with them. Groups are compacted one per transaction,
+    under a per-group advisory lock and a short ``lock_timeout``, so ingestion
+    and silver keep running. Groups locked by another compaction are skipped
+    and picked up by the next run.
+    """
+    results: list[CompactionResult] = []
+    for group in compaction_groups(sources=sources, symbols=symbols):
+        result = _compact_group(group)
+        if result is not None:
+            results.append(result)
+    return results
+
+
+def compaction_groups(
+    *,
+    sources: Iterable[str] | None = None,
+    symbols: Iterable[str] | None = None,
+) -> list[CompactionGroup]:
+    wanted_sources = sorted(PRICE_ROW_PARSERS if sources is None else set(sources) & set(PRICE_ROW_PARSERS))
+    wanted_symbols = list(symbols) if symbols is not None else None
+    with pooled_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT
+                    source,
+                    request_params->>'symbol' AS symbol,
+                    currency,
+                    request_params->>'series_type' AS series_type,
+                    date_trunc('month', fetched_at AT TIME ZONE 'UTC')::date AS month
+                FROM bronze.ingestion_events
+                WHERE source = ANY(%s)
+                  AND request_params ? 'symbol'
+                  AND (%s::text[] IS NULL OR request_params->>'symbol' = ANY(%s::text[]))
+                GROUP BY 1, 2, 3, 4, 5
+                HAVING COUNT(*) > 1
+                ORDER BY 1, 2, 3, 4, 5
+                """,
+                (wanted_sources, wanted_symbols, wanted_symbols),
+            )
+            return [CompactionGroup(*row) for row in cur.fetchall()]
+
+
+def compact_envelopes(
+    envelopes: list[RawEnvelope],
+    *,
+    newer: Mapping[date, tuple[datetime, datetime]] | None = None,
+) -> CompactedEnvelope | None:
+    """Build one envelope holding, per price date, the row silver would keep.
+
+    Silver keeps the row with the latest ``(price_ts, fetched_at)`` per date;
+    ties go to the later envelope in ``envelopes``. Dates whose best rank in
+    ``newer`` (rows held outside ``envelopes``) beats every row here are
+    dropped, as are rows that do not parse as prices. The compacted envelope
+    takes the newest envelope's metadata and ``fetched_at``; each row keeps
+    the ``fetched_at`` of the envelope it came from in ``row_fetched_at``.
+    """
+    if not envelopes:
+        return None
+    parse = PRICE_ROW_PARSERS[envelopes[0].source]
+    winners: dict[date, tuple[tuple[datetime, datetime], dict[str, Any], str]] = {}
+    for env in envelopes:
+        for row in env.payload.get("rows") or []:
+            parsed = parse(row)
+            if parsed is None:
+                continue
+            price_ts, _price = parsed
+            rank = (price_ts, datetime.fromisoformat(env.fetched_at))
+            current = winners.get(price_ts.date())
+            if current is None or rank >= current[0]:
+                winners[price_ts.date()] = (rank, row, env.fetched_at)
+    if newer:
+        winners = {day: win for day, win in winners.items() if day not in newer or win[0] >= newer[day]}
+    if not winners:
+        return None
+
+    newest = max(envelopes, key=lambda env: datetime.fromisoformat(env.fetched_at))
+    ordered = sorted(winners.values(), key=lambda item: item[0][0])
+    bounds = {"start_date": min(winners).isoformat(), "end_date": max(winners).isoformat()}
+    payload = {**newest.payload, "rows": [row for _, row, _ in ordered]}
+    payload.update({key: value for key, value in bounds.items() if key in payload})
+    envelope = RawEnvelope(
+        source=newest.source,
+        endpoint=newest.endpoint,
+        request_params={**newest.request_params, **bounds, "compacted": True},
+        asset=newest.asset,
+        currency=newest.currency,
+        uid=str(uuid.uuid4()),
+        fetched_at=newest.fetched_at,
+        payload=payload,
+    )
+    return CompactedEnvelope(envelope=envelope, row_fetched_at=tuple(fetched_at for _, _, fetched_at in ordered))
+
+
+def _compact_group(group: CompactionGroup) -> CompactionResult | None:
+    series = (group.source, group.symbol, group.currency, group.series_type)
+    month_window = (group.month, group.month)
+    lock_key = "|".join([group.source, group.symbol, group.currency, group.series_type or "", f"{group.month:%Y-%m}"])
+    with pooled_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT set_config('lock_timeout', %s, true)", (COMPACTION_LOCK_TIMEOUT,))
+            cur.execute(
+                "SELECT pg_try_advisory_xact_lock(hashtext('bronze.compaction'), hashtext(%s))",
+                (lock_key,),
+            )
+            if not cur.fetchone()[0]:
+                conn.rollback()
+                return None
+
+            cur.execute(
+                """
+                SELECT uid::text, source, endpoint, request_params, asset, currency, fetched_at, payload
+                FROM bronze.ingestion_events
+                WHERE source = %s
+                  AND request_params->>'symbol' = %s
+                  AND currency = %s
+                  AND request_params->>'series_type' IS NOT DISTINCT FROM %s
+                  AND fetched_at >= %s::timestamp AT TIME ZONE 'UTC'
+                  AND fetched_at < (%s::date + INTERVAL '1 month') AT TIME ZONE 'UTC'
+                ORDER BY fetched_at, uid
+                """,
+                (*series, *month_window),
+            )
+            envelopes = [
+                RawEnvelope(
+                    source=source,
+                    endpoint=endpoint,
+                    request_params=request_params,
+                    asset=asset,
+                    currency=currency,
+                    uid=uid,
+                    fetched_at=fetched_at.isoformat(),
+                    payload=payload,
+                )
+                for uid, source, endpoint, request_params, asset, currency, fetched_at, payload in cur.fetchall()
+            ]
+            if len(envelopes) < 2:
+                conn.rollback()
+                return None
+
+            old_uids = [env.uid for env in envelopes]
+            # Best row per date held by the series' other months, so dates a
+            # later fetch already supersedes are not carried forward here.
+            cur.execute(
+                """
+                SELECT DISTINCT ON (price_date) price_date, price_ts, fetched_at
+                FROM bronze.price_rows
+                WHERE symbol = %s
+                  AND currency = %s
+                  AND source = %s
+                  AND series_type IS NOT DISTINCT FROM %s
+                  AND uid <> ALL(%s::uuid[])
+                ORDER BY price_date, price_ts DESC, fetched_at DESC
+                """,
+                (group.symbol, group.currency, group.source, group.series_type, old_uids),
+            )
+            newer = {price_date: (price_ts, fetched_at) for price_date, price_ts, fetched_at in cur.fetchall()}
+            result = compact_envelopes(envelopes, newer=newer)
+            if result is None:
+                conn.rollback()
+                return None
+            compacted = result.envelope
+
+            cur.execute("DELETE FROM bronze.price_rows WHERE uid = ANY(%s::uuid[])", (old_uids,))
+            # Superseded hashes keep deduplicating re-fetches of the same content.
+            cur.execute(
+                "UPDATE bronze.envelope_hashes SET uid = %s WHERE uid = ANY(%s::uuid[])",
+                (compacted.uid, old_uids),
+            )
+            cur.execute(
+                """
+                DELETE FROM bronze.ingestion_events
+                WHERE source = %s
+                  AND uid = ANY(%s::uuid[])
+                  AND fetched_at >= %s::timestamp AT TIME ZONE 'UTC'
+                  AND fetched_at < (%s::date + INTERVAL '1 month') AT TIME ZONE 'UTC'
+                """,
+                (group.source, old_uids, *month_window),
+            )
+
+            ensure_event_partitions(cur, [compacted])
+            cur.execute(
+                """
+                INSERT INTO bronze.ingestion_events (
+                    source,
+                    endpoint,
+                    request_params,
+                    asset,
+                    currency,
+                    uid,
+                    fetched_at,
+                    payload
+                )
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                """,
+                (
+                    compacted.source,
+                    compacted.endpoint,
+                    Json(compacted.request_params),
+                    compacted.asset,
+                    compacted.currency,
+                    compacted.uid,
+                    compacted.fetched_at,
+                    Json(compacted.payload),
+                ),
+            )
+            # Typed rows keep the fetched_at of the envelope they came from, so
+            # silver sees the rows it already holds and leaves them untouched.
+            insert_price_rows(
+                cur,
+                [
+                    (*row[:-1], fetched_at)
+                    for row, fetched_at in zip(price_rows_from_envelope(compacted), result.row_fetched_at)
+                ],
+                copy_min_rows=COPY_MIN_ROWS,
+            )
+            cur.execute(
+                """
+                INSERT INTO bronze.envelope_hashes (content_hash, uid, source)
+                VALUES (%s, %s, %s)
+                ON CONFLICT (content_hash) DO NOTHING
+                """,
+                (compacted.content_hash(), compacted.uid, compacted.source),
+            )
+
+            cur.execute(
+                "UPDATE bronze.envelope_lineage SET compacted_uid = %s WHERE compacted_uid = ANY(%s::uuid[])",
+                (compacted.uid, old_uids),
+            )
+            cur.executemany(
+                """
+                INSERT INTO bronze.envelope_lineage (
+                    superseded_uid,
+                    compacted_uid,
+                    source,
+                    symbol,
+                    currency,
+                    superseded_fetched_at
+                )
+                VALUES (%s, %s, %s, %s, %s, %s)
+                """,
+                [
+                    (env.uid, compacted.uid, group.source, group.symbol, group.currency, env.fetched_at)
+                    for env in envelopes
+                ],
+            )
+        conn.commit()
+    return CompactionResult(
+        group=group,
+        uid=compacted.uid,
+        superseded=len(envelopes),
+        rows=len(compacted.payload["rows"]),
+    )
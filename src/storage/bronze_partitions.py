@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import os
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import Iterable
+
+import psycopg
+from psycopg import sql
+
+from ingestion.models import RawEnvelope
+from storage.connection_pool import pooled_connection
+
+DEFAULT_RETENTION_MONTHS = 24
+
+_MONTH_SUFFIX = re.compile(r"_(\d{4})(\d{2})$")
+
+
+# Rows keyed by envelope uid that outlive their ingestion_events partition
+# unless removed with it.
+PARTITION_SIDE_TABLES = (
+    ("bronze", "price_rows"),
+    ("bronze", "envelope_hashes"),
+    ("silver", "processed_envelopes"),
+)
+
+
+@dataclass(frozen=True)
+class EventPartition:
+    name: str
+    parent: str | None
+    month: date
+    detach_pending: bool = False
+
+
+def ensure_event_partitions(
+    cur: psycopg.Cursor,
+    envelopes: Iterable[RawEnvelope],
+    *,
+    with_gin: bool | None = None,
+) -> None:
+    keys = sorted({(env.source, _month_of(env.fetched_at)) for env in envelopes})
+    if not keys:
+        return
+    if with_gin is None:
+        with_gin = _payload_gin_enabled()
+    cur.execute(
+        """
+        SELECT bronze.ensure_ingestion_events_partition(p.source, p.month, %s)
+        FROM unnest(%s::text[], %s::date[]) AS p(source, month)
+        """,
+        (with_gin, [source for source, _ in keys], [month for _, month in keys]),
+    )
+
+
+def list_event_partitions() -> list[EventPartition]:
+    with pooled_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT child.relname, parent.relname, i.inhdetachpending
+                FROM pg_inherits AS i
+                JOIN pg_class AS child ON child.oid = i.inhrelid
+                JOIN pg_class AS parent ON parent.oid = i.inhparent
+                JOIN pg_inherits AS top ON top.inhrelid = parent.oid
+                WHERE top.inhparent = 'bronze.ingestion_events'::regclass
+                ORDER BY child.relname
+                """
+            )
+            rows = cur.fetchall()
+
+    return _month_partitions(rows)
+
+
+def list_detached_event_partitions() -> list[EventPartition]:
+    """Month tables left in ``bronze`` by an earlier detach; their ``parent`` is ``None``."""
+    with pooled_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT c.relname, NULL, false
+                FROM pg_class AS c
+                JOIN pg_namespace AS n ON n.oid = c.relnamespace
+                WHERE n.nspname = 'bronze'
+                  AND c.relkind = 'r'
+                  AND NOT c.relispartition
+                  AND c.relname ~ '^ingestion_events_.+_[0-9]{6}$'
+                ORDER BY c.relname
+                """
+            )
+            rows = cur.fetchall()
+    return _month_partitions(rows)
+
+
+def _month_partitions(rows: Iterable[tuple[str, str | None, bool]]) -> list[EventPartition]:
+    partitions: list[EventPartition] = []
+    for name, parent, detach_pending in rows:
+        match = _MONTH_SUFFIX.search(name)
+        if match is None:
+            continue
+        partitions.append(
+            EventPartition(
+                name=name,
+                parent=parent,
+                month=date(int(match.group(1)), int(match.group(2)), 1),
+                detach_pending=detach_pending,
+            )
+        )
+    return partitions
+
+
+def expired_partitions(
+    partitions: Iterable[EventPartition],
+    retention_months: int = DEFAULT_RETENTION_MONTHS,
+    today: date | None = None,
+) -> list[EventPartition]:
+    if retention_months < 1:
+        raise ValueError("retention_months must be >= 1")
+    current = today or datetime.now(timezone.utc).date()
+    index = current.year * 12 + current.month - 1 - retention_months
+    cutoff = date(index // 12, index % 12 + 1, 1)
+    return [partition for partition in partitions if partition.month < cutoff]
+
+
+def apply_retention(
+    retention_months: int = DEFAULT_RETENTION_MONTHS,
+    *,
+    drop: bool = False,
+    today: date | None = None,
+) -> list[EventPartition]:
+    """Detach month partitions older than ``retention_months``; drop them if asked.
+
+    Partitions are detached with ``DETACH PARTITION ... CONCURRENTLY``, which
+    does not block writers on the parent. A detach interrupted by an earlier
+    run is finalized. The partition's rows in ``PARTITION_SIDE_TABLES`` are
+    then deleted in one transaction, together with the ``DROP TABLE`` when
+    ``drop`` is set. Detached partitions stay behind as plain ``bronze``
+    tables so they can be archived before being dropped; with ``drop`` set,
+    expired tables left detached by an earlier run are dropped as well.
+    """
+    partitions = list_event_partitions()
+    if drop:
+        partitions += list_detached_event_partitions()
+    expired = expired_partitions(partitions, retention_months, today)
+    if not expired:
+        return []
+    with pooled_connection() as conn:
+        # DETACH ... CONCURRENTLY cannot run inside a transaction block.
+        conn.autocommit = True
+        try:
+            with conn.cursor() as cur:
+                for partition in expired:
+                    if partition.parent is None:
+                        continue
+                    cur.execute(
+                        sql.SQL("ALTER TABLE bronze.{} DETACH PARTITION bronze.{} {}").format(
+                            sql.Identifier(partition.parent),
+                            sql.Identifier(partition.name),
+                            sql.SQL("FINALIZE" if partition.detach_pending else "CONCURRENTLY"),
+                        )
+                    )
+        finally:
+            conn.autocommit = False
+    with pooled_connection() as conn:
+        with conn.cursor() as cur:
+            side_tables = existing_side_tables(cur)
+            for partition in expired:
+                for schema, table in side_tables:
+                    cur.execute(
+                        sql.SQL("DELETE FROM {} WHERE uid IN (SELECT uid FROM bronze.{})").format(
+                            sql.Identifier(schema, table),
+                            sql.Identifier(partition.name),
+                        )
+                    )
+                if drop:
+                    cur.execute(
+                        sql.SQL("DROP TABLE bronze.{}").format(sql.Identifier(partition.name))
+                    )
+        conn.commit()
+    return expired
+
+
+def existing_side_tables(
+    cur: psycopg.Cursor,
+    tables: Iterable[tuple[str, str]] = PARTITION_SIDE_TABLES,
+) -> list[tuple[str, str]]:
+    """The ``(schema, table)`` pairs of ``tables`` that exist in the database."""
+    tables = list(tables)
+    cur.execute(
+        "SELECT to_regclass(t.name) IS NOT NULL FROM unnest(%s::text[]) WITH ORDINALITY AS t(name, i) ORDER BY t.i",
+        ([f"{schema}.{table}" for schema, table in tables],),
+    )
+    return [table for table, (exists,) in zip(tables, cur.fetchall()) if exists]
+
+
+def _month_of(fetched_at: str) -> date:
+    value = datetime.fromisoformat(fetched_at)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    value = value.astimezone(timezone.utc)
+    return date(value.year, value.month, 1)
+
+
+def _payload_gin_enabled() -> bool:
+    return os.environ.get("FINANCES_HUB_BRONZE_PAYLOAD_GIN", "").lower() in {"1", "true", "yes"}
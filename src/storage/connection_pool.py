@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import os
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Iterator
+
+import psycopg
+
+DEFAULT_POOL_SIZE = 4
+
+_default_dsn: str | None = None
+_default_size = DEFAULT_POOL_SIZE
+_pools: dict[str, "ConnectionPool"] = {}
+_pools_lock = threading.Lock()
+
+
+class ConnectionPool:
+    """Small thread-safe pool of warm psycopg connections for one DSN.
+
+    At most ``max_size`` connections are checked out at once; idle ones are kept
+    for reuse. Leaving ``connection()`` commits on success and rolls back on error,
+    like ``psycopg.connect`` used as a context manager.
+    """
+
+    def __init__(self, conninfo: str, max_size: int = DEFAULT_POOL_SIZE) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be >= 1")
+        self.conninfo = conninfo
+        self.max_size = max_size
+        self._idle: deque[psycopg.Connection] = deque()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def connection(self) -> Iterator[psycopg.Connection]:
+        self._slots.acquire()
+        try:
+            conn = self._checkout()
+            try:
+                yield conn
+            except BaseException:
+                self._discard_or_rollback(conn)
+                raise
+            else:
+                if not conn.closed:
+                    conn.commit()
+                self._checkin(conn)
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        with self._lock:
+            idle = list(self._idle)
+            self._idle.clear()
+        for conn in idle:
+            conn.close()
+
+    def _checkout(self) -> psycopg.Connection:
+        with self._lock:
+            while self._idle:
+                conn = self._idle.pop()
+                if not (conn.closed or conn.broken):
+                    return conn
+        return psycopg.connect(self.conninfo)
+
+    def _checkin(self, conn: psycopg.Connection) -> None:
+        if conn.closed or conn.broken:
+            return
+        with self._lock:
+            self._idle.append(conn)
+
+    def _discard_or_rollback(self, conn: psycopg.Connection) -> None:
+        if conn.closed or conn.broken:
+            return
+        try:
+            conn.rollback()
+        except psycopg.Error:
+            conn.close()
+            return
+        self._checkin(conn)
+
+
+def configure_pool(dsn: str | None = None, max_size: int = DEFAULT_POOL_SIZE) -> None:
+    global _default_dsn, _default_size
+    with _pools_lock:
+        _default_dsn = dsn
+        _default_size = max_size
+
+
+def resolve_conninfo(dsn: str | None = None) -> str:
+    conninfo = dsn or _default_dsn or os.environ.get("FINANCES_HUB_PG_DSN")
+    if not conninfo:
+        raise ValueError("Missing FINANCES_HUB_PG_DSN environment variable.")
+    return conninfo
+
+
+def get_pool(dsn: str | None = None) -> ConnectionPool:
+    conninfo = resolve_conninfo(dsn)
+    with _pools_lock:
+        pool = _pools.get(conninfo)
+        if pool is None:
+            pool = ConnectionPool(conninfo, max_size=_default_size)
+            _pools[conninfo] = pool
+        return pool
+
+
+@contextmanager
+def pooled_connection(dsn: str | None = None) -> Iterator[psycopg.Connection]:
+    with get_pool(dsn).connection() as conn:
+        yield conn
+
+
+def close_pools() -> None:
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
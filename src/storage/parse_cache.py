@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import uuid
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+DEFAULT_PARSE_CACHE_DIR = Path("data/cache/parse")
+PARSE_CACHE_COMPRESSION = "zstd"
+HASH_CHUNK_BYTES = 1024 * 1024
+
+
+def file_sha256(path: str | Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        while chunk := handle.read(HASH_CHUNK_BYTES):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_path(namespace: str, sha256: str, parser_version: str, base_dir: Path | None = None) -> Path:
+    """``<root>/<namespace>/v<parser_version>/<sha[:2]>/<sha>.parquet``; a new version starts an empty tree."""
+    root = base_dir or Path(os.environ.get("FINANCES_HUB_PARSE_CACHE_DIR", DEFAULT_PARSE_CACHE_DIR))
+    return root / namespace / f"v{parser_version}" / sha256[:2] / f"{sha256}.parquet"
+
+
+def read_cached_rows(
+    namespace: str,
+    sha256: str,
+    parser_version: str,
+    base_dir: Path | None = None,
+) -> pd.DataFrame | None:
+    path = cache_path(namespace, sha256, parser_version, base_dir)
+    if not path.exists():
+        return None
+    return pq.read_table(path).to_pandas()
+
+
+def write_cached_rows(
+    namespace: str,
+    sha256: str,
+    parser_version: str,
+    frame: pd.DataFrame,
+    base_dir: Path | None = None,
+) -> Path:
+    """Store string columns as zstd Parquet; the file is renamed into place so concurrent writers are safe."""
+    path = cache_path(namespace, sha256, parser_version, base_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    schema = pa.schema([(str(column), pa.string()) for column in frame.columns])
+    table = pa.Table.from_pandas(frame.astype(str), schema=schema, preserve_index=False)
+    tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        pq.write_table(table, tmp_path, compression=PARSE_CACHE_COMPRESSION)
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    return path
@@ -1,25 +1,324 @@
 from __future__ import annotations
 
+import atexit
+import gzip
 import json
+import os
+import re
+import threading
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Iterator
 
 from ingestion.models import RawEnvelope
 
+DEFAULT_RAW_DIR = Path("data/raw")
+SEGMENT_MAX_BYTES = 64 * 1024 * 1024
+BLOCK_MAX_ENVELOPES = 256
+SEGMENT_SUFFIX = ".jsonl.gz"
+INDEX_SUFFIX = ".idx.jsonl"
+PART_SUFFIX = ".part"
+
+_SEGMENT_PID = re.compile(r"^seg-\d{8}T\d{6}-(\d+)-")
+
+
+@dataclass(frozen=True)
+class IndexEntry:
+    uid: str
+    asset: str
+    fetched_at: str
+    offset: int
+    length: int
+    content_hash: str | None = None
+
+
+class SegmentWriter:
+    """One gzip segment plus its sidecar index, visible to readers only once finalized.
+
+    Envelopes are written in blocks, each its own gzip member, so a reader can
+    seek to a block's byte offset and decompress just that block. Both files are
+    written under a ``.part`` name and renamed into place (index first) by
+    ``finalize``, so readers never see a partial segment and concurrent
+    writers never share a file. Each block is fsynced (data before index), so
+    if the writer dies, ``recover_segments`` can finalize the complete blocks.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        directory.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        name = f"seg-{stamp}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.path = directory / f"{name}{SEGMENT_SUFFIX}"
+        self.index_path = directory / f"{name}{INDEX_SUFFIX}"
+        self._data = _part(self.path).open("wb")
+        self._index = _part(self.index_path).open("w", encoding="utf-8")
+        self.size = 0
+
+    def write_block(self, envelopes: list[tuple[str, RawEnvelope]]) -> None:
+        body = "".join(json.dumps(env.to_dict(), ensure_ascii=False) + "\n" for _, env in envelopes)
+        member = gzip.compress(body.encode("utf-8"), mtime=0)
+        offset = self.size
+        self._data.write(member)
+        self.size += len(member)
+        for content_hash, env in envelopes:
+            entry = {
+                "uid": env.uid,
+                "asset": env.asset,
+                "fetched_at": env.fetched_at,
+                "offset": offset,
+                "length": len(member),
+                "content_hash": content_hash,
+            }
+            self._index.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        for handle in (self._data, self._index):
+            handle.flush()
+            os.fsync(handle.fileno())
+
+    def finalize(self) -> Path:
+        for handle in (self._index, self._data):
+            handle.flush()
+            os.fsync(handle.fileno())
+            handle.close()
+        os.replace(_part(self.index_path), self.index_path)
+        os.replace(_part(self.path), self.path)
+        return self.path
+
+
+_open_segments: dict[tuple[Path, str, date], SegmentWriter] = {}
+_known_hashes: dict[tuple[Path, str], set[str]] = {}
+_segments_lock = threading.RLock()
+
 
 def write_envelopes(
     category: str,
     envelopes: Iterable[RawEnvelope],
     base_dir: Path | None = None,
-) -> Path:
-    root = base_dir or Path("data/raw")
-    target_dir = root / category
-    target_dir.mkdir(parents=True, exist_ok=True)
-    file_path = target_dir / "raw.jsonl"
+    max_segment_bytes: int = SEGMENT_MAX_BYTES,
+) -> list[Path]:
+    """Append envelopes to the open segment of their UTC day.
 
-    with file_path.open("a", encoding="utf-8") as handle:
+    Envelopes whose ``content_hash`` is already in the category (in a finalized
+    segment, an open one, or earlier in this batch) are skipped. Returns the
+    path of every segment written to, one per UTC day, which is empty when
+    every envelope was skipped. Before segments this returned the single
+    ``raw.jsonl`` path of the category.
+    """
+    root = base_dir or DEFAULT_RAW_DIR
+    paths: list[Path] = []
+    with _segments_lock:
+        known = _category_hashes(root, category)
+        by_day: dict[date, list[tuple[str, RawEnvelope]]] = {}
         for envelope in envelopes:
-            handle.write(json.dumps(envelope.to_dict(), ensure_ascii=False))
-            handle.write("\n")
+            content_hash = envelope.content_hash()
+            if content_hash in known:
+                continue
+            known.add(content_hash)
+            by_day.setdefault(_day_of(envelope.fetched_at), []).append((content_hash, envelope))
+
+        for day, day_envelopes in sorted(by_day.items()):
+            key = (root, category, day)
+            writer = _open_segments.get(key)
+            if writer is None:
+                writer = SegmentWriter(root / category / day.isoformat())
+                _open_segments[key] = writer
+            for start in range(0, len(day_envelopes), BLOCK_MAX_ENVELOPES):
+                writer.write_block(day_envelopes[start : start + BLOCK_MAX_ENVELOPES])
+            paths.append(writer.path)
+            if writer.size >= max_segment_bytes:
+                del _open_segments[key]
+                writer.finalize()
+    return paths
+
+
+def flush_segments(category: str | None = None, base_dir: Path | None = None) -> list[Path]:
+    with _segments_lock:
+        keys = [
+            key
+            for key in _open_segments
+            if (category is None or key[1] == category)
+            and (base_dir is None or key[0] == base_dir)
+        ]
+        return [_open_segments.pop(key).finalize() for key in keys]
+
+
+atexit.register(flush_segments)
+
+
+def recover_segments(category: str | None = None, base_dir: Path | None = None) -> list[Path]:
+    """Finalize ``.part`` segments left behind by writers that died before ``finalize``.
+
+    Parts owned by a live process are left alone. A recovered segment keeps
+    the blocks that are complete in both files; the rest is truncated.
+    Parts without a complete block are deleted.
+    """
+    root = base_dir or DEFAULT_RAW_DIR
+    recovered: list[Path] = []
+    with _segments_lock:
+        open_parts = {_part(writer.path) for writer in _open_segments.values()}
+        for data_part in sorted(root.glob(f"{category or '*'}/*/*{SEGMENT_SUFFIX}{PART_SUFFIX}")):
+            if data_part in open_parts or _writer_alive(data_part):
+                continue
+            segment = data_part.with_name(data_part.name.removesuffix(PART_SUFFIX))
+            if _recover_segment(segment):
+                recovered.append(segment)
+                _known_hashes.pop((root, data_part.parent.parent.name), None)
+    return recovered
+
+
+def list_segments(
+    category: str | None = None,
+    *,
+    base_dir: Path | None = None,
+    start: date | None = None,
+    end: date | None = None,
+) -> list[Path]:
+    root = base_dir or DEFAULT_RAW_DIR
+    recover_segments(category, base_dir=root)
+    pattern = f"{category or '*'}/*/*{SEGMENT_SUFFIX}"
+    segments: list[Path] = []
+    for path in sorted(root.glob(pattern)):
+        try:
+            day = date.fromisoformat(path.parent.name)
+        except ValueError:
+            continue
+        if (start and day < start) or (end and day > end):
+            continue
+        segments.append(path)
+    return segments
+
+
+def read_index(segment: Path) -> list[IndexEntry]:
+    index_path = segment.with_name(segment.name.removesuffix(SEGMENT_SUFFIX) + INDEX_SUFFIX)
+    with index_path.open(encoding="utf-8") as handle:
+        return [IndexEntry(**json.loads(line)) for line in handle if line.strip()]
+
+
+def iter_envelopes(
+    category: str | None = None,
+    *,
+    base_dir: Path | None = None,
+    start: date | None = None,
+    end: date | None = None,
+    asset: str | None = None,
+    uid: str | None = None,
+) -> Iterator[RawEnvelope]:
+    for segment in list_segments(category, base_dir=base_dir, start=start, end=end):
+        yield from read_segment(segment, asset=asset, uid=uid)
+
+
+def read_segment(
+    segment: Path,
+    *,
+    asset: str | None = None,
+    uid: str | None = None,
+) -> Iterator[RawEnvelope]:
+    entries = read_index(segment)
+    if asset is not None or uid is not None:
+        entries = [
+            entry
+            for entry in entries
+            if (asset is None or entry.asset == asset) and (uid is None or entry.uid == uid)
+        ]
+    blocks = sorted({(entry.offset, entry.length) for entry in entries})
+    for envelope in read_blocks(segment, blocks):
+        if (asset is None or envelope.asset == asset) and (uid is None or envelope.uid == uid):
+            yield envelope
+
+
+def read_blocks(segment: Path, blocks: Iterable[tuple[int, int]]) -> Iterator[RawEnvelope]:
+    """Decompress the given ``(offset, length)`` gzip blocks of a segment."""
+    blocks = list(blocks)
+    if not blocks:
+        return
+    with segment.open("rb") as handle:
+        for offset, length in blocks:
+            handle.seek(offset)
+            for line in gzip.decompress(handle.read(length)).decode("utf-8").splitlines():
+                yield RawEnvelope(**json.loads(line))
+
+
+def _category_hashes(root: Path, category: str) -> set[str]:
+    known = _known_hashes.get((root, category))
+    if known is None:
+        known = {
+            entry.content_hash
+            for segment in list_segments(category, base_dir=root)
+            for entry in read_index(segment)
+            if entry.content_hash is not None
+        }
+        _known_hashes[(root, category)] = known
+    return known
+
+
+def _recover_segment(segment: Path) -> bool:
+    index_path = segment.with_name(segment.name.removesuffix(SEGMENT_SUFFIX) + INDEX_SUFFIX)
+    data_part, index_part = _part(segment), _part(index_path)
+    entries: list[IndexEntry] = []
+    if index_part.exists():
+        with index_part.open(encoding="utf-8") as handle:
+            for line in handle:
+                if not line.endswith("\n"):
+                    break
+                entries.append(IndexEntry(**json.loads(line)))
+
+    blocks: dict[int, list[IndexEntry]] = {}
+    for entry in entries:
+        blocks.setdefault(entry.offset, []).append(entry)
+    kept: list[IndexEntry] = []
+    end = 0
+    with data_part.open("rb") as handle:
+        for offset in sorted(blocks):
+            length = blocks[offset][0].length
+            if offset != end:
+                break
+            handle.seek(offset)
+            try:
+                gzip.decompress(handle.read(length))
+            except (EOFError, OSError):
+                break
+            kept.extend(blocks[offset])
+            end = offset + length
+
+    if not kept:
+        data_part.unlink()
+        index_part.unlink(missing_ok=True)
+        return False
+    with data_part.open("r+b") as handle:
+        handle.truncate(end)
+        os.fsync(handle.fileno())
+    with index_part.open("w", encoding="utf-8") as handle:
+        for entry in kept:
+            handle.write(json.dumps(entry.__dict__, ensure_ascii=False) + "\n")
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(index_part, index_path)
+    os.replace(data_part, segment)
+    return True
+
+
+def _writer_alive(data_part: Path) -> bool:
+    match = _SEGMENT_PID.match(data_part.name)
+    if match is None:
+        return False
+    pid = int(match.group(1))
+    if pid == os.getpid():
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _day_of(fetched_at: str) -> date:
+    value = datetime.fromisoformat(fetched_at)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).date()
+
 
-    return file_path
+def _part(path: Path) -> Path:
+    return path.with_name(path.name + PART_SUFFIX)
@@ -1,44 +1,82 @@
 from __future__ import annotations
 
-import os
+import json
 import uuid
-from typing import Iterable
+from datetime import date, datetime, time, timezone
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, Iterable, Iterator, Sequence
 
 import pandas as pd
 import psycopg
 from psycopg.types.json import Json
-from psycopg.rows import dict_row
 from psycopg import sql
 
 from ingestion.models import RawEnvelope
+from storage.bronze_partitions import ensure_event_partitions
+from storage.connection_pool import pooled_connection
 
 
-def _conninfo() -> str:
-    dsn = os.environ.get("FINANCES_HUB_PG_DSN")
-    if not dsn:
-        raise ValueError("Missing FINANCES_HUB_PG_DSN environment variable.")
-    return dsn
-
-
-def insert_envelopes(envelopes: Iterable[RawEnvelope]) -> int:
-    rows = [
-        (
-            env.source,
-            env.endpoint,
-            Json(env.request_params),
-            env.asset,
-            env.currency,
-            env.uid,
-            env.fetched_at,
-            Json(env.payload),
-        )
-        for env in envelopes
-    ]
-    if not rows:
+ENVELOPE_COLUMNS = [
+    "source",
+    "endpoint",
+    "request_params",
+    "asset",
+    "currency",
+    "uid",
+    "fetched_at",
+    "payload",
+]
+PRICE_ROW_COLUMNS = [
+    "uid",
+    "source",
+    "symbol",
+    "asset",
+    "currency",
+    "series_type",
+    "price_ts",
+    "price_date",
+    "price",
+    "fetched_at",
+]
+COPY_BATCH_SIZE = 5000
+COPY_MIN_ROWS = 50
+
+
+def insert_envelopes(
+    envelopes: Iterable[RawEnvelope],
+    *,
+    batch_size: int = COPY_BATCH_SIZE,
+    copy_min_rows: int = COPY_MIN_ROWS,
+) -> int:
+    envelopes = list(envelopes)
+    if not envelopes:
         return 0
+    if len(envelopes) < copy_min_rows:
+        return _insert_envelopes_executemany(envelopes)
+    return _copy_envelopes(envelopes, batch_size=batch_size)
 
-    with psycopg.connect(_conninfo(), row_factory=dict_row) as conn:
+
+def _insert_envelopes_executemany(envelopes: list[RawEnvelope]) -> int:
+    with pooled_connection() as conn:
         with conn.cursor() as cur:
+            envelopes = _claim_content_hashes(cur, envelopes)
+            if not envelopes:
+                conn.commit()
+                return 0
+            rows = [
+                (
+                    env.source,
+                    env.endpoint,
+                    Json(env.request_params),
+                    env.asset,
+                    env.currency,
+                    env.uid,
+                    env.fetched_at,
+                    Json(env.payload),
+                )
+                for env in envelopes
+            ]
+            ensure_event_partitions(cur, envelopes)
             cur.executemany(
                 """
                 INSERT INTO bronze.ingestion_events (
@@ -55,10 +93,273 @@ def insert_envelopes(envelopes: Iterable[RawEnvelope]) -> int:
                 """,
                 rows,
             )
+            write_price_rows(cur, envelopes, copy_min_rows=COPY_MIN_ROWS)
         conn.commit()
     return len(rows)
 
 
+def _copy_envelopes(envelopes: list[RawEnvelope], *, batch_size: int) -> int:
+    if batch_size < 1:
+        raise ValueError("batch_size must be >= 1")
+
+    query = sql.SQL("COPY bronze.ingestion_events ({}) FROM STDIN").format(
+        sql.SQL(", ").join(sql.Identifier(column) for column in ENVELOPE_COLUMNS)
+    )
+    with pooled_connection() as conn:
+        with conn.cursor() as cur:
+            envelopes = _claim_content_hashes(cur, envelopes)
+            if not envelopes:
+                conn.commit()
+                return 0
+            ensure_event_partitions(cur, envelopes)
+            for offset in range(0, len(envelopes), batch_size):
+                with cur.copy(query) as copy:
+                    for env in envelopes[offset : offset + batch_size]:
+                        copy.write_row(
+                            (
+                                env.source,
+                                env.endpoint,
+                                json.dumps(env.request_params),
+                                env.asset,
+                                env.currency,
+                                env.uid,
+                                env.fetched_at,
+                                json.dumps(env.payload),
+                            )
+                        )
+            write_price_rows(cur, envelopes, copy_min_rows=0)
+        conn.commit()
+    return len(envelopes)
+
+
+def _claim_content_hashes(cur: psycopg.Cursor, envelopes: list[RawEnvelope]) -> list[RawEnvelope]:
+    """Register envelope content hashes, returning only envelopes whose content is new.
+
+    Duplicates inside the batch keep their first envelope. The claim runs in the
+    caller's transaction, so a rolled-back insert releases its hashes.
+    """
+    first: dict[str, RawEnvelope] = {}
+    for env in envelopes:
+        first.setdefault(env.content_hash(), env)
+    cur.execute(
+        """
+        INSERT INTO bronze.envelope_hashes (content_hash, uid, source)
+        SELECT *
+        FROM unnest(%s::text[], %s::uuid[], %s::text[])
+        ON CONFLICT (content_hash) DO NOTHING
+        RETURNING content_hash
+        """,
+        (list(first), [env.uid for env in first.values()], [env.source for env in first.values()]),
+    )
+    claimed = {row[0] for row in cur.fetchall()}
+    return [env for content_hash, env in first.items() if content_hash in claimed]
+
+
+def insert_missing_envelopes(envelopes: Iterable[RawEnvelope]) -> int:
+    """COPY envelopes through a staging table, skipping uids and contents already in bronze."""
+    envelopes = list(envelopes)
+    if not envelopes:
+        return 0
+
+    columns = sql.SQL(", ").join(sql.Identifier(column) for column in ENVELOPE_COLUMNS)
+    with pooled_connection() as conn:
+        with conn.cursor() as cur:
+            ensure_event_partitions(cur, envelopes)
+            cur.execute(
+                """
+                CREATE TEMP TABLE envelope_replay (
+                    LIKE bronze.ingestion_events INCLUDING DEFAULTS,
+                    content_hash TEXT NOT NULL
+                ) ON COMMIT DROP
+                """
+            )
+            copy_query = sql.SQL("COPY envelope_replay ({}, content_hash) FROM STDIN").format(columns)
+            with cur.copy(copy_query) as copy:
+                for env in envelopes:
+                    copy.write_row(
+                        (
+                            env.source,
+                            env.endpoint,
+                            json.dumps(env.request_params),
+                            env.asset,
+                            env.currency,
+                            env.uid,
+                            env.fetched_at,
+                            json.dumps(env.payload),
+                            env.content_hash(),
+                        )
+                    )
+            cur.execute(
+                sql.SQL(
+                    """
+                    WITH claimed AS (
+                        INSERT INTO bronze.envelope_hashes (content_hash, uid, source)
+                        SELECT DISTINCT ON (s.content_hash) s.content_hash, s.uid, s.source
+                        FROM envelope_replay AS s
+                        WHERE NOT EXISTS (
+                            SELECT 1
+                            FROM bronze.ingestion_events AS e
+                            WHERE e.uid = s.uid
+                        )
+                        ORDER BY s.content_hash, s.fetched_at, s.uid
+                        ON CONFLICT (content_hash) DO NOTHING
+                        RETURNING content_hash, uid
+                    )
+                    INSERT INTO bronze.ingestion_events ({0})
+                    SELECT DISTINCT ON (s.uid) {1}
+                    FROM envelope_replay AS s
+                    JOIN claimed AS c
+                      ON c.content_hash = s.content_hash
+                     AND c.uid = s.uid
+                    ON CONFLICT DO NOTHING
+                    RETURNING uid::text
+                    """
+                ).format(
+                    columns,
+                    sql.SQL(", ").join(sql.Identifier("s", column) for column in ENVELOPE_COLUMNS),
+                )
+            )
+            inserted = {row[0] for row in cur.fetchall()}
+            fresh: dict[str, RawEnvelope] = {}
+            for env in envelopes:
+                key = str(uuid.UUID(env.uid))
+                if key in inserted:
+                    fresh.setdefault(key, env)
+            write_price_rows(cur, list(fresh.values()), copy_min_rows=COPY_MIN_ROWS)
+        conn.commit()
+    return len(inserted)
+
+
+def price_rows_from_envelope(env: RawEnvelope) -> list[tuple[Any, ...]]:
+    parse = PRICE_ROW_PARSERS.get(env.source)
+    symbol = env.request_params.get("symbol")
+    if parse is None or not symbol or env.currency is None:
+        return []
+
+    rows: list[tuple[Any, ...]] = []
+    for row in env.payload.get("rows") or []:
+        parsed = parse(row)
+        if parsed is None:
+            continue
+        price_ts, price = parsed
+        rows.append(
+            (
+                env.uid,
+                env.source,
+                symbol,
+                env.asset,
+                env.currency,
+                env.request_params.get("series_type"),
+                price_ts,
+                price_ts.date(),
+                price,
+                env.fetched_at,
+            )
+        )
+    return rows
+
+
+def write_price_rows(cur: psycopg.Cursor, envelopes: list[RawEnvelope], *, copy_min_rows: int) -> None:
+    rows = [row for env in envelopes for row in price_rows_from_envelope(env)]
+    insert_price_rows(cur, rows, copy_min_rows=copy_min_rows)
+
+
+def insert_price_rows(cur: psycopg.Cursor, rows: list[tuple[Any, ...]], *, copy_min_rows: int) -> None:
+    if not rows:
+        return
+    if len(rows) < copy_min_rows:
+        cur.executemany(
+            sql.SQL("INSERT INTO bronze.price_rows ({}) VALUES ({})").format(
+                sql.SQL(", ").join(sql.Identifier(column) for column in PRICE_ROW_COLUMNS),
+                sql.SQL(", ").join(sql.Placeholder() for _ in PRICE_ROW_COLUMNS),
+            ),
+            rows,
+        )
+        return
+    query = sql.SQL("COPY bronze.price_rows ({}) FROM STDIN").format(
+        sql.SQL(", ").join(sql.Identifier(column) for column in PRICE_ROW_COLUMNS)
+    )
+    with cur.copy(query) as copy:
+        for row in rows:
+            copy.write_row(row)
+
+
+def _yfinance_price(row: dict[str, Any]) -> tuple[datetime, Decimal] | None:
+    try:
+        price_date = date.fromisoformat(row["date"])
+        price = Decimal(str(row["value"]))
+    except (KeyError, TypeError, ValueError, InvalidOperation):
+        return None
+    if not price.is_finite():
+        return None
+    return datetime.combine(price_date, time.min, tzinfo=timezone.utc), price
+
+
+def _binance_price(row: dict[str, Any]) -> tuple[datetime, Decimal] | None:
+    try:
+        price_ts = datetime.fromtimestamp(int(row["close_time"]) / 1000.0, tz=timezone.utc)
+        price = Decimal(str(row["close"]))
+    except (KeyError, TypeError, ValueError, OverflowError, InvalidOperation):
+        return None
+    if not price.is_finite():
+        return None
+    return price_ts, price
+
+
+PRICE_ROW_PARSERS: dict[str, Callable[[dict[str, Any]], tuple[datetime, Decimal] | None]] = {
+    "yfinance": _yfinance_price,
+    "binance": _binance_price,
+}
+
+
+def fetch_watermark(job_name: str) -> date | None:
+    with pooled_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT last_price_date
+                FROM bronze.ingestion_watermarks
+                WHERE job_name = %s
+                """,
+                (job_name,),
+            )
+            row = cur.fetchone()
+    return row[0] if row else None
+
+
+def upsert_watermark(
+    job_name: str,
+    *,
+    source: str,
+    asset: str,
+    last_price_date: date,
+) -> None:
+    with pooled_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                INSERT INTO bronze.ingestion_watermarks (
+                    job_name,
+                    source,
+                    asset,
+                    last_price_date
+                )
+                VALUES (%s, %s, %s, %s)
+                ON CONFLICT (job_name)
+                DO UPDATE SET
+                    source = EXCLUDED.source,
+                    asset = EXCLUDED.asset,
+                    last_price_date = GREATEST(
+                        bronze.ingestion_watermarks.last_price_date,
+                        EXCLUDED.last_price_date
+                    ),
+                    updated_at = NOW()
+                """,
+                (job_name, source, asset, last_price_date),
+            )
+        conn.commit()
+
+
 def append_dataframe_to_bronze(
     df: pd.DataFrame,
     table_name: str,
@@ -69,6 +370,7 @@ def append_dataframe_to_bronze(
     uid: str | None = None,
     fetched_at: str | None = None,
     schema_name: str = "bronze",
+    copy_min_rows: int = COPY_MIN_ROWS,
 ) -> int:
     if df.empty:
         return 0
@@ -82,36 +384,175 @@ def append_dataframe_to_bronze(
     batch_uid = uid or str(uuid.uuid4())
     batch_fetched_at = fetched_at or RawEnvelope.utc_now_iso()
 
-    prepared = df.copy()
-    prepared["source"] = source
-    prepared["endpoint"] = endpoint
-    prepared["request_params"] = Json(request_params)
-    prepared["uid"] = batch_uid
-    prepared["fetched_at"] = batch_fetched_at
-    prepared = prepared.where(pd.notna(prepared), None)
+    columns = [*df.columns, "source", "endpoint", "request_params", "uid", "fetched_at"]
+    use_copy = len(df) >= copy_min_rows
+    constants = (
+        source,
+        endpoint,
+        json.dumps(request_params) if use_copy else Json(request_params),
+        batch_uid,
+        batch_fetched_at,
+    )
 
-    columns = list(prepared.columns)
-    rows = [tuple(record[col] for col in columns) for record in prepared.to_dict(orient="records")]
+    with pooled_connection() as conn:
+        with conn.cursor() as cur:
+            _write_frame(cur, schema_name, table_name, columns, _frame_rows(df, constants), use_copy)
+        conn.commit()
+    return len(df)
 
-    identifiers = sql.SQL(", ").join(sql.Identifier(column) for column in columns)
-    placeholders = sql.SQL(", ").join(sql.Placeholder() for _ in columns)
-    query = sql.SQL(
-        """
-        INSERT INTO {}.{} ({})
-        VALUES ({})
-        """
-    ).format(
-        sql.Identifier(schema_name),
-        sql.Identifier(table_name),
-        identifiers,
-        placeholders,
-    )
 
-    with psycopg.connect(_conninfo(), row_factory=dict_row) as conn:
+def find_bronze_batch(
+    table_name: str,
+    request_params: dict[str, object],
+    *,
+    schema_name: str = "bronze",
+) -> str | None:
+    """Return the uid of a batch whose ``request_params`` contain ``request_params``."""
+    with pooled_connection() as conn:
         with conn.cursor() as cur:
-            cur.executemany(query, rows)
+            cur.execute(
+                sql.SQL("SELECT uid::text FROM {}.{} WHERE request_params @> %s::jsonb LIMIT 1").format(
+                    sql.Identifier(schema_name),
+                    sql.Identifier(table_name),
+                ),
+                (Json(request_params),),
+            )
+            row = cur.fetchone()
+    return row[0] if row else None
+
+
+def append_dataframes_to_bronze(
+    batches: Iterable[tuple[pd.DataFrame, dict[str, object]]],
+    table_name: str,
+    *,
+    source: str,
+    endpoint: str,
+    fetched_at: str | None = None,
+    schema_name: str = "bronze",
+    copy_min_rows: int = COPY_MIN_ROWS,
+) -> list[str]:
+    """Append several frames in one transaction, each under its own batch uid.
+
+    ``batches`` pairs each frame with its ``request_params``. Frames must share
+    columns. Returns the uid of every non-empty batch, in input order.
+    """
+    if not table_name.strip():
+        raise ValueError("table_name must not be empty.")
+
+    if not schema_name.strip():
+        raise ValueError("schema_name must not be empty.")
+
+    batches = [(df, request_params) for df, request_params in batches if not df.empty]
+    if not batches:
+        return []
+
+    with pooled_connection() as conn:
+        with conn.cursor() as cur:
+            uids = _write_batches(cur, schema_name, table_name, batches, source, endpoint, fetched_at, copy_min_rows)
         conn.commit()
-    return len(rows)
+    return uids
+
+
+def append_missing_dataframes_to_bronze(
+    batches: Iterable[tuple[pd.DataFrame, dict[str, object]]],
+    table_name: str,
+    *,
+    key_params: Sequence[str],
+    source: str,
+    endpoint: str,
+    fetched_at: str | None = None,
+    schema_name: str = "bronze",
+    copy_min_rows: int = COPY_MIN_ROWS,
+) -> list[str | None]:
+    """Like ``append_dataframes_to_bronze``, but skip batches the table already holds.
+
+    A batch is identified by the ``request_params`` named in ``key_params``.
+    The lookup and the insert run in one transaction under a per-key advisory
+    lock, so concurrent runs and repeated keys within ``batches`` append each
+    batch once. Returns, per input batch, its new uid, or ``None`` when it was
+    empty or already loaded.
+    """
+    if not table_name.strip():
+        raise ValueError("table_name must not be empty.")
+
+    if not schema_name.strip():
+        raise ValueError("schema_name must not be empty.")
+
+    batches = list(batches)
+    keys = [
+        json.dumps({name: request_params[name] for name in key_params}, sort_keys=True)
+        for _, request_params in batches
+    ]
+    lock_scope = f"{schema_name}.{table_name}"
+    uids: list[str | None] = [None] * len(batches)
+    with pooled_connection() as conn:
+        with conn.cursor() as cur:
+            loaded: set[str] = set()
+            for key in sorted(set(keys)):
+                cur.execute("SELECT pg_advisory_xact_lock(hashtext(%s), hashtext(%s))", (lock_scope, key))
+                cur.execute(
+                    sql.SQL("SELECT EXISTS (SELECT 1 FROM {}.{} WHERE request_params @> %s::jsonb)").format(
+                        sql.Identifier(schema_name),
+                        sql.Identifier(table_name),
+                    ),
+                    (key,),
+                )
+                if cur.fetchone()[0]:
+                    loaded.add(key)
+
+            pending: list[int] = []
+            for index, ((df, _), key) in enumerate(zip(batches, keys)):
+                if df.empty or key in loaded:
+                    continue
+                loaded.add(key)
+                pending.append(index)
+            if pending:
+                written = _write_batches(
+                    cur,
+                    schema_name,
+                    table_name,
+                    [batches[index] for index in pending],
+                    source,
+                    endpoint,
+                    fetched_at,
+                    copy_min_rows,
+                )
+                for index, uid in zip(pending, written):
+                    uids[index] = uid
+        conn.commit()
+    return uids
+
+
+def _write_batches(
+    cur: psycopg.Cursor,
+    schema_name: str,
+    table_name: str,
+    batches: list[tuple[pd.DataFrame, dict[str, object]]],
+    source: str,
+    endpoint: str,
+    fetched_at: str | None,
+    copy_min_rows: int,
+) -> list[str]:
+    batch_fetched_at = fetched_at or RawEnvelope.utc_now_iso()
+    columns = [*batches[0][0].columns, "source", "endpoint", "request_params", "uid", "fetched_at"]
+    use_copy = sum(len(df) for df, _ in batches) >= copy_min_rows
+    uids = [str(uuid.uuid4()) for _ in batches]
+    rows = (
+        row
+        for (df, request_params), batch_uid in zip(batches, uids)
+        for row in _frame_rows(
+            df,
+            (
+                source,
+                endpoint,
+                json.dumps(request_params) if use_copy else Json(request_params),
+                batch_uid,
+                batch_fetched_at,
+            ),
+        )
+    )
+    _write_frame(cur, schema_name, table_name, columns, rows, use_copy)
+    return uids
 
 
 def overwrite_dataframe_in_bronze(
@@ -119,6 +560,7 @@ def overwrite_dataframe_in_bronze(
     table_name: str,
     *,
     schema_name: str = "bronze",
+    copy_min_rows: int = COPY_MIN_ROWS,
 ) -> int:
     if not table_name.strip():
         raise ValueError("table_name must not be empty.")
@@ -126,9 +568,7 @@ def overwrite_dataframe_in_bronze(
     if not schema_name.strip():
         raise ValueError("schema_name must not be empty.")
 
-    prepared = df.copy().where(pd.notna(df), None)
-
-    with psycopg.connect(_conninfo(), row_factory=dict_row) as conn:
+    with pooled_connection() as conn:
         with conn.cursor() as cur:
             cur.execute(
                 sql.SQL("TRUNCATE TABLE {}.{}").format(
@@ -137,27 +577,186 @@ def overwrite_dataframe_in_bronze(
                 )
             )
 
-            if not prepared.empty:
-                columns = list(prepared.columns)
-                rows = [
-                    tuple(record[col] for col in columns)
-                    for record in prepared.to_dict(orient="records")
-                ]
-                identifiers = sql.SQL(", ").join(sql.Identifier(column) for column in columns)
-                placeholders = sql.SQL(", ").join(sql.Placeholder() for _ in columns)
-                query = sql.SQL(
+            if not df.empty:
+                _write_frame(
+                    cur,
+                    schema_name,
+                    table_name,
+                    list(df.columns),
+                    _frame_rows(df),
+                    len(df) >= copy_min_rows,
+                )
+            # The rewrite invalidates whatever sync_dataframe_to_bronze recorded for this table.
+            cur.execute(
+                "DELETE FROM bronze.load_fingerprints WHERE table_name = %s",
+                (f"{schema_name}.{table_name}",),
+            )
+
+        conn.commit()
+
+    return len(df)
+
+
+def sync_dataframe_to_bronze(
+    df: pd.DataFrame,
+    table_name: str,
+    key_columns: list[str],
+    *,
+    fingerprint: str,
+    schema_name: str = "bronze",
+    copy_min_rows: int = COPY_MIN_ROWS,
+) -> list[tuple[object, ...]] | None:
+    """Make a keyed bronze table match ``df``, touching only rows that differ.
+
+    Returns ``None`` without writing when ``fingerprint`` equals the one
+    recorded by the previous sync of this table and the table still holds the
+    row count recorded with it, so a table truncated or trimmed since is
+    reloaded. Otherwise changed rows are
+    upserted on ``key_columns``, rows whose key is missing from ``df`` are
+    deleted, the fingerprint is recorded, and the keys of every inserted,
+    updated or deleted row are returned.
+    """
+    if not table_name.strip():
+        raise ValueError("table_name must not be empty.")
+
+    if not schema_name.strip():
+        raise ValueError("schema_name must not be empty.")
+
+    columns = list(df.columns)
+    if not key_columns or set(key_columns) - set(columns):
+        raise ValueError("key_columns must be a non-empty subset of the DataFrame columns.")
+
+    target = sql.SQL("{}.{}").format(sql.Identifier(schema_name), sql.Identifier(table_name))
+    keys = sql.SQL(", ").join(sql.Identifier(column) for column in key_columns)
+    values = [column for column in columns if column not in key_columns]
+    fingerprint_key = f"{schema_name}.{table_name}"
+    with pooled_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT pg_advisory_xact_lock(hashtext('bronze.load_fingerprints'), hashtext(%s))",
+                (fingerprint_key,),
+            )
+            cur.execute(
+                "SELECT sha256, row_count FROM bronze.load_fingerprints WHERE table_name = %s",
+                (fingerprint_key,),
+            )
+            row = cur.fetchone()
+            if row is not None and row[0] == fingerprint:
+                cur.execute(sql.SQL("SELECT count(*) FROM {}").format(target))
+                if cur.fetchone()[0] == row[1]:
+                    conn.rollback()
+                    return None
+
+            cur.execute(
+                sql.SQL("CREATE TEMP TABLE bronze_sync (LIKE {} INCLUDING DEFAULTS) ON COMMIT DROP").format(target)
+            )
+            if not df.empty:
+                _write_frame(cur, "pg_temp", "bronze_sync", columns, _frame_rows(df), len(df) >= copy_min_rows)
+
+            if values:
+                on_conflict = sql.SQL(
+                    "DO UPDATE SET ({0}) = ROW({1}) WHERE ({2}) IS DISTINCT FROM ({1})"
+                ).format(
+                    sql.SQL(", ").join(sql.Identifier(column) for column in values),
+                    sql.SQL(", ").join(sql.Identifier("excluded", column) for column in values),
+                    sql.SQL(", ").join(sql.Identifier("t", column) for column in values),
+                )
+            else:
+                on_conflict = sql.SQL("DO NOTHING")
+            cur.execute(
+                sql.SQL(
                     """
-                    INSERT INTO {}.{} ({})
-                    VALUES ({})
+                    INSERT INTO {0} AS t ({1})
+                    SELECT {1}
+                    FROM bronze_sync
+                    ON CONFLICT ({2}) {3}
+                    RETURNING {2}
                     """
                 ).format(
-                    sql.Identifier(schema_name),
-                    sql.Identifier(table_name),
-                    identifiers,
-                    placeholders,
+                    target,
+                    sql.SQL(", ").join(sql.Identifier(column) for column in columns),
+                    keys,
+                    on_conflict,
                 )
-                cur.executemany(query, rows)
-
+            )
+            changed = list(cur.fetchall())
+            cur.execute(
+                sql.SQL(
+                    """
+                    DELETE FROM {0} AS t
+                    WHERE NOT EXISTS (
+                        SELECT 1
+                        FROM bronze_sync AS s
+                        WHERE ({1}) = ({2})
+                    )
+                    RETURNING {3}
+                    """
+                ).format(
+                    target,
+                    sql.SQL(", ").join(sql.Identifier("s", column) for column in key_columns),
+                    sql.SQL(", ").join(sql.Identifier("t", column) for column in key_columns),
+                    keys,
+                )
+            )
+            changed.extend(cur.fetchall())
+            cur.execute(
+                """
+                INSERT INTO bronze.load_fingerprints (table_name, sha256, row_count)
+                VALUES (%s, %s, %s)
+                ON CONFLICT (table_name)
+                DO UPDATE SET
+                    sha256 = EXCLUDED.sha256,
+                    row_count = EXCLUDED.row_count,
+                    loaded_at = NOW()
+                """,
+                (fingerprint_key, fingerprint, len(df)),
+            )
         conn.commit()
 
-    return len(prepared)
+    return sorted(tuple(row) for row in changed)
+
+
+def _frame_rows(df: pd.DataFrame, constants: tuple[object, ...] = ()) -> Iterator[tuple[object, ...]]:
+    for record in df.itertuples(index=False, name=None):
+        yield tuple(None if _is_null(value) else value for value in record) + constants
+
+
+def _is_null(value: object) -> bool:
+    if value is None or value is pd.NA or value is pd.NaT:
+        return True
+    return isinstance(value, float) and value != value
+
+
+def _write_frame(
+    cur: psycopg.Cursor,
+    schema_name: str,
+    table_name: str,
+    columns: list[str],
+    rows: Iterator[tuple[object, ...]],
+    use_copy: bool,
+) -> None:
+    identifiers = sql.SQL(", ").join(sql.Identifier(column) for column in columns)
+    if use_copy:
+        query = sql.SQL("COPY {}.{} ({}) FROM STDIN").format(
+            sql.Identifier(schema_name),
+            sql.Identifier(table_name),
+            identifiers,
+        )
+        with cur.copy(query) as copy:
+            for row in rows:
+                copy.write_row(row)
+        return
+
+    placeholders = sql.SQL(", ").join(sql.Placeholder() for _ in columns)
+    query = sql.SQL(
+        """
+        INSERT INTO {}.{} ({})
+        VALUES ({})
+        """
+    ).format(
+        sql.Identifier(schema_name),
+        sql.Identifier(table_name),
+        identifiers,
+        placeholders,
+    )
+    cur.executemany(query, list(rows))
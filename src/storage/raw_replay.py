@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import json
+import mmap
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from ingestion.models import RawEnvelope
+from storage.raw_file_store import DEFAULT_RAW_DIR, list_segments, read_blocks, read_index
+from storage.raw_postgres import COPY_BATCH_SIZE, insert_missing_envelopes
+
+LEGACY_FILE_NAME = "raw.jsonl"
+DEFAULT_REPLAY_WORKERS = 4
+LEGACY_CHUNK_BYTES = 8 * 1024 * 1024
+
+# A parse task: a segment with the gzip blocks to read, or a byte range of a
+# legacy raw.jsonl file (lines starting inside the range).
+SegmentChunk = tuple[Path, tuple[tuple[int, int], ...]]
+LegacyChunk = tuple[Path, int, int]
+ParseTask = SegmentChunk | LegacyChunk
+
+
+@dataclass(frozen=True)
+class RawReplayResult:
+    files: int
+    read: int
+    inserted: int
+
+
+def replay_raw_files(
+    *,
+    categories: Iterable[str] | None = None,
+    start: date | None = None,
+    end: date | None = None,
+    asset: str | None = None,
+    base_dir: Path | None = None,
+    max_workers: int = DEFAULT_REPLAY_WORKERS,
+    batch_size: int = COPY_BATCH_SIZE,
+) -> RawReplayResult:
+    """Load file-sink envelopes back into ``bronze.ingestion_events``.
+
+    Segments are split into runs of about ``batch_size`` envelopes (whole
+    gzip blocks, picked from the index) and legacy ``raw.jsonl`` files into
+    ``LEGACY_CHUNK_BYTES`` ranges. A process pool parses the chunks with at
+    most ``2 * max_workers`` in flight. The parent streams parsed envelopes
+    into ``insert_missing_envelopes`` in ``batch_size`` chunks, so memory
+    stays bounded and uids already in bronze are skipped.
+    """
+    if max_workers < 1:
+        raise ValueError("max_workers must be >= 1")
+    if batch_size < 1:
+        raise ValueError("batch_size must be >= 1")
+    files = raw_files(categories, start=start, end=end, base_dir=base_dir)
+    tasks = _parse_tasks(files, asset=asset, batch_size=batch_size)
+
+    read = 0
+    inserted = 0
+    pending: list[RawEnvelope] = []
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        running: set[Future[list[RawEnvelope]]] = set()
+        while True:
+            while len(running) < max_workers * 2:
+                task = next(tasks, None)
+                if task is None:
+                    break
+                running.add(executor.submit(_parse_chunk, task, start, end, asset))
+            if not running:
+                break
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                envelopes = future.result()
+                read += len(envelopes)
+                pending.extend(envelopes)
+                while len(pending) >= batch_size:
+                    inserted += insert_missing_envelopes(pending[:batch_size])
+                    pending = pending[batch_size:]
+    if pending:
+        inserted += insert_missing_envelopes(pending)
+    return RawReplayResult(files=len(files), read=read, inserted=inserted)
+
+
+def raw_files(
+    categories: Iterable[str] | None = None,
+    *,
+    start: date | None = None,
+    end: date | None = None,
+    base_dir: Path | None = None,
+) -> list[Path]:
+    root = base_dir or DEFAULT_RAW_DIR
+    names = list(categories) if categories is not None else [None]
+    files: list[Path] = []
+    for category in names:
+        files.extend(list_segments(category, base_dir=root, start=start, end=end))
+        files.extend(sorted(root.glob(f"{category or '*'}/{LEGACY_FILE_NAME}")))
+    return files
+
+
+def _parse_tasks(files: list[Path], *, asset: str | None, batch_size: int) -> Iterator[ParseTask]:
+    for path in files:
+        if path.name == LEGACY_FILE_NAME:
+            size = path.stat().st_size
+            for offset in range(0, size, LEGACY_CHUNK_BYTES):
+                yield path, offset, min(size, offset + LEGACY_CHUNK_BYTES)
+            continue
+        counts: dict[tuple[int, int], int] = {}
+        for entry in read_index(path):
+            if asset is None or entry.asset == asset:
+                block = (entry.offset, entry.length)
+                counts[block] = counts.get(block, 0) + 1
+        chunk: list[tuple[int, int]] = []
+        envelopes = 0
+        for block in sorted(counts):
+            chunk.append(block)
+            envelopes += counts[block]
+            if envelopes >= batch_size:
+                yield path, tuple(chunk)
+                chunk, envelopes = [], 0
+        if chunk:
+            yield path, tuple(chunk)
+
+
+def _parse_chunk(
+    task: ParseTask,
+    start: date | None,
+    end: date | None,
+    asset: str | None,
+) -> list[RawEnvelope]:
+    if len(task) == 3:
+        path, first, last = task
+        envelopes: Iterator[RawEnvelope] = _iter_legacy_range(path, first, last)
+    else:
+        path, blocks = task
+        envelopes = read_blocks(path, blocks)
+    return [
+        env
+        for env in envelopes
+        if (asset is None or env.asset == asset) and _in_range(env.fetched_at, start, end)
+    ]
+
+
+def _iter_legacy_range(path: Path, first: int, last: int) -> Iterator[RawEnvelope]:
+    with path.open("rb") as handle:
+        if path.stat().st_size == 0:
+            return
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            position = first
+            if first > 0:
+                newline = view.find(b"\n", first - 1)
+                position = len(view) if newline == -1 else newline + 1
+            while position < last:
+                newline = view.find(b"\n", position)
+                stop = len(view) if newline == -1 else newline + 1
+                line = view[position:stop]
+                position = stop
+                if line.strip():
+                    yield RawEnvelope(**json.loads(line))
+
+
+def _in_range(fetched_at: str, start: date | None, end: date | None) -> bool:
+    if start is None and end is None:
+        return True
+    value = datetime.fromisoformat(fetched_at)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    day = value.astimezone(timezone.utc).date()
+    return not ((start and day < start) or (end and day > end))
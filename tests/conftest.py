@@ -2,9 +2,26 @@ from __future__ import annotations
 
 import sys
 from pathlib import Path
+from typing import Iterator
+
+import pytest
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 SRC_PATH = PROJECT_ROOT / "src"
 
 if str(SRC_PATH) not in sys.path:
     sys.path.insert(0, str(SRC_PATH))
+
+
+@pytest.fixture(autouse=True)
+def _reset_connection_pools() -> Iterator[None]:
+    from storage.connection_pool import close_pools, configure_pool
+
+    yield
+    close_pools()
+    configure_pool()
+
+
+@pytest.fixture(autouse=True)
+def _isolate_parse_cache(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.setenv("FINANCES_HUB_PARSE_CACHE_DIR", str(tmp_path / "parse_cache"))
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+import threading
+import time
 from typing import Any, Dict, List
 from unittest.mock import patch
 
-from ingestion.binance import fetch_klines_daily
+from ingestion.binance import fetch_klines_daily, fetch_klines_daily_concurrent, iter_klines_daily
 
 
 def test_fetch_klines_daily_builds_envelopes() -> None:
@@ -36,3 +38,79 @@ def test_fetch_klines_daily_builds_envelopes() -> None:
     assert len(envelopes) == 1
     assert envelopes[0].currency == "usdt"
     assert envelopes[0].payload["rows"][0]["close"] == "1.5"
+
+
+def _candle(open_ms: int) -> List[Any]:
+    return [open_ms, "1", "2", "0.5", str(open_ms), "100", open_ms + 86_399_999]
+
+
+def test_fetch_klines_daily_concurrent_orders_and_dedupes_windows() -> None:
+    day_ms = 86_400_000
+    lock = threading.Lock()
+    active = {"now": 0, "peak": 0}
+
+    def _fetch_json(url: str, params: Dict[str, Any] | None = None, **_kwargs) -> List[List[Any]]:
+        assert params is not None
+        with lock:
+            active["now"] += 1
+            active["peak"] = max(active["peak"], active["now"])
+        time.sleep(0.01)
+        with lock:
+            active["now"] -= 1
+        opens = range(params["startTime"], params["endTime"] + 1, day_ms)
+        candles = [_candle(open_ms) for open_ms in opens]
+        # Simulate a provider echoing the previous window's last candle.
+        if params["startTime"] > 1577836800000:
+            candles.insert(0, _candle(params["startTime"] - day_ms))
+        return candles
+
+    with patch("ingestion.binance.fetch_json_any", side_effect=_fetch_json) as mocked:
+        envelopes = fetch_klines_daily_concurrent(
+            symbol="BTCUSDT",
+            start_date="2020-01-01",
+            end_date="2025-12-31",
+            asset="BTC",
+            max_concurrency=2,
+        )
+
+    open_times = [row["open_time"] for env in envelopes for row in env.payload["rows"]]
+    assert mocked.call_count == 3
+    assert active["peak"] == 2
+    assert len(envelopes) == 3
+    assert open_times == sorted(open_times)
+    assert len(open_times) == len(set(open_times)) == 2192
+    assert envelopes[0].request_params["startTime"] == 1577836800000
+    assert envelopes[0].asset == "BTC"
+
+
+def test_fetch_klines_daily_concurrent_skips_empty_windows() -> None:
+    with patch("ingestion.binance.fetch_json_any", return_value=[]):
+        envelopes = fetch_klines_daily_concurrent(
+            symbol="BTCUSDT",
+            start_date="2024-01-01",
+            end_date="2024-01-05",
+        )
+
+    assert envelopes == []
+
+
+def test_iter_klines_daily_yields_each_page_before_fetching_the_next() -> None:
+    day_ms = 86_400_000
+    requested: list[int] = []
+
+    def _fetch_json(url: str, params: Dict[str, Any] | None = None, **_kwargs) -> List[List[Any]]:
+        assert params is not None
+        requested.append(params["startTime"])
+        if len(requested) == 1:
+            return [_candle(params["startTime"] + index * day_ms) for index in range(1000)]
+        return [_candle(params["startTime"] - 1)]
+
+    with patch("ingestion.binance.fetch_json_any", side_effect=_fetch_json):
+        pages = iter_klines_daily(symbol="BTCUSDT", start_date="2020-01-01", end_date="2025-12-31")
+        first = next(pages)
+        assert len(requested) == 1
+        rest = list(pages)
+
+    assert len(first.payload["rows"]) == 1000
+    assert len(rest) == 1
+    assert requested[1] == first.payload["rows"][-1]["open_time"] + 1
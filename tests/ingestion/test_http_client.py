@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Iterator
+from urllib.error import HTTPError
+
+import pytest
+
+from ingestion.http_client import HttpClient, fetch_json_any
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    client_ports: list[int] = []
+
+    def do_GET(self) -> None:
+        self.client_ports.append(self.client_address[1])
+        if self.path.startswith("/missing"):
+            body = b'{"msg": "not found"}'
+            self.send_response(404)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        body = json.dumps({"path": self.path}).encode("utf-8")
+        gzipped = "gzip" in (self.headers.get("Accept-Encoding") or "")
+        if gzipped:
+            body = gzip.compress(body)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        if gzipped:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        return None
+
+
+@pytest.fixture()
+def server() -> Iterator[str]:
+    _Handler.client_ports = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+def test_http_client_reuses_connection_and_decodes_gzip(server: str) -> None:
+    with HttpClient(pool_size=2) as client:
+        first = client.get_json(f"{server}/klines", params={"page": 1})
+        second = fetch_json_any(f"{server}/klines", params={"page": 2}, client=client)
+
+    assert first == {"path": "/klines?page=1"}
+    assert second == {"path": "/klines?page=2"}
+    assert len(_Handler.client_ports) == 2
+    assert len(set(_Handler.client_ports)) == 1
+
+
+def test_http_client_raises_http_error_with_status(server: str) -> None:
+    with HttpClient() as client:
+        with pytest.raises(HTTPError) as excinfo:
+            client.get_json(f"{server}/missing")
+
+        assert excinfo.value.code == 404
+        assert client.get_json(f"{server}/ok") == {"path": "/ok"}
+
+
+def test_http_client_rejects_invalid_pool_size() -> None:
+    with pytest.raises(ValueError):
+        HttpClient(pool_size=0)
@@ -3,12 +3,50 @@ from __future__ import annotations
 from types import SimpleNamespace
 from typing import Any
 
-from ingestion.nubank_trading_notes import ingest_nubank_trading_notes
+from datetime import date
+
+import pytest
+
+from ingestion.nubank_trading_notes import (
+    PARSER_VERSION,
+    infer_note_date,
+    ingest_nubank_trading_notes,
+    ingest_nubank_trading_notes_batch,
+    parse_nubank_trade_notes,
+)
+from storage.parse_cache import file_sha256
+
+
+CELL_WIDTH = 40
+ROW_HEIGHT = 12
+
+
+def _fake_page(tables: list[list[list[str | None]]], text: str = "") -> SimpleNamespace:
+    """A page exposing ``extract_words``/``find_tables`` for the given table cells, one row per line."""
+    words: list[dict[str, Any]] = []
+    found: list[SimpleNamespace] = []
+    top = 20.0
+    for table in tables:
+        table_top = top
+        rows = []
+        for row in table:
+            cells = []
+            for column, cell in enumerate(row):
+                x0 = column * CELL_WIDTH
+                cells.append((x0, top - 2, x0 + CELL_WIDTH, top + ROW_HEIGHT - 2))
+                if cell:
+                    words.append({"text": cell, "x0": x0 + 1, "x1": x0 + 30, "top": top, "bottom": top + 8})
+            rows.append(SimpleNamespace(cells=cells))
+            top += ROW_HEIGHT
+        width = CELL_WIDTH * max((len(row) for row in table), default=0)
+        found.append(SimpleNamespace(bbox=(0, table_top - 2, width, top - 2), rows=rows))
+        top += ROW_HEIGHT
+    return SimpleNamespace(extract_words=lambda: words, find_tables=lambda: found, extract_text=lambda: text)
 
 
 class _FakePdf:
-    def __init__(self, page_tables: list[list[list[list[str | None]]]]) -> None:
-        self.pages = [SimpleNamespace(extract_tables=lambda tables=tables: tables) for tables in page_tables]
+    def __init__(self, page_tables: list[list[list[list[str | None]]]], text: str = "") -> None:
+        self.pages = [_fake_page(tables, text) for tables in page_tables]
 
     def __enter__(self) -> "_FakePdf":
         return self
@@ -30,24 +68,21 @@ def test_ingest_nubank_trading_notes_appends_dataframe_to_bronze(monkeypatch: An
 
     captured: dict[str, Any] = {}
 
-    def _append_dataframe_to_bronze(df, table_name: str, **kwargs: Any) -> int:
-        captured["df"] = df
+    def _append_missing_dataframes_to_bronze(batches, table_name: str, **kwargs: Any) -> list[str]:
+        ((captured["df"], captured["request_params"]),) = batches
         captured["table_name"] = table_name
         captured["kwargs"] = kwargs
-        return len(df)
+        return ["uid-0"]
 
     monkeypatch.setattr(
         "ingestion.nubank_trading_notes.pdfplumber.open",
         lambda _path: _FakePdf(page_tables),
     )
     monkeypatch.setattr(
-        "ingestion.nubank_trading_notes.append_dataframe_to_bronze",
-        _append_dataframe_to_bronze,
-    )
-    monkeypatch.setattr(
-        "ingestion.nubank_trading_notes.ingest_nubank_taxes_overwrite",
-        lambda: 43,
+        "ingestion.nubank_trading_notes.append_missing_dataframes_to_bronze",
+        _append_missing_dataframes_to_bronze,
     )
+    monkeypatch.setattr("ingestion.nubank_trading_notes.find_bronze_batch", lambda *args: None)
 
     inserted = ingest_nubank_trading_notes(
         path=str(pdf_file),
@@ -58,7 +93,13 @@ def test_ingest_nubank_trading_notes_appends_dataframe_to_bronze(monkeypatch: An
     assert captured["table_name"] == "pdf_nubank_trade_events"
     assert captured["kwargs"]["source"] == "nubank_trading_notes_pdf"
     assert captured["kwargs"]["endpoint"] == "pdfplumber.extract_tables"
-    assert captured["kwargs"]["request_params"] == {"pdf_path": str(pdf_file)}
+    assert captured["kwargs"]["key_params"] == ("sha256", "date", "parser_version")
+    assert captured["request_params"] == {
+        "pdf_path": str(pdf_file),
+        "date": "2025-11-05",
+        "sha256": file_sha256(pdf_file),
+        "parser_version": PARSER_VERSION,
+    }
 
     df = captured["df"]
     assert list(df["mercado"]) == ["VISTA", "VISTA"]
@@ -69,3 +110,166 @@ def test_ingest_nubank_trading_notes_appends_dataframe_to_bronze(monkeypatch: An
     assert list(df["date"]) == ["2025-11-05", "2025-11-05"]
     assert list(df["file_path"]) == [str(pdf_file), str(pdf_file)]
     assert list(df["file_name"]) == ["statement.pdf", "statement.pdf"]
+
+
+def test_infer_note_date_prefers_file_name_then_header(monkeypatch: Any) -> None:
+    monkeypatch.setattr(
+        "ingestion.nubank_trading_notes.pdfplumber.open",
+        lambda _path: _FakePdf([[]], text="Nr. nota Folha Data pregão\n123456 1 05/11/2025"),
+    )
+
+    assert infer_note_date("/notes/nota_2025-11-03.pdf") == date(2025, 11, 3)
+    assert infer_note_date("/notes/20251104_nubank.pdf") == date(2025, 11, 4)
+    assert infer_note_date("/notes/nota 06-11-2025.pdf") == date(2025, 11, 6)
+    assert infer_note_date("/notes/nota.pdf") == date(2025, 11, 5)
+
+
+def test_ingest_batch_loads_all_notes_in_one_call(monkeypatch: Any, tmp_path) -> None:
+    for name in ("2025-11-03.pdf", "2025-11-04.PDF", "readme.txt"):
+        (tmp_path / name).write_bytes(b"%PDF-1.4")
+    page_tables = [[[["VISTA", "C", "FRACIONARIO", "PETR4", "", "10", "12,34", "123,40", "D"]]]]
+    calls: list[dict[str, Any]] = []
+
+    def _append_missing_dataframes_to_bronze(batches, table_name: str, **kwargs: Any) -> list[str]:
+        calls.append({"batches": list(batches), "table_name": table_name, **kwargs})
+        return [f"uid-{index}" for index, _ in enumerate(calls[-1]["batches"])]
+
+    monkeypatch.setattr("ingestion.nubank_trading_notes.pdfplumber.open", lambda _path: _FakePdf(page_tables))
+    monkeypatch.setattr(
+        "ingestion.nubank_trading_notes.append_missing_dataframes_to_bronze",
+        _append_missing_dataframes_to_bronze,
+    )
+    monkeypatch.setattr(
+        "ingestion.nubank_trading_notes.find_bronze_batch",
+        lambda *args: pytest.fail("new notes need no lookup"),
+    )
+
+    notes = ingest_nubank_trading_notes_batch(str(tmp_path), max_workers=1)
+
+    assert [(note.date, note.rows, note.uid) for note in notes] == [
+        ("2025-11-03", 1, "uid-0"),
+        ("2025-11-04", 1, "uid-1"),
+    ]
+    (call,) = calls
+    assert call["table_name"] == "pdf_nubank_trade_events"
+    assert [(params["pdf_path"], params["date"]) for _, params in call["batches"]] == [
+        (str(tmp_path / "2025-11-03.pdf"), "2025-11-03"),
+        (str(tmp_path / "2025-11-04.PDF"), "2025-11-04"),
+    ]
+    assert list(call["batches"][1][0]["date"]) == ["2025-11-04"]
+
+
+def test_ingest_batch_rejects_undated_notes_before_loading(monkeypatch: Any, tmp_path) -> None:
+    (tmp_path / "nota.pdf").write_bytes(b"%PDF-1.4")
+    monkeypatch.setattr("ingestion.nubank_trading_notes.pdfplumber.open", lambda _path: _FakePdf([[]]))
+    monkeypatch.setattr(
+        "ingestion.nubank_trading_notes.ingest_nubank_taxes",
+        lambda *args: pytest.fail("taxes should not be synced"),
+    )
+    monkeypatch.setattr(
+        "ingestion.nubank_trading_notes.append_missing_dataframes_to_bronze",
+        lambda *args, **kwargs: pytest.fail("nothing should be loaded"),
+    )
+
+    with pytest.raises(ValueError, match="nota.pdf"):
+        ingest_nubank_trading_notes_batch(str(tmp_path / "*.pdf"), max_workers=1)
+
+
+def test_unchanged_notes_hit_the_parse_cache_and_skip_loaded_batches(monkeypatch: Any, tmp_path) -> None:
+    note = tmp_path / "2025-11-03.pdf"
+    note.write_bytes(b"%PDF-1.4 note")
+    opened: list[str] = []
+    page_tables = [[[["VISTA", "C", "FRACIONARIO", "PETR4", "", "10", "12,34", "123,40", "D"]]]]
+
+    def _open(path: str) -> _FakePdf:
+        opened.append(path)
+        return _FakePdf(page_tables)
+
+    monkeypatch.setattr("ingestion.nubank_trading_notes.pdfplumber.open", _open)
+
+    first = parse_nubank_trade_notes(str(note), "2025-11-03")
+    copy = tmp_path / "copy.pdf"
+    copy.write_bytes(note.read_bytes())
+    second = parse_nubank_trade_notes(str(copy), "2025-11-04")
+
+    assert opened == [str(note)]
+    assert list(second["espec_titulo"]) == list(first["espec_titulo"]) == ["PETR4"]
+    assert list(second["file_name"]) == ["copy.pdf"]
+    assert list(second["date"]) == ["2025-11-04"]
+
+    monkeypatch.setattr("ingestion.nubank_trading_notes.PARSER_VERSION", "next")
+    parse_nubank_trade_notes(str(note), "2025-11-03")
+    assert opened == [str(note), str(note)]
+
+    lookups: list[dict[str, object]] = []
+
+    def _find_bronze_batch(table_name: str, request_params: dict[str, object]) -> str:
+        lookups.append(request_params)
+        return "existing-uid"
+
+    monkeypatch.setattr("ingestion.nubank_trading_notes.find_bronze_batch", _find_bronze_batch)
+    monkeypatch.setattr(
+        "ingestion.nubank_trading_notes.append_missing_dataframes_to_bronze",
+        lambda *args, **kwargs: pytest.fail("a loaded note must not be appended again"),
+    )
+
+    assert ingest_nubank_trading_notes(str(note), "2025-11-03") == 0
+    assert lookups == [{"date": "2025-11-03", "sha256": file_sha256(note), "parser_version": "next"}]
+    assert len(opened) == 2
+
+
+def test_page_rows_reuse_one_word_layout_for_lines_and_cells() -> None:
+    from ingestion.nubank_trading_notes import _page_rows
+
+    values = ["BOVESPA", "C", "VISTA", "PETR4", "", "100", "30,00", "3.000,00", "D"]
+    edges = [0, 50, 60, 100, 160, 180, 220, 260, 320, 330]
+    words = [
+        {"text": text, "x0": x0 + 1, "x1": x0 + 5, "top": 20.0 + (index == 3) * 0.5, "bottom": 28.0}
+        for index, (text, x0) in enumerate(zip(values, edges))
+        if text
+    ]
+    words.append({"text": "PN", "x0": 130, "x1": 140, "top": 25.0, "bottom": 29.0})
+    words.append({"text": "Negocios realizados", "x0": 0, "x1": 90, "top": 5.0, "bottom": 12.0})
+    row = SimpleNamespace(cells=[(x0, 18, x1, 30) for x0, x1 in zip(edges, edges[1:])])
+    table = SimpleNamespace(bbox=(0, 18, 330, 30), rows=[row])
+    calls: list[str] = []
+
+    def _extract_words() -> list[dict[str, Any]]:
+        calls.append("words")
+        return words
+
+    page = SimpleNamespace(extract_words=_extract_words, find_tables=lambda: [table])
+
+    assert _page_rows(page) == [
+        ["BOVESPA", "C", "VISTA", "PETR4 PN", "", "100", "30,00", "3.000,00", "D"]
+    ]
+    assert calls == ["words"]
+
+
+def test_page_rows_skip_pages_without_trade_marker() -> None:
+    from ingestion.nubank_trading_notes import _page_rows
+
+    def _fail() -> list[Any]:
+        raise AssertionError("non-trade page was laid out")
+
+    chars = [{"text": char} for char in "Resumo dos Negócios  Total CBLC"]
+    summary = SimpleNamespace(chars=chars, extract_words=_fail, find_tables=_fail)
+    calls: list[str] = []
+    spaced = SimpleNamespace(
+        chars=[{"text": char} for char in "b o v e s p a"],
+        extract_words=lambda: calls.append("words") or [],
+        find_tables=lambda: [],
+    )
+
+    assert _page_rows(summary) is None
+    assert _page_rows(spaced) == []
+    assert calls == ["words"]
+
+
+def test_page_rows_keep_table_pages_under_the_trades_header_without_bovespa() -> None:
+    from ingestion.nubank_trading_notes import _page_rows
+
+    page = _fake_page([[["VISTA", "C", "FRACIONARIO", "PETR4", "", "10", "12,34", "123,40", "D"]]])
+    page.chars = [{"text": char} for char in "Negócios realizados VISTA C FRACIONARIO PETR4"]
+
+    assert _page_rows(page) == [["VISTA", "C", "FRACIONARIO", "PETR4", "", "10", "12,34", "123,40", "D"]]
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import List
+from typing import Iterator, List
 
 import pytest
 
@@ -112,3 +112,56 @@ def test_inject_envelopes_sink_argument_overrides_env(
 def test_inject_envelopes_invalid_sink_raises() -> None:
     with pytest.raises(ValueError):
         inject_envelopes(_sample_envelopes(), category="coingecko", sink="nope")
+
+
+def test_inject_envelopes_streams_generator_to_both_sinks_in_batches(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    template = _sample_envelopes()[0]
+    consumed: list[int] = []
+    written: dict[str, list[list[str]]] = {"file": [], "postgres": []}
+
+    def _generate() -> Iterator[RawEnvelope]:
+        for index in range(5):
+            consumed.append(index)
+            yield RawEnvelope(**{**template.to_dict(), "uid": f"uid-{index}"})
+
+    def _write_envelopes(*, category: str, envelopes: List[RawEnvelope]) -> None:
+        written["file"].append([env.uid for env in envelopes])
+
+    def _insert_envelopes(envelopes: List[RawEnvelope]) -> None:
+        # The first batch lands before the generator has been fully consumed.
+        written["postgres"].append([env.uid for env in envelopes])
+        assert len(consumed) <= len(written["postgres"]) * 2
+
+    monkeypatch.setattr("ingestion.persist.write_envelopes", _write_envelopes)
+    monkeypatch.setattr("ingestion.persist.insert_envelopes", _insert_envelopes)
+
+    result = inject_envelopes(_generate(), category="binance", sink="both", batch_rows=2)
+
+    expected = [["uid-0", "uid-1"], ["uid-2", "uid-3"], ["uid-4"]]
+    assert result == "both"
+    assert written == {"file": expected, "postgres": expected}
+
+
+def test_inject_envelopes_writes_first_page_before_fetch_finishes(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    template = _sample_envelopes()[0]
+    consumed: list[int] = []
+    inserted_after: list[int] = []
+
+    def _generate() -> Iterator[RawEnvelope]:
+        for index in range(3):
+            consumed.append(index)
+            payload = {"rows": [[index, row] for row in range(1000)]}
+            yield RawEnvelope(**{**template.to_dict(), "uid": f"uid-{index}", "payload": payload})
+
+    def _insert_envelopes(envelopes: List[RawEnvelope]) -> None:
+        inserted_after.append(len(consumed))
+
+    monkeypatch.setattr("ingestion.persist.insert_envelopes", _insert_envelopes)
+
+    inject_envelopes(_generate(), category="binance", sink="postgres")
+
+    assert inserted_after == [1, 2, 3]
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Iterator
+from urllib.error import HTTPError
+
+import pytest
+
+from ingestion.http_client import HttpClient, fetch_json_any
+from ingestion.rate_limit import (
+    BINANCE_WEIGHT_HEADER,
+    CircuitOpenError,
+    ProviderLimiter,
+    TokenBucket,
+)
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class _ThrottlingHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    responses: list[tuple[int, dict[str, str]]] = []
+    calls = 0
+
+    def do_GET(self) -> None:
+        type(self).calls += 1
+        status, headers = self.responses.pop(0) if self.responses else (200, {})
+        body = json.dumps({"status": status}).encode("utf-8")
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        return None
+
+
+@pytest.fixture()
+def server() -> Iterator[str]:
+    _ThrottlingHandler.responses = []
+    _ThrottlingHandler.calls = 0
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _ThrottlingHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+def _limiter(clock: _FakeClock, **kwargs: Any) -> ProviderLimiter:
+    return ProviderLimiter(
+        "unit",
+        rate=100.0,
+        burst=100.0,
+        base_delay=1.0,
+        clock=clock,
+        sleep=clock.sleep,
+        rng=lambda: 1.0,
+        **kwargs,
+    )
+
+
+def test_limiter_retries_throttling_and_honours_retry_after(server: str) -> None:
+    clock = _FakeClock()
+    limiter = _limiter(clock)
+    _ThrottlingHandler.responses = [
+        (429, {"Retry-After": "7"}),
+        (503, {}),
+    ]
+
+    with HttpClient() as client:
+        payload = limiter.call(fetch_json_any, f"{server}/klines", client=client)
+
+    assert payload == {"status": 200}
+    assert _ThrottlingHandler.calls == 3
+    assert clock.sleeps == [7.0, 2.0]
+    assert limiter.state().circuit == "closed"
+
+
+def test_limiter_opens_circuit_after_repeated_failures(server: str) -> None:
+    clock = _FakeClock()
+    limiter = _limiter(clock, max_retries=1, failure_threshold=2, reset_seconds=30.0)
+    _ThrottlingHandler.responses = [(500, {})] * 4
+
+    with HttpClient() as client:
+        for _ in range(2):
+            with pytest.raises(HTTPError):
+                limiter.call(fetch_json_any, f"{server}/klines", client=client)
+
+        with pytest.raises(CircuitOpenError):
+            limiter.call(fetch_json_any, f"{server}/klines", client=client)
+
+    state = limiter.state()
+    assert _ThrottlingHandler.calls == 4
+    assert state.circuit == "open"
+    assert state.cooldown_seconds == pytest.approx(30.0)
+
+    clock.now += 31.0
+    assert limiter.state().circuit == "half_open"
+
+
+def test_limiter_trips_circuit_on_ban(server: str) -> None:
+    clock = _FakeClock()
+    limiter = _limiter(clock)
+    _ThrottlingHandler.responses = [(418, {"Retry-After": "120"})]
+
+    with HttpClient() as client:
+        with pytest.raises(HTTPError):
+            limiter.call(fetch_json_any, f"{server}/klines", client=client)
+
+    assert _ThrottlingHandler.calls == 1
+    assert limiter.state().circuit == "open"
+    assert limiter.state().cooldown_seconds == pytest.approx(120.0)
+
+
+def test_limiter_tracks_used_weight_header(server: str) -> None:
+    clock = _FakeClock()
+    limiter = _limiter(clock, weight_header=BINANCE_WEIGHT_HEADER, weight_limit=1000)
+    _ThrottlingHandler.responses = [(200, {BINANCE_WEIGHT_HEADER: "950"})]
+
+    with HttpClient(response_hook=limiter.observe_headers) as client:
+        limiter.call(fetch_json_any, f"{server}/klines", client=client)
+
+    state = limiter.state()
+    assert state.used_weight == 950
+    assert state.weight_limit == 1000
+    assert state.cooldown_seconds == pytest.approx(60.0)
+
+    clock.now += 45.0
+    assert limiter.state().cooldown_seconds == pytest.approx(15.0)
+
+
+def test_half_open_circuit_admits_a_single_probe() -> None:
+    clock = _FakeClock()
+    limiter = _limiter(clock, reset_seconds=30.0)
+    limiter.breaker.trip(30.0)
+    clock.now += 31.0
+    probe_started = threading.Event()
+    release_probe = threading.Event()
+    rejected: list[BaseException] = []
+
+    def probe() -> str:
+        probe_started.set()
+        release_probe.wait(5)
+        return "ok"
+
+    worker = threading.Thread(target=lambda: limiter.call(probe))
+    worker.start()
+    probe_started.wait(5)
+    try:
+        limiter.call(lambda: "second")
+    except CircuitOpenError as exc:
+        rejected.append(exc)
+    release_probe.set()
+    worker.join(5)
+
+    assert len(rejected) == 1
+    assert limiter.state().circuit == "closed"
+    assert limiter.call(lambda: "after") == "after"
+
+
+def test_token_bucket_waits_for_refill() -> None:
+    clock = _FakeClock()
+    bucket = TokenBucket(rate=2.0, capacity=2.0, clock=clock, sleep=clock.sleep)
+
+    bucket.acquire()
+    bucket.acquire()
+    bucket.acquire()
+
+    assert clock.sleeps == [pytest.approx(0.5)]
@@ -6,7 +6,7 @@ from unittest.mock import patch
 
 import pandas as pd
 
-from ingestion.yfinance_stock import fetch_close_prices
+from ingestion.yfinance_stock import YFinanceSymbol, fetch_close_prices, fetch_close_prices_batch
 
 
 def _history_frame() -> pd.DataFrame:
@@ -33,3 +33,58 @@ def test_fetch_close_prices_returns_envelope() -> None:
     assert payload["symbol"] == "^GSPC"
     assert len(payload["rows"]) == 2
     assert payload["rows"][0]["value"] == 10.5
+
+
+def test_fetch_close_prices_batch_splits_frame_per_symbol() -> None:
+    index = pd.DatetimeIndex([datetime(2024, 1, 2), datetime(2024, 1, 3)], name="Date")
+    columns = pd.MultiIndex.from_product([["Close", "Open"], ["PETR4.SA", "VALE3.SA", "^BVSP"]])
+    frame = pd.DataFrame(
+        [
+            [37.5, 61.1, float("nan"), 0.0, 0.0, 0.0],
+            [37.9, 60.8, float("nan"), 0.0, 0.0, 0.0],
+        ],
+        index=index,
+        columns=columns,
+    )
+    calls: list[dict[str, Any]] = []
+
+    def _download(**kwargs: Any) -> pd.DataFrame:
+        calls.append(kwargs)
+        return frame
+
+    symbols = [
+        YFinanceSymbol("PETR4.SA", currency="brl", asset="PETR4"),
+        YFinanceSymbol("VALE3.SA", currency="brl", asset="VALE3"),
+        YFinanceSymbol("^BVSP", currency="brl", asset="IBOV"),
+    ]
+    with patch("ingestion.yfinance_stock.yf.download", side_effect=_download):
+        envelopes = fetch_close_prices_batch(symbols, "2024-01-01", "2024-01-04")
+
+    assert len(calls) == 1
+    assert calls[0]["tickers"] == ["PETR4.SA", "VALE3.SA", "^BVSP"]
+    assert [env.asset for env in envelopes] == ["PETR4", "VALE3"]
+    assert envelopes[0].currency == "brl"
+    assert envelopes[0].request_params == {
+        "symbol": "PETR4.SA",
+        "start_date": "2024-01-01",
+        "end_date": "2024-01-04",
+    }
+    assert envelopes[1].payload["rows"] == [
+        {"date": "2024-01-02", "value": 61.1},
+        {"date": "2024-01-03", "value": 60.8},
+    ]
+
+
+def test_fetch_close_prices_batch_chunks_requests() -> None:
+    calls: list[list[str]] = []
+
+    def _download(**kwargs: Any) -> pd.DataFrame:
+        calls.append(kwargs["tickers"])
+        return pd.DataFrame()
+
+    symbols = [YFinanceSymbol(f"SYM{i}.SA") for i in range(5)]
+    with patch("ingestion.yfinance_stock.yf.download", side_effect=_download):
+        envelopes = fetch_close_prices_batch(symbols, "2024-01-01", "2024-01-04", chunk_size=2)
+
+    assert envelopes == []
+    assert calls == [["SYM0.SA", "SYM1.SA"], ["SYM2.SA", "SYM3.SA"], ["SYM4.SA"]]
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
-from typing import Any, List
+import threading
+import time
+from datetime import date
+from typing import Any, Iterator, List
 
 import pytest
 
@@ -162,3 +165,215 @@ def test_build_job_map_rejects_unknown_job_type() -> None:
 
     with pytest.raises(ValueError, match="Unknown job type: bank_pdf"):
         runner._build_job_map(jobs, start_date="2020-01-01", end_date="2020-01-02")
+
+
+def test_run_all_concurrent_isolates_failures_and_reports_timings() -> None:
+    config = OrchestrationConfig(source_concurrency={"binance": 2, "default": 1})
+
+    def _job_ok(_config: OrchestrationConfig) -> int:
+        return 3
+
+    def _job_fails(_config: OrchestrationConfig) -> int:
+        raise RuntimeError("provider down")
+
+    _job_ok.source = "binance"
+    _job_fails.source = "binance"
+
+    results = runner.run_all_concurrent(
+        jobs={"ok": _job_ok, "fails": _job_fails},
+        config=config,
+        run_tests=False,
+    )
+
+    assert list(results) == ["ok", "fails"]
+    assert results["ok"].rows == 3
+    assert results["ok"].ok is True
+    assert results["ok"].source == "binance"
+    assert results["ok"].elapsed_seconds >= 0
+    assert results["fails"].rows == 0
+    assert results["fails"].error == "RuntimeError: provider down"
+
+
+def test_run_all_concurrent_respects_source_limits() -> None:
+    config = OrchestrationConfig(source_concurrency={"binance": 2, "yfinance": 1})
+    lock = threading.Lock()
+    active = {"binance": 0, "yfinance": 0}
+    peak = {"binance": 0, "yfinance": 0}
+
+    def _make_job(source: str):
+        def _job(_config: OrchestrationConfig) -> int:
+            with lock:
+                active[source] += 1
+                peak[source] = max(peak[source], active[source])
+            time.sleep(0.02)
+            with lock:
+                active[source] -= 1
+            return 1
+
+        _job.source = source
+        return _job
+
+    jobs = {f"binance_{i}": _make_job("binance") for i in range(6)}
+    jobs.update({f"yfinance_{i}": _make_job("yfinance") for i in range(3)})
+
+    results = runner.run_all_concurrent(jobs=jobs, config=config, run_tests=False)
+
+    assert all(result.rows == 1 for result in results.values())
+    assert peak == {"binance": 2, "yfinance": 1}
+
+
+def test_factory_jobs_expose_source() -> None:
+    assert runner.make_binance_job("BTCUSDT", start_date="2020-01-01").source == "binance"
+    assert runner.make_yfinance_job("^GSPC").source == "yfinance"
+
+
+def test_run_asset_ingestion_incremental_resumes_from_watermark(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    captured: dict[str, Any] = {}
+
+    def _fetch(*, symbol: str, start_date: str, end_date: str) -> List[RawEnvelope]:
+        captured["start_date"] = start_date
+        envelope = _sample_envelope()
+        return [
+            RawEnvelope(
+                **{
+                    **envelope.to_dict(),
+                    "payload": {"rows": [{"date": "2024-03-09"}, {"date": "2024-03-10"}]},
+                }
+            )
+        ]
+
+    def _upsert_watermark(job_name: str, **kwargs: Any) -> None:
+        captured["watermark"] = (job_name, kwargs)
+
+    monkeypatch.setattr(runner, "fetch_watermark", lambda _job_name: date(2024, 3, 8))
+    monkeypatch.setattr(runner, "upsert_watermark", _upsert_watermark)
+    monkeypatch.setattr(runner, "inject_envelopes", lambda *args, sink=None, **kwargs: sink)
+
+    result = runner.run_asset_ingestion(
+        config=OrchestrationConfig(sink="postgres", incremental=True, overlap_days=2),
+        job_name="yfinance_sp500",
+        category="yfinance",
+        fetcher=_fetch,
+        fetch_kwargs={"symbol": "^GSPC", "start_date": "2020-01-01", "end_date": "2024-03-10"},
+    )
+
+    assert result == 1
+    assert captured["start_date"] == "2024-03-06"
+    assert captured["watermark"] == (
+        "yfinance_sp500",
+        {"source": "yfinance", "asset": "BTC", "last_price_date": date(2024, 3, 10)},
+    )
+
+
+def test_run_asset_ingestion_incremental_without_watermark_keeps_start(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    captured: dict[str, Any] = {}
+
+    def _fetch(*, symbol: str, start_date: str) -> List[RawEnvelope]:
+        captured["start_date"] = start_date
+        return []
+
+    monkeypatch.setattr(runner, "fetch_watermark", lambda _job_name: None)
+    monkeypatch.setattr(runner, "inject_envelopes", lambda *args, sink=None, **kwargs: sink)
+    monkeypatch.setattr(
+        runner,
+        "upsert_watermark",
+        lambda *args, **kwargs: pytest.fail("watermark must not advance without rows"),
+    )
+
+    runner.run_asset_ingestion(
+        config=OrchestrationConfig(sink="postgres", incremental=True),
+        job_name="binance_btcusdt_daily",
+        category="binance",
+        fetcher=_fetch,
+        fetch_kwargs={"symbol": "BTCUSDT", "start_date": "2020-01-01"},
+    )
+
+    assert captured["start_date"] == "2020-01-01"
+
+
+def test_latest_row_date_handles_binance_close_time() -> None:
+    envelope = RawEnvelope(
+        **{
+            **_sample_envelope().to_dict(),
+            "payload": {"rows": [{"close_time": 1704153599999}, {"close_time": 1704067199999}]},
+        }
+    )
+
+    assert runner._latest_row_date([envelope]) == date(2024, 1, 1)
+
+
+def test_run_all_batches_yfinance_jobs_sharing_a_window(monkeypatch: pytest.MonkeyPatch) -> None:
+    batches: list[list[str]] = []
+    injected: list[str] = []
+
+    def _fetch_close_prices_batch(symbols, start_date: str, end_date: str, chunk_size: int):
+        batches.append([item.symbol for item in symbols])
+        return [
+            RawEnvelope(
+                **{
+                    **_sample_envelope().to_dict(),
+                    "asset": item.asset,
+                    "payload": {"symbol": item.symbol, "rows": []},
+                }
+            )
+            for item in symbols
+        ]
+
+    def _inject_envelopes(envelopes: List[RawEnvelope], category: str, sink: Any = None) -> None:
+        injected.extend(env.asset for env in envelopes)
+
+    monkeypatch.setattr(runner, "fetch_close_prices_batch", _fetch_close_prices_batch)
+    monkeypatch.setattr(runner, "inject_envelopes", _inject_envelopes)
+    monkeypatch.setattr(
+        runner,
+        "fetch_close_prices",
+        lambda **kwargs: pytest.fail("grouped jobs must not download one by one"),
+    )
+
+    jobs = runner._build_job_map(
+        [
+            {"name": "yfinance_petr4", "type": "yfinance", "symbol": "PETR4.SA", "currency": "brl", "asset": "PETR4"},
+            {"name": "yfinance_vale3", "type": "yfinance", "symbol": "VALE3.SA", "currency": "brl", "asset": "VALE3"},
+        ],
+        start_date="2024-01-01",
+        end_date="2024-01-10",
+    )
+    config = OrchestrationConfig(sink="none", batch_yfinance=True)
+
+    results = runner.run_all_concurrent(jobs=jobs, config=config, run_tests=False)
+
+    assert batches == [["PETR4.SA", "VALE3.SA"]]
+    assert sorted(injected) == ["PETR4", "VALE3"]
+    assert {name: result.rows for name, result in results.items()} == {
+        "yfinance_petr4": 1,
+        "yfinance_vale3": 1,
+    }
+
+
+def test_run_asset_ingestion_streams_generator_fetchers(monkeypatch: pytest.MonkeyPatch) -> None:
+    batches: list[int] = []
+
+    def _fetch(**_kwargs: str) -> Iterator[RawEnvelope]:
+        for _ in range(3):
+            yield _sample_envelope()
+
+    def _inject_envelopes(envelopes, category: str, sink: Any = None) -> Any:
+        batches.append(sum(1 for _ in envelopes))
+        return sink
+
+    monkeypatch.setattr(runner, "inject_envelopes", _inject_envelopes)
+
+    result = runner.run_asset_ingestion(
+        config=OrchestrationConfig(sink="none"),
+        job_name="binance_btcusdt",
+        category="binance",
+        fetcher=_fetch,
+        fetch_kwargs={"symbol": "BTCUSDT", "start_date": "2020-01-01"},
+    )
+
+    assert result == 3
+    assert batches == [3]
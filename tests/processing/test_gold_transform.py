@@ -1,6 +1,10 @@
 from __future__ import annotations
 
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Any, Iterator
+
+from processing.gold import gold_transform
 
 
 def test_gold_transform_sql_contains_upserts() -> None:
@@ -26,3 +30,54 @@ def test_gold_transform_sql_contains_upserts() -> None:
     assert "FROM silver.nubank_trade_events" in nubank_sql
     assert "FROM bronze.nubank_trade_taxes" in nubank_sql
     assert "AS tax" in nubank_sql
+
+
+def test_gold_price_transforms_read_past_watermark_and_skip_unchanged_rows() -> None:
+    sql_dir = Path(__file__).resolve().parents[2] / "sql" / "gold"
+    for name in (
+        "crypto_prices_daily",
+        "fiat_fx_rates_daily",
+        "indices_daily",
+        "etfs_daily",
+        "br_stocks_daily",
+    ):
+        sql = (sql_dir / f"{name}.sql").read_text(encoding="utf-8")
+
+        assert f"WHERE t.transform = '{name}'" in sql
+        assert "WHERE s.ingest_xid >= w.since" in sql
+        assert "pg_snapshot_xmin(pg_current_snapshot())" in sql
+        assert "INSERT INTO gold.transform_watermarks" in sql
+        assert "FROM changed AS s" in sql
+        assert "IS DISTINCT FROM" in sql
+
+
+def test_run_gold_transforms_full_refresh_resets_watermarks(monkeypatch: Any) -> None:
+    executed: list[str] = []
+
+    class _Cursor:
+        def execute(self, statement: str) -> None:
+            executed.append(statement)
+
+        def __enter__(self) -> "_Cursor":
+            return self
+
+        def __exit__(self, *args: Any) -> None:
+            return None
+
+    class _Conn:
+        def cursor(self) -> _Cursor:
+            return _Cursor()
+
+        def commit(self) -> None:
+            return None
+
+    @contextmanager
+    def _pooled_connection(dsn: str | None = None) -> Iterator[_Conn]:
+        yield _Conn()
+
+    monkeypatch.setattr(gold_transform, "pooled_connection", _pooled_connection)
+
+    result = gold_transform.run_gold_transforms(run_tests=False, full_refresh=True)
+
+    assert executed[0] == "TRUNCATE TABLE gold.transform_watermarks"
+    assert len(executed) == result["statements"] + 1
@@ -1,6 +1,19 @@
 from __future__ import annotations
 
+import json
+import os
+import uuid
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Any, Iterator
+
+import pytest
+
+from ingestion.models import RawEnvelope
+from processing.silver import silver_transform
+from storage.raw_postgres import price_rows_from_envelope
+
+TEST_PG_DSN = os.environ.get("FINANCES_HUB_TEST_PG_DSN")
 
 
 def test_silver_transform_sql_contains_upserts() -> None:
@@ -19,3 +32,115 @@ def test_silver_transform_sql_contains_upserts() -> None:
     assert "WHEN position(',' IN b.preco) > 0 THEN replace(replace(trim(b.preco), '.', ''), ',', '.')" in nubank_sql
     assert "WHEN trim(b.quantidade) ~ '^[0-9]{1,3}(\\.[0-9]{3})+$' THEN replace(trim(b.quantidade), '.', '')" in nubank_sql
     assert "([A-Za-z]{4,6}[0-9]{1,2}F?)" in nubank_sql
+
+
+def test_silver_price_transforms_only_expand_unprocessed_envelopes() -> None:
+    sql_dir = Path(__file__).resolve().parents[2] / "sql" / "silver"
+    for name in ("yfinance_prices.sql", "binance_prices.sql"):
+        sql = (sql_dir / name).read_text(encoding="utf-8")
+
+        assert "FROM silver.processed_envelopes AS p" in sql
+        assert "INSERT INTO silver.processed_envelopes (uid, source)" in sql
+        assert "FROM new_envelopes AS e" in sql
+        assert "JOIN bronze.price_rows AS r ON r.uid = e.uid" in sql
+        assert "WHERE (EXCLUDED.price_ts, EXCLUDED.fetched_at) >= (s.price_ts, s.fetched_at)" in sql
+        assert "IS DISTINCT FROM (EXCLUDED.price, EXCLUDED.asset, EXCLUDED.price_ts" in sql
+
+
+def test_run_silver_transforms_full_refresh_resets_ledger(monkeypatch: Any) -> None:
+    executed: list[str] = []
+
+    class _Cursor:
+        def execute(self, statement: str) -> None:
+            executed.append(statement)
+
+        def __enter__(self) -> "_Cursor":
+            return self
+
+        def __exit__(self, *args: Any) -> None:
+            return None
+
+    class _Conn:
+        def cursor(self) -> _Cursor:
+            return _Cursor()
+
+        def commit(self) -> None:
+            return None
+
+    @contextmanager
+    def _pooled_connection(dsn: str | None = None) -> Iterator[_Conn]:
+        yield _Conn()
+
+    monkeypatch.setattr(silver_transform, "pooled_connection", _pooled_connection)
+
+    result = silver_transform.run_silver_transforms(run_tests=False, full_refresh=True)
+
+    assert executed[0] == "TRUNCATE TABLE silver.processed_envelopes"
+    assert len(executed) == result["statements"] + 1
+
+
+@pytest.mark.skipif(not TEST_PG_DSN, reason="set FINANCES_HUB_TEST_PG_DSN to run against Postgres")
+@pytest.mark.parametrize("time_zone", ["America/Sao_Paulo", "Asia/Tokyo"])
+def test_silver_legacy_rows_match_typed_rows_in_non_utc_session(time_zone: str) -> None:
+    import psycopg
+
+    sql_root = Path(__file__).resolve().parents[2] / "sql"
+    envelopes = [
+        RawEnvelope(
+            source="yfinance",
+            endpoint="yfinance.history",
+            request_params={"symbol": "^TZTEST"},
+            asset="^TZTEST",
+            currency="usd",
+            uid=str(uuid.uuid4()),
+            fetched_at="2024-01-05T00:00:00+00:00",
+            payload={"rows": [{"date": "2024-01-02", "value": 10.0}]},
+        ),
+        RawEnvelope(
+            source="binance",
+            endpoint="binance.klines",
+            request_params={"symbol": "TZTESTUSDT"},
+            asset="TZTEST",
+            currency="usdt",
+            uid=str(uuid.uuid4()),
+            fetched_at="2024-01-05T00:00:00+00:00",
+            payload={"rows": [{"close_time": 1704153599999, "close": "42000"}]},
+        ),
+    ]
+    conn = psycopg.connect(TEST_PG_DSN)
+    try:
+        with conn.cursor() as cur:
+            for layer in ("bronze", "silver"):
+                cur.execute((sql_root / layer / "schema.sql").read_text(encoding="utf-8"))
+            cur.execute("SELECT set_config('TimeZone', %s, true)", (time_zone,))
+            for env in envelopes:
+                # Only the JSON payload: silver takes its legacy path for these.
+                cur.execute("SELECT bronze.ensure_ingestion_events_partition(%s, %s::date)", (env.source, "2024-01-01"))
+                cur.execute(
+                    "INSERT INTO bronze.ingestion_events "
+                    "(uid, source, endpoint, request_params, asset, currency, fetched_at, payload) "
+                    "VALUES (%s, %s, %s, %s::jsonb, %s, %s, %s, %s::jsonb)",
+                    (
+                        env.uid,
+                        env.source,
+                        env.endpoint,
+                        json.dumps(env.request_params),
+                        env.asset,
+                        env.currency,
+                        env.fetched_at,
+                        json.dumps(env.payload),
+                    ),
+                )
+            for name in ("yfinance_prices", "binance_prices"):
+                cur.execute((sql_root / "silver" / f"{name}.sql").read_text(encoding="utf-8"))
+                env = envelopes[0] if name == "yfinance_prices" else envelopes[1]
+                cur.execute(
+                    f"SELECT price_ts, price_date FROM silver.{name} WHERE request_id = %s",
+                    (env.uid,),
+                )
+                typed = [(row[6], row[7]) for row in price_rows_from_envelope(env)]
+
+                assert cur.fetchall() == typed
+    finally:
+        conn.rollback()
+        conn.close()
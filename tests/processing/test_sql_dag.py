@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+import pytest
+
+from processing.sql_dag import SqlNode, load_sql_nodes, run_sql_dag
+
+
+class _Recorder:
+    def __init__(self, block_on: set[str] | None = None) -> None:
+        self.executed: list[str] = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+        self.barrier = threading.Barrier(len(block_on)) if block_on else None
+        self.block_on = block_on or set()
+
+    @contextmanager
+    def connect(self, dsn: str | None = None) -> Iterator[Any]:
+        recorder = self
+
+        class _Cursor:
+            def execute(self, statement: str) -> None:
+                with recorder.lock:
+                    recorder.active += 1
+                    recorder.max_active = max(recorder.max_active, recorder.active)
+                if statement in recorder.block_on:
+                    recorder.barrier.wait(timeout=5)
+                with recorder.lock:
+                    recorder.executed.append(statement)
+                    recorder.active -= 1
+                if statement == "boom":
+                    raise RuntimeError("statement failed")
+
+            def __enter__(self) -> "_Cursor":
+                return self
+
+            def __exit__(self, *args: Any) -> None:
+                return None
+
+        class _Conn:
+            def cursor(self) -> _Cursor:
+                return _Cursor()
+
+            def commit(self) -> None:
+                return None
+
+        yield _Conn()
+
+
+def _node(name: str, *statements: str, depends_on: tuple[str, ...] = ()) -> SqlNode:
+    return SqlNode(name=name, statements=statements, depends_on=frozenset(depends_on))
+
+
+def test_run_sql_dag_runs_independent_nodes_concurrently() -> None:
+    recorder = _Recorder(block_on={"a1", "b1"})
+    nodes = {
+        "silver/a": _node("silver/a", "a1"),
+        "silver/b": _node("silver/b", "b1"),
+        "gold/c": _node("gold/c", "c1", "c2", depends_on=("silver/a", "silver/b")),
+    }
+
+    results = run_sql_dag(nodes, max_workers=2, connect=recorder.connect)
+
+    assert recorder.max_active == 2
+    assert recorder.executed[-2:] == ["c1", "c2"]
+    assert list(results) == ["silver/a", "silver/b", "gold/c"]
+    assert results["gold/c"].statements == 2
+    assert all(result.elapsed_seconds >= 0 for result in results.values())
+
+
+def test_run_sql_dag_skips_dependents_of_failed_nodes() -> None:
+    recorder = _Recorder()
+    nodes = {
+        "silver/a": _node("silver/a", "boom"),
+        "gold/b": _node("gold/b", "b1", depends_on=("silver/a",)),
+    }
+
+    with pytest.raises(RuntimeError, match="statement failed"):
+        run_sql_dag(nodes, connect=recorder.connect)
+
+    assert recorder.executed == ["boom"]
+
+
+def test_run_sql_dag_rejects_unknown_dependencies_and_cycles() -> None:
+    recorder = _Recorder()
+    misspelled = {
+        "gold/a": _node("gold/a", "a1", depends_on=("gold/b_typo",)),
+        "gold/b": _node("gold/b", "b1"),
+    }
+    with pytest.raises(ValueError, match="gold/a depends on unknown SQL file"):
+        run_sql_dag(misspelled, connect=recorder.connect)
+
+    cyclic = {
+        "gold/a": _node("gold/a", "a1", depends_on=("gold/b",)),
+        "gold/b": _node("gold/b", "b1", depends_on=("gold/a",)),
+    }
+    with pytest.raises(ValueError, match="cycle"):
+        run_sql_dag(cyclic, connect=recorder.connect)
+    assert recorder.executed == []
+
+
+def test_load_sql_nodes_reads_depends_on_headers(tmp_path: Path) -> None:
+    sql_root = Path(__file__).resolve().parents[2] / "sql"
+
+    nodes = load_sql_nodes(sql_root / "silver", sql_root / "gold")
+
+    assert "silver/schema" not in nodes
+    assert all(node.depends_on <= nodes.keys() for node in nodes.values())
+
+    layer = tmp_path / "gold"
+    layer.mkdir()
+    (layer / "a.sql").write_text("SELECT 1;", encoding="utf-8")
+    (layer / "b.sql").write_text("-- depends_on: gold/a\nSELECT 2;", encoding="utf-8")
+
+    assert load_sql_nodes(layer)["gold/b"].depends_on == {"gold/a"}
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Iterator
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from storage import bronze_archive
+from storage.bronze_archive import archive_bronze, archive_files, replay_archive
+
+
+class _FakeCursor:
+    def __init__(self, conn: "_FakeConn") -> None:
+        self.conn = conn
+
+    def execute(self, query: Any, params: Any | None = None) -> None:
+        text = query if isinstance(query, str) else query.as_string(None)
+        self.conn.executed.append(" ".join(text.split()))
+        self.result = [(True,)] * len(params[0]) if "to_regclass" in text else self.conn.catalog
+
+    def fetchall(self) -> list[tuple[Any, ...]]:
+        return self.result
+
+    def fetchmany(self, size: int) -> list[tuple[Any, ...]]:
+        batch, self.conn.rows = self.conn.rows[:size], self.conn.rows[size:]
+        return batch
+
+    def __enter__(self) -> "_FakeCursor":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        return None
+
+
+class _FakeConn:
+    def __init__(self, catalog: list[tuple[Any, ...]], rows: list[tuple[Any, ...]]) -> None:
+        self.catalog = catalog
+        self.rows = rows
+        self.executed: list[str] = []
+
+    def cursor(self, name: str | None = None) -> _FakeCursor:
+        return _FakeCursor(self)
+
+
+def _event_row(uid: str) -> tuple[Any, ...]:
+    fetched_at = datetime(2023, 1, 10, tzinfo=timezone.utc)
+    return (uid, "binance", "x", '{"symbol": "BTCUSDT"}', "BTC", "usdt", fetched_at, '{"rows": []}', fetched_at)
+
+
+def test_archive_bronze_writes_parquet_before_dropping_partition(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    conn = _FakeConn(
+        catalog=[("ingestion_events_binance_202301",), ("ingestion_events_binance_202312",)],
+        rows=[_event_row("u-1"), _event_row("u-2")],
+    )
+
+    @contextmanager
+    def _pooled_connection(dsn: str | None = None) -> Iterator[_FakeConn]:
+        yield conn
+
+    monkeypatch.setattr(bronze_archive, "pooled_connection", _pooled_connection)
+    monkeypatch.setattr(bronze_archive, "ARCHIVE_CHUNK_ROWS", 1)
+
+    archived = archive_bronze(date(2023, 6, 30), base_dir=tmp_path, tables=["ingestion_events"])
+
+    (item,) = archived
+    assert (item.source, item.month, item.rows) == ("binance", date(2023, 1, 1), 2)
+    assert item.path.parent == tmp_path / "ingestion_events" / "source=binance" / "month=2023-01"
+    table = pq.read_table(item.path)
+    assert table.column("uid").to_pylist() == ["u-1", "u-2"]
+    assert pq.ParquetFile(item.path).metadata.row_group(0).column(0).compression == "ZSTD"
+    assert list(item.path.parent.glob(".*.tmp")) == []
+    assert conn.executed[-3:] == [
+        'DELETE FROM "bronze"."price_rows" WHERE uid IN (SELECT uid FROM bronze."ingestion_events_binance_202301")',
+        'DELETE FROM "bronze"."envelope_hashes" WHERE uid IN (SELECT uid FROM bronze."ingestion_events_binance_202301")',
+        'DROP TABLE bronze."ingestion_events_binance_202301"',
+    ]
+    assert not any("processed_envelopes" in query for query in conn.executed)
+    lock = conn.executed.index('LOCK TABLE bronze."ingestion_events_binance_202301" IN SHARE MODE')
+    assert conn.executed[lock + 1].startswith('SELECT "uid"::text')
+
+
+def test_archive_files_filters_by_table_source_and_month(tmp_path: Path) -> None:
+    for relative in (
+        "ingestion_events/source=binance/month=2023-01/part-a.parquet",
+        "ingestion_events/source=binance/month=2023-03/part-b.parquet",
+        "ingestion_events/source=yfinance/month=2023-02/part-c.parquet",
+        "pdf_nubank_trade_events/source=nubank/month=2023-02/part-d.parquet",
+    ):
+        path = tmp_path / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.touch()
+
+    files = archive_files(
+        tmp_path,
+        tables=["ingestion_events"],
+        sources=["binance"],
+        start=date(2023, 1, 15),
+        end=date(2023, 2, 28),
+    )
+
+    assert [path.name for _, path in files] == ["part-a.parquet"]
+    with pytest.raises(ValueError, match="Unsupported"):
+        archive_files(tmp_path, tables=["price_rows"])
+
+
+def test_replay_archive_sums_rows_per_table(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    for relative in (
+        "ingestion_events/source=binance/month=2023-01/part-a.parquet",
+        "ingestion_events/source=binance/month=2023-02/part-b.parquet",
+        "pdf_nubank_trade_events/source=nubank/month=2023-02/part-c.parquet",
+    ):
+        path = tmp_path / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.touch()
+    replayed: list[str] = []
+
+    def _replay_file(table: str, path: Path) -> int:
+        replayed.append(path.name)
+        return 5
+
+    monkeypatch.setattr(bronze_archive, "_replay_file", _replay_file)
+
+    inserted = replay_archive(base_dir=tmp_path, max_workers=2)
+
+    assert inserted == {"ingestion_events": 10, "pdf_nubank_trade_events": 5}
+    assert sorted(replayed) == ["part-a.parquet", "part-b.parquet", "part-c.parquet"]
+    assert replay_archive(base_dir=tmp_path, tables=(table for table in ["ingestion_events"])) == {
+        "ingestion_events": 10
+    }
+
+
+def test_replay_archive_loads_envelopes_through_bronze_writer(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    schema = bronze_archive.ARCHIVE_SCHEMAS["ingestion_events"]
+    path = tmp_path / "ingestion_events/source=binance/month=2023-01/part-a.parquet"
+    path.parent.mkdir(parents=True)
+    rows = [_event_row("11111111-1111-1111-1111-111111111111"), _event_row("22222222-2222-2222-2222-222222222222")]
+    pq.write_table(pa.Table.from_batches([bronze_archive._record_batch(schema, rows)]), path)
+    written: list[Any] = []
+
+    def _insert_missing_envelopes(envelopes: list[Any]) -> int:
+        written.extend(envelopes)
+        return len(envelopes) - 1
+
+    monkeypatch.setattr(bronze_archive, "insert_missing_envelopes", _insert_missing_envelopes)
+
+    inserted = replay_archive(base_dir=tmp_path, tables=["ingestion_events"])
+
+    assert inserted == {"ingestion_events": 1}
+    assert [env.uid for env in written] == [row[0] for row in rows]
+    assert written[0].request_params == {"symbol": "BTCUSDT"}
+    assert written[0].payload == {"rows": []}
+    assert written[0].fetched_at == "2023-01-10T00:00:00+00:00"
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from datetime import date, datetime, timezone
+from typing import Any, Iterator
+
+import pytest
+
+from ingestion.models import RawEnvelope
+from storage import bronze_compaction
+from storage.bronze_compaction import compact_bronze, compact_envelopes
+
+DAY_MS = 86_400_000
+
+
+def _envelope(uid: str, fetched_at: str, days: range, close: str) -> RawEnvelope:
+    return RawEnvelope(
+        source="binance",
+        endpoint="https://api.binance.com/api/v3/klines",
+        request_params={"symbol": "BTCUSDT", "start_date": "2024-01-01"},
+        asset="BTC",
+        currency="usdt",
+        uid=uid,
+        fetched_at=fetched_at,
+        payload={
+            "symbol": "BTCUSDT",
+            "rows": [{"close_time": 1704153599999 + day * DAY_MS, "close": f"{close}{day}"} for day in days],
+        },
+    )
+
+
+def test_compact_envelopes_keeps_newest_row_per_date() -> None:
+    older = _envelope("u-1", "2026-09-01T00:00:00+00:00", range(0, 4), "1.")
+    newer = _envelope("u-2", "2026-09-30T21:00:00-03:00", range(2, 6), "2.")
+    older.payload["rows"].append({"close_time": None, "close": "9"})
+
+    result = compact_envelopes([newer, older])
+
+    assert result is not None
+    compacted = result.envelope
+    assert compacted.uid not in {"u-1", "u-2"}
+    assert compacted.fetched_at == newer.fetched_at
+    assert [row["close"] for row in compacted.payload["rows"]] == ["1.0", "1.1", "2.2", "2.3", "2.4", "2.5"]
+    assert result.row_fetched_at == (older.fetched_at,) * 2 + (newer.fetched_at,) * 4
+    assert compacted.request_params == {
+        "symbol": "BTCUSDT",
+        "start_date": "2024-01-01",
+        "end_date": "2024-01-06",
+        "compacted": True,
+    }
+    assert compact_envelopes([]) is None
+
+
+def test_compact_envelopes_drops_dates_superseded_by_other_months() -> None:
+    august = _envelope("u-1", "2026-08-10T00:00:00+00:00", range(0, 2), "1.")
+    august_again = _envelope("u-2", "2026-08-20T00:00:00+00:00", range(0, 3), "2.")
+    september_ts = datetime(2024, 1, 2, 23, 59, 59, 999000, tzinfo=timezone.utc)
+    newer = {september_ts.date(): (september_ts, datetime(2026, 9, 1, tzinfo=timezone.utc))}
+
+    result = compact_envelopes([august, august_again], newer=newer)
+
+    assert result is not None
+    assert [row["close"] for row in result.envelope.payload["rows"]] == ["2.0", "2.2"]
+    assert result.row_fetched_at == (august_again.fetched_at,) * 2
+
+
+def test_compact_bronze_skips_groups_locked_by_another_run(monkeypatch: pytest.MonkeyPatch) -> None:
+    executed: list[tuple[str, Any]] = []
+    results = iter([[("binance", "BTCUSDT", "usdt", None, date(2026, 9, 1))], (False,)])
+
+    class _Cursor:
+        def execute(self, query: str, params: Any | None = None) -> None:
+            executed.append((query, params))
+
+        def fetchall(self) -> list[tuple[Any, ...]]:
+            return next(results)
+
+        def fetchone(self) -> tuple[Any, ...]:
+            return next(results)
+
+        def __enter__(self) -> "_Cursor":
+            return self
+
+        def __exit__(self, *args: Any) -> None:
+            return None
+
+    class _Conn:
+        rolled_back = False
+
+        def cursor(self) -> _Cursor:
+            return _Cursor()
+
+        def rollback(self) -> None:
+            _Conn.rolled_back = True
+
+    @contextmanager
+    def _pooled_connection() -> Iterator[_Conn]:
+        yield _Conn()
+
+    monkeypatch.setattr(bronze_compaction, "pooled_connection", _pooled_connection)
+
+    assert compact_bronze(sources=["binance", "nubank"]) == []
+    assert executed[0][1] == (["binance"], None, None)
+    assert executed[2][1] == ("binance|BTCUSDT|usdt||2026-09",)
+    assert _Conn.rolled_back is True
+    assert not any("DELETE" in query for query, _ in executed)
+
+
+def test_compact_bronze_repoints_superseded_hashes(monkeypatch: pytest.MonkeyPatch) -> None:
+    executed: list[tuple[str, Any]] = []
+    older = _envelope("00000000-0000-0000-0000-000000000001", "2026-09-01T00:00:00+00:00", range(0, 3), "1.")
+    newer = _envelope("00000000-0000-0000-0000-000000000002", "2026-09-20T00:00:00+00:00", range(2, 5), "2.")
+    stored = [
+        (
+            env.uid,
+            env.source,
+            env.endpoint,
+            env.request_params,
+            env.asset,
+            env.currency,
+            datetime.fromisoformat(env.fetched_at),
+            env.payload,
+        )
+        for env in (older, newer)
+    ]
+    results = iter([[("binance", "BTCUSDT", "usdt", None, date(2026, 9, 1))], (True,), stored, []])
+
+    class _Cursor:
+        def execute(self, query: str, params: Any | None = None) -> None:
+            executed.append((query, params))
+
+        def executemany(self, query: str, rows: Any) -> None:
+            executed.append((query, rows))
+
+        def fetchall(self) -> list[tuple[Any, ...]]:
+            return next(results)
+
+        def fetchone(self) -> tuple[Any, ...]:
+            return next(results)
+
+        def __enter__(self) -> "_Cursor":
+            return self
+
+        def __exit__(self, *args: Any) -> None:
+            return None
+
+    class _Conn:
+        def cursor(self) -> _Cursor:
+            return _Cursor()
+
+        def commit(self) -> None:
+            return None
+
+    @contextmanager
+    def _pooled_connection() -> Iterator[_Conn]:
+        yield _Conn()
+
+    monkeypatch.setattr(bronze_compaction, "pooled_connection", _pooled_connection)
+    monkeypatch.setattr(bronze_compaction, "ensure_event_partitions", lambda cur, envelopes: None)
+
+    (result,) = compact_bronze(sources=["binance"])
+
+    hash_queries = [(query, params) for query, params in executed if "bronze.envelope_hashes" in query]
+    assert not any("DELETE" in query for query, _ in hash_queries)
+    assert (
+        "UPDATE bronze.envelope_hashes SET uid = %s WHERE uid = ANY(%s::uuid[])",
+        (result.uid, [older.uid, newer.uid]),
+    ) in hash_queries
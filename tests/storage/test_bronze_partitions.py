@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from datetime import date
+from typing import Any, Iterator
+
+import pytest
+
+from ingestion.models import RawEnvelope
+from storage import bronze_partitions
+from storage.bronze_partitions import (
+    EventPartition,
+    apply_retention,
+    ensure_event_partitions,
+    expired_partitions,
+)
+
+
+class _FakeCursor:
+    def __init__(self, rows: list[tuple[Any, ...]] | None = None) -> None:
+        self.executed: list[tuple[Any, Any]] = []
+        self._rows = rows or []
+
+    def execute(self, query: Any, params: Any | None = None) -> None:
+        self.executed.append((query, params))
+
+    def fetchall(self) -> list[tuple[Any, ...]]:
+        return self._rows
+
+    def __enter__(self) -> "_FakeCursor":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        return None
+
+
+def _envelope(source: str, fetched_at: str) -> RawEnvelope:
+    return RawEnvelope(
+        source=source,
+        endpoint="x",
+        request_params={},
+        asset="BTC",
+        currency="usdt",
+        uid="00000000-0000-0000-0000-000000000000",
+        fetched_at=fetched_at,
+        payload={},
+    )
+
+
+def test_ensure_event_partitions_requests_each_source_month_once(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setenv("FINANCES_HUB_BRONZE_PAYLOAD_GIN", "true")
+    cur = _FakeCursor()
+
+    ensure_event_partitions(
+        cur,
+        [
+            _envelope("binance", "2024-01-31T23:30:00-03:00"),
+            _envelope("binance", "2024-02-10T00:00:00+00:00"),
+            _envelope("yfinance", "2024-01-05T00:00:00+00:00"),
+        ],
+    )
+
+    (query, params), = cur.executed
+    assert "bronze.ensure_ingestion_events_partition" in query
+    assert params == (
+        True,
+        ["binance", "yfinance"],
+        [date(2024, 2, 1), date(2024, 1, 1)],
+    )
+
+
+def test_ensure_event_partitions_skips_empty_batches() -> None:
+    cur = _FakeCursor()
+
+    ensure_event_partitions(cur, [])
+
+    assert cur.executed == []
+
+
+def test_expired_partitions_keeps_retention_window() -> None:
+    partitions = [
+        EventPartition(name=f"ingestion_events_binance_{month:%Y%m}", parent="ingestion_events_binance", month=month)
+        for month in (date(2024, 9, 1), date(2024, 10, 1), date(2024, 11, 1))
+    ]
+
+    expired = expired_partitions(partitions, retention_months=24, today=date(2026, 10, 17))
+
+    assert [partition.month for partition in expired] == [date(2024, 9, 1)]
+    with pytest.raises(ValueError, match="retention_months"):
+        expired_partitions(partitions, retention_months=0)
+
+
+def test_apply_retention_detaches_concurrently_and_cleans_side_tables(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    cursors = [
+        _FakeCursor(
+            [
+                ("ingestion_events_binance_202301", "ingestion_events_binance", False),
+                ("ingestion_events_binance_202302", "ingestion_events_binance", True),
+                ("ingestion_events_binance_202609", "ingestion_events_binance", False),
+            ]
+        ),
+        _FakeCursor([("ingestion_events_binance_202212", None, False)]),
+        _FakeCursor(),
+        _FakeCursor([(True,), (True,), (False,)]),
+    ]
+    autocommit: list[bool] = []
+
+    class _Conn:
+        def __init__(self, cursor: _FakeCursor) -> None:
+            self._cursor = cursor
+            self.autocommit = False
+
+        def cursor(self) -> _FakeCursor:
+            autocommit.append(self.autocommit)
+            return self._cursor
+
+        def commit(self) -> None:
+            return None
+
+    @contextmanager
+    def _pooled_connection(dsn: str | None = None) -> Iterator[_Conn]:
+        yield _Conn(cursors.pop(0))
+
+    detach_cursor, cleanup_cursor = cursors[2], cursors[3]
+    monkeypatch.setattr(bronze_partitions, "pooled_connection", _pooled_connection)
+
+    expired = apply_retention(12, drop=True, today=date(2026, 10, 17))
+
+    assert [partition.name for partition in expired] == [
+        "ingestion_events_binance_202301",
+        "ingestion_events_binance_202302",
+        "ingestion_events_binance_202212",
+    ]
+    assert autocommit == [False, False, True, False]
+    assert [query.as_string(None) for query, _ in detach_cursor.executed] == [
+        'ALTER TABLE bronze."ingestion_events_binance" DETACH PARTITION bronze."ingestion_events_binance_202301" CONCURRENTLY',
+        'ALTER TABLE bronze."ingestion_events_binance" DETACH PARTITION bronze."ingestion_events_binance_202302" FINALIZE',
+    ]
+    statements = [query.as_string(None) for query, _ in cleanup_cursor.executed[1:]]
+    assert statements[:3] == [
+        'DELETE FROM "bronze"."price_rows" WHERE uid IN (SELECT uid FROM bronze."ingestion_events_binance_202301")',
+        'DELETE FROM "bronze"."envelope_hashes" WHERE uid IN (SELECT uid FROM bronze."ingestion_events_binance_202301")',
+        'DROP TABLE bronze."ingestion_events_binance_202301"',
+    ]
+    assert statements[-1] == 'DROP TABLE bronze."ingestion_events_binance_202212"'
+    assert len(statements) == 9
+
+
+def test_apply_retention_without_drop_still_releases_side_rows(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    cursors = [
+        _FakeCursor([("ingestion_events_yfinance_202301", "ingestion_events_yfinance", False)]),
+        _FakeCursor(),
+        _FakeCursor([(True,), (True,), (True,)]),
+    ]
+
+    class _Conn:
+        def __init__(self, cursor: _FakeCursor) -> None:
+            self._cursor = cursor
+            self.autocommit = False
+
+        def cursor(self) -> _FakeCursor:
+            return self._cursor
+
+        def commit(self) -> None:
+            return None
+
+    @contextmanager
+    def _pooled_connection(dsn: str | None = None) -> Iterator[_Conn]:
+        yield _Conn(cursors.pop(0))
+
+    cleanup_cursor = cursors[2]
+    monkeypatch.setattr(bronze_partitions, "pooled_connection", _pooled_connection)
+
+    apply_retention(12, today=date(2026, 10, 17))
+
+    statements = [query.as_string(None) for query, _ in cleanup_cursor.executed[1:]]
+    assert statements == [
+        f'DELETE FROM "{schema}"."{table}" WHERE uid IN (SELECT uid FROM bronze."ingestion_events_yfinance_202301")'
+        for schema, table in bronze_partitions.PARTITION_SIDE_TABLES
+    ]
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+
+from storage.connection_pool import (
+    configure_pool,
+    get_pool,
+    pooled_connection,
+    resolve_conninfo,
+)
+
+
+class _FakeConn:
+    def __init__(self, conninfo: str) -> None:
+        self.conninfo = conninfo
+        self.closed = False
+        self.broken = False
+        self.commits = 0
+        self.rollbacks = 0
+
+    def commit(self) -> None:
+        self.commits += 1
+
+    def rollback(self) -> None:
+        self.rollbacks += 1
+
+    def close(self) -> None:
+        self.closed = True
+
+
+@pytest.fixture()
+def connections(monkeypatch: pytest.MonkeyPatch) -> list[_FakeConn]:
+    opened: list[_FakeConn] = []
+
+    def _connect(conninfo: str, **_kwargs: Any) -> _FakeConn:
+        conn = _FakeConn(conninfo)
+        opened.append(conn)
+        return conn
+
+    monkeypatch.setattr("storage.connection_pool.psycopg.connect", _connect)
+    return opened
+
+
+def test_pooled_connection_reuses_warm_connections(connections: list[_FakeConn]) -> None:
+    configure_pool("postgresql://local/pooled")
+
+    with pooled_connection() as first:
+        pass
+    with pooled_connection() as second:
+        pass
+
+    assert first is second
+    assert len(connections) == 1
+    assert connections[0].conninfo == "postgresql://local/pooled"
+    assert connections[0].commits == 2
+
+
+def test_pooled_connection_rolls_back_on_error(connections: list[_FakeConn]) -> None:
+    with pytest.raises(RuntimeError):
+        with pooled_connection("postgresql://local/errors"):
+            raise RuntimeError("boom")
+
+    with pooled_connection("postgresql://local/errors") as conn:
+        pass
+
+    assert len(connections) == 1
+    assert conn.rollbacks == 1
+
+
+def test_pooled_connection_drops_closed_connections(connections: list[_FakeConn]) -> None:
+    with pooled_connection("postgresql://local/closed") as conn:
+        conn.close()
+    with pooled_connection("postgresql://local/closed"):
+        pass
+
+    assert len(connections) == 2
+
+
+def test_pool_opens_separate_connections_when_nested(connections: list[_FakeConn]) -> None:
+    with pooled_connection("postgresql://local/nested") as outer:
+        with pooled_connection("postgresql://local/nested") as inner:
+            assert outer is not inner
+
+    assert get_pool("postgresql://local/nested").max_size == 4
+
+
+def test_resolve_conninfo_prefers_explicit_then_configured_then_env(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setenv("FINANCES_HUB_PG_DSN", "postgresql://local/env")
+    assert resolve_conninfo() == "postgresql://local/env"
+
+    configure_pool("postgresql://local/configured")
+    assert resolve_conninfo() == "postgresql://local/configured"
+    assert resolve_conninfo("postgresql://local/explicit") == "postgresql://local/explicit"
+
+
+def test_resolve_conninfo_requires_dsn(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("FINANCES_HUB_PG_DSN", raising=False)
+
+    with pytest.raises(ValueError, match="FINANCES_HUB_PG_DSN"):
+        resolve_conninfo()
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import gzip
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from ingestion.models import RawEnvelope
+from storage import raw_file_store
+from storage.raw_file_store import (
+    flush_segments,
+    iter_envelopes,
+    list_segments,
+    read_index,
+    write_envelopes,
+)
+
+
+def _envelope(index: int, asset: str = "BTC", fetched_at: str = "2024-01-01T12:00:00+00:00") -> RawEnvelope:
+    return RawEnvelope(
+        source="binance",
+        endpoint="https://api.binance.com/api/v3/klines",
+        request_params={"symbol": f"{asset}USDT"},
+        asset=asset,
+        currency="usdt",
+        uid=f"uid-{index}",
+        fetched_at=fetched_at,
+        payload={"rows": [{"close": str(index)}]},
+    )
+
+
+def test_segments_are_invisible_until_flushed(tmp_path: Path) -> None:
+    write_envelopes("binance", [_envelope(0)], base_dir=tmp_path)
+
+    assert list_segments("binance", base_dir=tmp_path) == []
+    assert len(list((tmp_path / "binance" / "2024-01-01").glob("*.part"))) == 2
+
+    (segment,) = flush_segments("binance", base_dir=tmp_path)
+
+    assert list_segments("binance", base_dir=tmp_path) == [segment]
+    assert list(segment.parent.glob("*.part")) == []
+    assert [env.uid for env in iter_envelopes("binance", base_dir=tmp_path)] == ["uid-0"]
+
+
+def test_segments_roll_by_day_and_size(tmp_path: Path) -> None:
+    write_envelopes(
+        "binance",
+        [_envelope(0), _envelope(1, fetched_at="2024-01-01T23:30:00-03:00")],
+        base_dir=tmp_path,
+        max_segment_bytes=1,
+    )
+    write_envelopes("binance", [_envelope(2)], base_dir=tmp_path, max_segment_bytes=1)
+
+    segments = list_segments("binance", base_dir=tmp_path)
+
+    assert [segment.parent.name for segment in segments] == ["2024-01-01", "2024-01-01", "2024-01-02"]
+    assert flush_segments(base_dir=tmp_path) == []
+    assert [
+        env.uid for env in iter_envelopes("binance", base_dir=tmp_path, start=date(2024, 1, 2))
+    ] == ["uid-1"]
+
+
+def test_index_lets_readers_decompress_only_matching_blocks(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    monkeypatch.setattr(raw_file_store, "BLOCK_MAX_ENVELOPES", 2)
+    envelopes = [_envelope(index, asset="BTC" if index < 4 else "ETH") for index in range(6)]
+    write_envelopes("binance", envelopes, base_dir=tmp_path)
+    (segment,) = flush_segments(base_dir=tmp_path)
+
+    entries = read_index(segment)
+    offsets = sorted({entry.offset for entry in entries})
+    assert len(offsets) == 3
+    eth_offset = next(entry for entry in entries if entry.asset == "ETH")
+    with segment.open("rb") as handle:
+        handle.seek(eth_offset.offset)
+        block = gzip.decompress(handle.read(eth_offset.length)).decode("utf-8")
+    assert block.count("\n") == 2
+
+    decompressed: list[int] = []
+    original = gzip.decompress
+
+    def _tracking_decompress(data: bytes) -> bytes:
+        decompressed.append(len(data))
+        return original(data)
+
+    monkeypatch.setattr(raw_file_store.gzip, "decompress", _tracking_decompress)
+
+    found = list(iter_envelopes("binance", base_dir=tmp_path, asset="ETH"))
+    by_uid = list(iter_envelopes("binance", base_dir=tmp_path, uid="uid-1"))
+
+    assert [env.uid for env in found] == ["uid-4", "uid-5"]
+    assert [env.uid for env in by_uid] == ["uid-1"]
+    assert len(decompressed) == 2
+
+
+
+def test_envelopes_with_known_content_are_skipped(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    first = _envelope(0)
+    refetched = RawEnvelope(
+        **{
+            **first.to_dict(),
+            "uid": "uid-refetch",
+            "fetched_at": "2024-01-03T08:00:00+00:00",
+            "request_params": dict(reversed(list(first.request_params.items()))),
+        }
+    )
+    assert refetched.content_hash() == first.content_hash()
+    assert _envelope(1).content_hash() != first.content_hash()
+
+    write_envelopes("binance", [first, first], base_dir=tmp_path)
+    flush_segments("binance", base_dir=tmp_path)
+    monkeypatch.setattr(raw_file_store, "_known_hashes", {})
+
+    write_envelopes("binance", [refetched, _envelope(1)], base_dir=tmp_path)
+    flush_segments("binance", base_dir=tmp_path)
+
+    assert sorted(env.uid for env in iter_envelopes("binance", base_dir=tmp_path)) == ["uid-0", "uid-1"]
+
+
+def test_orphaned_part_segments_are_recovered_up_to_last_complete_block(tmp_path: Path) -> None:
+    directory = tmp_path / "binance" / "2024-01-01"
+    writer = raw_file_store.SegmentWriter(directory)
+    writer.write_block([(_envelope(0).content_hash(), _envelope(0))])
+    writer.write_block([(_envelope(1).content_hash(), _envelope(1))])
+    # The process dies mid-block: a torn gzip member and index line follow.
+    writer._data.write(gzip.compress(b'{"uid": "uid-2"}\n')[:10])
+    writer._index.write('{"uid": "uid-2", "asset"')
+    writer._data.close()
+    writer._index.close()
+
+    (segment,) = list_segments("binance", base_dir=tmp_path)
+
+    assert segment == writer.path
+    assert list(directory.glob("*.part")) == []
+    assert [entry.uid for entry in read_index(segment)] == ["uid-0", "uid-1"]
+    assert [env.uid for env in iter_envelopes("binance", base_dir=tmp_path)] == ["uid-0", "uid-1"]
+    assert write_envelopes("binance", [_envelope(1)], base_dir=tmp_path) == []
@@ -5,7 +5,33 @@ from typing import Any
 import pandas as pd
 from psycopg.types.json import Json
 
-from storage.raw_postgres import append_dataframe_to_bronze, overwrite_dataframe_in_bronze
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from ingestion.models import RawEnvelope
+from storage.raw_postgres import (
+    append_dataframe_to_bronze,
+    append_dataframes_to_bronze,
+    append_missing_dataframes_to_bronze,
+    insert_envelopes,
+    overwrite_dataframe_in_bronze,
+    price_rows_from_envelope,
+    sync_dataframe_to_bronze,
+)
+
+
+class _FakeCopy:
+    def __init__(self) -> None:
+        self.rows: list[tuple[Any, ...]] = []
+
+    def write_row(self, row: tuple[Any, ...]) -> None:
+        self.rows.append(row)
+
+    def __enter__(self) -> "_FakeCopy":
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        return None
 
 
 class _FakeCursor:
@@ -13,9 +39,42 @@ class _FakeCursor:
         self.query: Any | None = None
         self.rows: list[tuple[Any, ...]] | None = None
         self.executed_queries: list[Any] = []
+        self.copies: list[tuple[Any, _FakeCopy]] = []
+        self.claimed_hashes: set[str] = set()
+        self.result: list[tuple[Any, ...]] = []
+        self.fingerprints: dict[str, tuple[str, int]] = {}
+        self.table_rows = 0
+        self.loaded_batches: set[str] = set()
+
+    def copy(self, query: Any) -> _FakeCopy:
+        fake_copy = _FakeCopy()
+        self.copies.append((query, fake_copy))
+        return fake_copy
 
     def execute(self, query: Any, params: Any | None = None) -> None:
         self.executed_queries.append((query, params))
+        if isinstance(query, str) and "bronze.envelope_hashes" in query:
+            fresh = [content_hash for content_hash in params[0] if content_hash not in self.claimed_hashes]
+            self.claimed_hashes.update(fresh)
+            self.result = [(content_hash,) for content_hash in fresh]
+        elif isinstance(query, str) and query.startswith("SELECT sha256, row_count FROM bronze.load_fingerprints"):
+            self.result = [self.fingerprints[params[0]]] if params[0] in self.fingerprints else []
+        elif isinstance(query, str) and "INSERT INTO bronze.load_fingerprints" in query:
+            self.fingerprints[params[0]] = (params[1], params[2])
+            self.table_rows = params[2]
+            self.result = []
+        elif "SELECT count(*)" in str(query):
+            self.result = [(self.table_rows,)]
+        elif "request_params @>" in str(query):
+            self.result = [(params[0] in self.loaded_batches,)]
+        else:
+            self.result = []
+
+    def fetchall(self) -> list[tuple[Any, ...]]:
+        return self.result
+
+    def fetchone(self) -> tuple[Any, ...] | None:
+        return self.result[0] if self.result else None
 
     def executemany(self, query: Any, rows: list[tuple[Any, ...]]) -> None:
         self.query = query
@@ -29,6 +88,9 @@ class _FakeCursor:
 
 
 class _FakeConn:
+    closed = False
+    broken = False
+
     def __init__(self) -> None:
         self.cursor_obj = _FakeCursor()
         self.committed = False
@@ -39,6 +101,12 @@ class _FakeConn:
     def commit(self) -> None:
         self.committed = True
 
+    def rollback(self) -> None:
+        return None
+
+    def close(self) -> None:
+        self.closed = True
+
     def __enter__(self) -> "_FakeConn":
         return self
 
@@ -147,7 +215,303 @@ def test_overwrite_dataframe_in_bronze_replaces_rows(
 
     assert inserted == 2
     assert fake_conn.committed is True
-    assert len(fake_conn.cursor_obj.executed_queries) == 1
+    assert len(fake_conn.cursor_obj.executed_queries) == 2
     assert fake_conn.cursor_obj.query is not None
     assert fake_conn.cursor_obj.rows is not None
     assert fake_conn.cursor_obj.rows[0] == ("2024-05-02", 5.93, 1.18, 0.0)
+
+
+def _envelopes(count: int) -> list[RawEnvelope]:
+    return [
+        RawEnvelope(
+            source="binance",
+            endpoint="https://api.binance.com/api/v3/klines",
+            request_params={"symbol": "BTCUSDT"},
+            asset="BTC",
+            currency="usdt",
+            uid=f"00000000-0000-0000-0000-{index:012d}",
+            fetched_at="2026-02-23T12:00:00+00:00",
+            payload={"rows": [{"close": str(1.5 + index)}]},
+        )
+        for index in range(count)
+    ]
+
+
+def test_insert_envelopes_uses_copy_in_batches(monkeypatch: Any) -> None:
+    fake_conn = _FakeConn()
+    monkeypatch.setenv("FINANCES_HUB_PG_DSN", "postgresql://local/test")
+    monkeypatch.setattr("storage.raw_postgres.psycopg.connect", lambda *args, **kwargs: fake_conn)
+
+    inserted = insert_envelopes(iter(_envelopes(5)), batch_size=2, copy_min_rows=3)
+
+    copies = fake_conn.cursor_obj.copies
+    assert inserted == 5
+    assert fake_conn.committed is True
+    assert fake_conn.cursor_obj.rows is None
+    assert [len(fake_copy.rows) for _, fake_copy in copies] == [2, 2, 1]
+    first_row = copies[0][1].rows[0]
+    assert first_row[0] == "binance"
+    assert first_row[2] == '{"symbol": "BTCUSDT"}'
+    assert first_row[5] == "00000000-0000-0000-0000-000000000000"
+    assert first_row[7] == '{"rows": [{"close": "1.5"}]}'
+
+
+def test_insert_envelopes_small_batches_fall_back_to_executemany(monkeypatch: Any) -> None:
+    fake_conn = _FakeConn()
+    monkeypatch.setenv("FINANCES_HUB_PG_DSN", "postgresql://local/test")
+    monkeypatch.setattr("storage.raw_postgres.psycopg.connect", lambda *args, **kwargs: fake_conn)
+
+    inserted = insert_envelopes(_envelopes(2), copy_min_rows=3)
+
+    assert inserted == 2
+    assert fake_conn.cursor_obj.copies == []
+    assert fake_conn.cursor_obj.rows is not None
+    assert len(fake_conn.cursor_obj.rows) == 2
+    assert isinstance(fake_conn.cursor_obj.rows[0][2], Json)
+
+
+def _kline_envelope(uid: str, start_date: str = "2024-01-01", close: str = "42000.5") -> RawEnvelope:
+    return RawEnvelope(
+        source="binance",
+        endpoint="https://api.binance.com/api/v3/klines",
+        request_params={"symbol": "BTCUSDT", "start_date": start_date},
+        asset="BTC",
+        currency="usdt",
+        uid=uid,
+        fetched_at="2026-02-23T12:00:00+00:00",
+        payload={
+            "rows": [
+                {"open_time": 1704067200000, "close_time": 1704153599999, "close": close},
+                {"open_time": 1704153600000, "close_time": None, "close": "1"},
+            ]
+        },
+    )
+
+
+def test_price_rows_from_envelope_types_valid_rows() -> None:
+    binance_rows = price_rows_from_envelope(_kline_envelope("u-1"))
+    yfinance_rows = price_rows_from_envelope(
+        RawEnvelope(
+            source="yfinance",
+            endpoint="yfinance.download",
+            request_params={"symbol": "^GSPC", "series_type": "close"},
+            asset="^GSPC",
+            currency="usd",
+            uid="u-2",
+            fetched_at="2026-02-23T12:00:00+00:00",
+            payload={"rows": [{"date": "2024-01-02", "value": 4742.83}, {"date": "2024-01-03", "value": float("nan")}]},
+        )
+    )
+
+    assert binance_rows == [
+        (
+            "u-1",
+            "binance",
+            "BTCUSDT",
+            "BTC",
+            "usdt",
+            None,
+            datetime(2024, 1, 1, 23, 59, 59, 999000, tzinfo=timezone.utc),
+            date(2024, 1, 1),
+            Decimal("42000.5"),
+            "2026-02-23T12:00:00+00:00",
+        )
+    ]
+    assert len(yfinance_rows) == 1
+    assert yfinance_rows[0][5:9] == (
+        "close",
+        datetime(2024, 1, 2, tzinfo=timezone.utc),
+        date(2024, 1, 2),
+        Decimal("4742.83"),
+    )
+
+
+def test_insert_envelopes_writes_typed_price_rows(monkeypatch: Any) -> None:
+    fake_conn = _FakeConn()
+    monkeypatch.setenv("FINANCES_HUB_PG_DSN", "postgresql://local/test")
+    monkeypatch.setattr("storage.raw_postgres.psycopg.connect", lambda *args, **kwargs: fake_conn)
+
+    insert_envelopes([_kline_envelope("u-1")], copy_min_rows=3)
+    assert "bronze.price_rows" in fake_conn.cursor_obj.query.as_string(None)
+    assert fake_conn.cursor_obj.rows[0][8] == Decimal("42000.5")
+
+    insert_envelopes(
+        [_kline_envelope(f"u-{index}", close=f"4200{index}") for index in range(3)],
+        copy_min_rows=3,
+    )
+    query, price_copy = fake_conn.cursor_obj.copies[-1]
+    assert "bronze.price_rows" in query.as_string(None)
+    assert [row[0] for row in price_copy.rows] == ["u-0", "u-1", "u-2"]
+
+
+def test_insert_envelopes_skips_already_seen_content(monkeypatch: Any) -> None:
+    fake_conn = _FakeConn()
+    monkeypatch.setenv("FINANCES_HUB_PG_DSN", "postgresql://local/test")
+    monkeypatch.setattr("storage.raw_postgres.psycopg.connect", lambda *args, **kwargs: fake_conn)
+
+    assert insert_envelopes([_kline_envelope("u-1"), _kline_envelope("u-2")], copy_min_rows=3) == 1
+    assert [row[0] for row in fake_conn.cursor_obj.rows] == ["u-1"]
+
+    fake_conn.cursor_obj.rows = None
+    assert insert_envelopes([_kline_envelope("u-3")], copy_min_rows=3) == 0
+    assert fake_conn.cursor_obj.rows is None
+
+    # Same rows from a different fetch window are the same content.
+    refetched = [_kline_envelope("u-4"), _kline_envelope("u-5", start_date="2023-12-25")]
+    assert insert_envelopes(refetched, copy_min_rows=3) == 0
+
+    revised = [_kline_envelope("u-6", start_date="2023-12-25", close="42001")]
+    assert insert_envelopes(revised, copy_min_rows=3) == 1
+
+
+def test_append_dataframe_to_bronze_streams_large_frames_through_copy(
+    monkeypatch: Any,
+) -> None:
+    fake_conn = _FakeConn()
+    monkeypatch.setenv("FINANCES_HUB_PG_DSN", "postgresql://local/test")
+    monkeypatch.setattr("storage.raw_postgres.psycopg.connect", lambda *args, **kwargs: fake_conn)
+
+    df = pd.DataFrame(
+        [
+            {"asset": "PETR4", "close": 37.52},
+            {"asset": None, "close": float("nan")},
+            {"asset": "VALE3", "close": 61.13},
+        ]
+    )
+
+    inserted = append_dataframe_to_bronze(
+        df,
+        "prices_daily",
+        source="yfinance",
+        endpoint="yfinance.Ticker.history",
+        request_params={"symbol": "PETR4.SA"},
+        uid="11111111-1111-1111-1111-111111111111",
+        fetched_at="2026-02-23T12:00:00+00:00",
+        copy_min_rows=1,
+    )
+
+    assert inserted == 3
+    assert fake_conn.committed is True
+    assert fake_conn.cursor_obj.rows is None
+    (_query, fake_copy), = fake_conn.cursor_obj.copies
+    control = (
+        "yfinance",
+        "yfinance.Ticker.history",
+        '{"symbol": "PETR4.SA"}',
+        "11111111-1111-1111-1111-111111111111",
+        "2026-02-23T12:00:00+00:00",
+    )
+    assert fake_copy.rows == [
+        ("PETR4", 37.52, *control),
+        (None, None, *control),
+        ("VALE3", 61.13, *control),
+    ]
+
+
+def test_overwrite_dataframe_in_bronze_copies_after_truncate(monkeypatch: Any) -> None:
+    fake_conn = _FakeConn()
+    monkeypatch.setenv("FINANCES_HUB_PG_DSN", "postgresql://local/test")
+    monkeypatch.setattr("storage.raw_postgres.psycopg.connect", lambda *args, **kwargs: fake_conn)
+
+    df = pd.DataFrame([{"date": "2024-05-02", "taxa_liquidacao": 5.93}])
+
+    inserted = overwrite_dataframe_in_bronze(df, "nubank_trade_taxes", copy_min_rows=1)
+
+    assert inserted == 1
+    truncate, clear_fingerprint = fake_conn.cursor_obj.executed_queries
+    assert clear_fingerprint == (
+        "DELETE FROM bronze.load_fingerprints WHERE table_name = %s",
+        ("bronze.nubank_trade_taxes",),
+    )
+    assert fake_conn.cursor_obj.copies[0][1].rows == [("2024-05-02", 5.93)]
+
+
+def test_append_dataframes_to_bronze_copies_each_frame_under_its_own_uid(monkeypatch: Any) -> None:
+    fake_conn = _FakeConn()
+    monkeypatch.setenv("FINANCES_HUB_PG_DSN", "postgresql://local/test")
+    monkeypatch.setattr("storage.raw_postgres.psycopg.connect", lambda *args, **kwargs: fake_conn)
+
+    uids = append_dataframes_to_bronze(
+        [
+            (pd.DataFrame([{"ticker": "PETR4"}, {"ticker": "VALE3"}]), {"pdf_path": "a.pdf"}),
+            (pd.DataFrame(), {"pdf_path": "empty.pdf"}),
+            (pd.DataFrame([{"ticker": "ITUB4"}]), {"pdf_path": "b.pdf"}),
+        ],
+        "pdf_nubank_trade_events",
+        source="nubank_trading_notes_pdf",
+        endpoint="pdfplumber.extract_tables",
+        fetched_at="2026-02-23T12:00:00+00:00",
+        copy_min_rows=1,
+    )
+
+    assert len(uids) == 2
+    assert fake_conn.committed is True
+    (_query, fake_copy), = fake_conn.cursor_obj.copies
+    assert [(row[0], row[3], row[4]) for row in fake_copy.rows] == [
+        ("PETR4", '{"pdf_path": "a.pdf"}', uids[0]),
+        ("VALE3", '{"pdf_path": "a.pdf"}', uids[0]),
+        ("ITUB4", '{"pdf_path": "b.pdf"}', uids[1]),
+    ]
+
+
+def test_append_missing_dataframes_to_bronze_loads_each_key_once(monkeypatch: Any) -> None:
+    fake_conn = _FakeConn()
+    fake_conn.cursor_obj.loaded_batches.add('{"sha256": "old"}')
+    monkeypatch.setenv("FINANCES_HUB_PG_DSN", "postgresql://local/test")
+    monkeypatch.setattr("storage.raw_postgres.psycopg.connect", lambda *args, **kwargs: fake_conn)
+
+    uids = append_missing_dataframes_to_bronze(
+        [
+            (pd.DataFrame([{"ticker": "PETR4"}]), {"pdf_path": "a.pdf", "sha256": "new"}),
+            (pd.DataFrame([{"ticker": "PETR4"}]), {"pdf_path": "copy.pdf", "sha256": "new"}),
+            (pd.DataFrame([{"ticker": "VALE3"}]), {"pdf_path": "b.pdf", "sha256": "old"}),
+        ],
+        "pdf_nubank_trade_events",
+        key_params=["sha256"],
+        source="nubank_trading_notes_pdf",
+        endpoint="pdfplumber.extract_tables",
+        copy_min_rows=1,
+    )
+
+    cursor = fake_conn.cursor_obj
+    assert uids[0] is not None and uids[1:] == [None, None]
+    locks = [params for query, params in cursor.executed_queries if "pg_advisory_xact_lock" in str(query)]
+    assert locks == [
+        ("bronze.pdf_nubank_trade_events", '{"sha256": "new"}'),
+        ("bronze.pdf_nubank_trade_events", '{"sha256": "old"}'),
+    ]
+    (_query, fake_copy), = cursor.copies
+    assert [(row[0], row[3]) for row in fake_copy.rows] == [("PETR4", '{"pdf_path": "a.pdf", "sha256": "new"}')]
+
+
+def test_sync_dataframe_to_bronze_skips_unchanged_fingerprint(monkeypatch: Any) -> None:
+    fake_conn = _FakeConn()
+    monkeypatch.setenv("FINANCES_HUB_PG_DSN", "postgresql://local/test")
+    monkeypatch.setattr("storage.raw_postgres.psycopg.connect", lambda *args, **kwargs: fake_conn)
+    df = pd.DataFrame(
+        [
+            {"date": "2024-05-02", "taxa_liquidacao": 5.93, "emolumento": 1.18, "transf_ativos": 0.0},
+            {"date": "2024-06-05", "taxa_liquidacao": 1.47, "emolumento": 0.29, "transf_ativos": 0.0},
+        ]
+    )
+
+    changed = sync_dataframe_to_bronze(df, "nubank_trade_taxes", ["date"], fingerprint="abc", copy_min_rows=1)
+
+    cursor = fake_conn.cursor_obj
+    assert changed == []
+    assert fake_conn.committed is True
+    assert cursor.fingerprints == {"bronze.nubank_trade_taxes": ("abc", 2)}
+    (_query, fake_copy), = cursor.copies
+    assert fake_copy.rows[0] == ("2024-05-02", 5.93, 1.18, 0.0)
+    assert not any("TRUNCATE" in str(query) for query, _ in cursor.executed_queries)
+
+    executed = len(cursor.executed_queries)
+
+    assert sync_dataframe_to_bronze(df, "nubank_trade_taxes", ["date"], fingerprint="abc") is None
+    assert len(cursor.executed_queries) == executed + 3
+    assert len(cursor.copies) == 1
+
+    cursor.table_rows = 0
+
+    assert sync_dataframe_to_bronze(df, "nubank_trade_taxes", ["date"], fingerprint="abc", copy_min_rows=1) == []
+    assert len(cursor.copies) == 2
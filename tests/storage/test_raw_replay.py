@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import json
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from ingestion.models import RawEnvelope
+from storage.raw_file_store import flush_segments, write_envelopes
+from storage import raw_replay
+from storage.raw_replay import raw_files, replay_raw_files
+
+
+def _envelope(index: int, asset: str, day: int) -> RawEnvelope:
+    return RawEnvelope(
+        source="binance",
+        endpoint="https://api.binance.com/api/v3/klines",
+        request_params={"symbol": f"{asset}USDT"},
+        asset=asset,
+        currency="usdt",
+        uid=f"00000000-0000-0000-0000-{index:012d}",
+        fetched_at=f"2024-01-{day:02d}T10:00:00+00:00",
+        payload={"rows": [{"close": str(index)}]},
+    )
+
+
+def test_replay_raw_files_filters_and_batches_segments_and_legacy_files(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    write_envelopes(
+        "binance",
+        [_envelope(index, "BTC" if index % 2 else "ETH", index + 1) for index in range(6)],
+        base_dir=tmp_path,
+    )
+    flush_segments(base_dir=tmp_path)
+    legacy = tmp_path / "binance" / "raw.jsonl"
+    legacy.write_text(json.dumps(_envelope(10, "ETH", 4).to_dict()) + "\n", encoding="utf-8")
+    batches: list[list[str]] = []
+
+    def _insert_missing(envelopes: list[RawEnvelope]) -> int:
+        batches.append(sorted(env.uid[-2:] for env in envelopes))
+        return len(envelopes) - 1
+
+    monkeypatch.setattr("storage.raw_replay.insert_missing_envelopes", _insert_missing)
+
+    result = replay_raw_files(
+        categories=["binance"],
+        start=date(2024, 1, 2),
+        end=date(2024, 1, 5),
+        asset="ETH",
+        base_dir=tmp_path,
+        max_workers=2,
+        batch_size=2,
+    )
+
+    assert len(raw_files(["binance"], base_dir=tmp_path)) == 7
+    assert result.files == 5
+    assert result.read == 3
+    assert result.inserted == 1
+    assert sorted(uid for batch in batches for uid in batch) == ["02", "04", "10"]
+    assert [len(batch) for batch in batches] == [2, 1]
+
+
+def test_replay_raw_files_validates_arguments(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="max_workers"):
+        replay_raw_files(base_dir=tmp_path, max_workers=0)
+    with pytest.raises(ValueError, match="batch_size"):
+        replay_raw_files(base_dir=tmp_path, batch_size=0)
+
+
+def test_replay_raw_files_splits_files_into_bounded_chunks(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    write_envelopes("binance", [_envelope(index, "BTC", 1) for index in range(5)], base_dir=tmp_path)
+    monkeypatch.setattr("storage.raw_file_store.BLOCK_MAX_ENVELOPES", 1)
+    write_envelopes("binance", [_envelope(index, "BTC", 2) for index in range(5, 10)], base_dir=tmp_path)
+    flush_segments(base_dir=tmp_path)
+    legacy = tmp_path / "binance" / "raw.jsonl"
+    legacy.write_text(
+        "".join(json.dumps(_envelope(index, "ETH", 3).to_dict()) + "\n" for index in range(10, 17)),
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(raw_replay, "LEGACY_CHUNK_BYTES", 100)
+    uids: list[str] = []
+
+    def _insert_missing(envelopes: list[RawEnvelope]) -> int:
+        uids.extend(env.uid[-2:] for env in envelopes)
+        return len(envelopes)
+
+    monkeypatch.setattr("storage.raw_replay.insert_missing_envelopes", _insert_missing)
+    tasks = list(raw_replay._parse_tasks(raw_files(["binance"], base_dir=tmp_path), asset=None, batch_size=2))
+
+    result = replay_raw_files(categories=["binance"], base_dir=tmp_path, max_workers=1, batch_size=2)
+
+    assert [len(task[1]) for task in tasks if len(task) == 2] == [1, 2, 2, 1]
+    assert len([task for task in tasks if len(task) == 3]) > 7
+    assert result.read == 17
+    assert sorted(uids) == [f"{index:02d}" for index in range(17)]